@@ -5,48 +5,71 @@
 # This file is covered by the GNU General Public License.
 # See the file COPYING for more details.
 
-import scriptHandler
-import config
-import wx
-import addonHandler
-import globalPluginHandler
-import gui
-from typing import Callable
-from .dialogs import addonSummary, OpenRouterSettingsPanel, ChatDialog
-from gui.settingsDialogs import NVDASettingsDialog
-from .functions import disableInSecureMode
+import time
+
+_importStart: float = time.perf_counter()
+
+import scriptHandler  # noqa: E402
+import config  # noqa: E402
+import wx  # noqa: E402
+import addonHandler  # noqa: E402
+import globalPluginHandler  # noqa: E402
+import gui  # noqa: E402
+import ui  # noqa: E402
+from logHandler import log  # noqa: E402
+from typing import Callable  # noqa: E402
+from gui.settingsDialogs import NVDASettingsDialog  # noqa: E402
+from .confSpec import CONF_SPEC  # noqa: E402
+from .settingsPanel import OpenRouterSettingsPanel  # noqa: E402
+from .functions import disableInSecureMode  # noqa: E402
+from . import functions  # noqa: E402
+from . import worker  # noqa: E402
+
+# The chat dialog module, Markdown and the HTTP stack are imported on first use.
 
 addonHandler.initTranslation()
 
 _: Callable[[str], str]
 
+_importDuration: float = time.perf_counter() - _importStart
+
 
 @disableInSecureMode
 class GlobalPlugin(globalPluginHandler.GlobalPlugin):
-	scriptCategory = addonSummary
+	# Set to the add-on summary when the plugin is initialized
+	scriptCategory = ""
 
 	def __init__(self, *args, **kwargs):
+		initStart: float = time.perf_counter()
 		super().__init__(*args, **kwargs)
 
+		addonSummary: str = addonHandler.getCodeAddon().manifest["summary"]
+		GlobalPlugin.scriptCategory = addonSummary
+		OpenRouterSettingsPanel.title = addonSummary
+
 		if "askOpenRouter" not in config.conf.spec:
-			config.conf.spec["askOpenRouter"] = {
-				"apiKey": "string(default='')",
-				"fullHistory": "boolean(default=True)",
-				"useAllModels": "boolean(default=False)",
-				"selectedModel": "string(default='')",
-			}
+			config.conf.spec["askOpenRouter"] = CONF_SPEC
 
 		gui.settingsDialogs.NVDASettingsDialog.categoryClasses.append(
 			OpenRouterSettingsPanel,
 		)
 
+		log.debug(
+			f"askOpenRouter: modules imported in {_importDuration * 1000:.1f} ms, "
+			f"plugin initialized in {(time.perf_counter() - initStart) * 1000:.1f} ms",
+		)
+
 	def terminate(self):
+		worker.terminate()
+		functions.terminate()
 		if OpenRouterSettingsPanel in gui.settingsDialogs.NVDASettingsDialog.categoryClasses:
 			gui.settingsDialogs.NVDASettingsDialog.categoryClasses.remove(
 				OpenRouterSettingsPanel,
 			)
 
 	def onChatDialog(self, evt):
+		from .dialogs import ChatDialog
+
 		gui.mainFrame.prePopup()
 		dialog = ChatDialog(gui.mainFrame)
 		dialog.Show()
@@ -65,6 +88,8 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		description=_("Opens the prompt to start a new OpenRouter chat."),
 	)
 	def script_newChat(self, gesture):
+		from .dialogs import ChatDialog
+
 		dialog = ChatDialog(gui.mainFrame)
 		dialog.onNew(None)
 
@@ -73,9 +98,47 @@ class GlobalPlugin(globalPluginHandler.GlobalPlugin):
 		description=_("Opens the prompt to continue an existing OpenRouter chat."),
 	)
 	def script_continueChat(self, gesture):
+		from .dialogs import ChatDialog
+
 		dialog = ChatDialog(gui.mainFrame)
 		dialog.onContinue(None)
 
+	@scriptHandler.script(
+		# Translators: Description of the script which cancels the question being answered.
+		description=_("Cancels the OpenRouter question being answered."),
+	)
+	def script_cancelQuestion(self, gesture):
+		if functions.cancelQuestion():
+			# Translators: Message announced when the question being answered is cancelled.
+			ui.message(_("Question cancelled."))
+		else:
+			# Translators: Message announced when there is no question to cancel.
+			ui.message(_("No question in progress."))
+
+	@scriptHandler.script(
+		# Translators: Description of the script which opens the search in the stored chats.
+		description=_("Searches the stored OpenRouter chats."),
+	)
+	def script_searchChats(self, gesture):
+		from .dialogs import SearchDialog
+
+		gui.mainFrame.prePopup()
+		dialog = SearchDialog(gui.mainFrame)
+		dialog.Show()
+		gui.mainFrame.postPopup()
+
+	@scriptHandler.script(
+		# Translators: Description of the script which shows the time spent in each stage of the questions.
+		description=_("Shows the time spent in each stage of the recent OpenRouter questions."),
+	)
+	def script_showDiagnostics(self, gesture):
+		from .dialogs import DiagnosticsDialog
+
+		gui.mainFrame.prePopup()
+		dialog = DiagnosticsDialog(gui.mainFrame)
+		dialog.Show()
+		gui.mainFrame.postPopup()
+
 	@scriptHandler.script(
 		# Translators: Description of the script which allows to show OpenRouter settings panel..
 		description=_("Opens the add-on settings panel."),
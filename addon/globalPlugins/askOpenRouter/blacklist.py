@@ -0,0 +1,132 @@
+# globalPlugins/askOpenRouter/blacklist.py
+
+# Copyright(C) 2026-2028 Abdel <abdelkrim.bensaid@gmail.com>
+# Released under GPL 2
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import heapq
+import json
+import os
+import threading
+import time
+from logHandler import log
+from typing import Dict, List, Optional, Tuple
+
+
+class ModelBlacklist:
+	"""
+	Persistent blacklist of temporarily unavailable models.
+
+	Each entry expires at a given time. Expiry times are kept in a heap,
+	so expired entries are removed without scanning the whole blacklist.
+	The blacklist is saved on every change and loaded lazily, so it
+	survives NVDA restarts.
+	"""
+
+	def __init__(self, path: Optional[str] = None) -> None:
+		"""
+		Initialize the blacklist. The file is loaded on first use.
+
+		Args:
+			path (Optional[str], optional): JSON file used to persist the blacklist.
+		"""
+		self.path: Optional[str] = path
+		self._expiries: Dict[str, float] = {}
+		self._heap: List[Tuple[float, str]] = []
+		self._loaded: bool = False
+		self._lock: threading.RLock = threading.RLock()
+
+	def _load(self) -> None:
+		if self._loaded:
+			return
+		self._loaded = True
+		if not self.path or not os.path.exists(self.path):
+			return
+		try:
+			with open(self.path, "r", encoding="utf-8") as f:
+				data: Dict[str, float] = json.load(f)
+		except (OSError, ValueError):
+			log.debugWarning("askOpenRouter: ignoring unreadable blacklist", exc_info=True)
+			return
+		now: float = time.time()
+		for model, expiry in data.items():
+			if float(expiry) > now:
+				self._expiries[model] = float(expiry)
+				self._heap.append((float(expiry), model))
+		heapq.heapify(self._heap)
+
+	def _save(self) -> None:
+		if not self.path:
+			return
+		tmpPath: str = self.path + ".tmp"
+		try:
+			with open(tmpPath, "w", encoding="utf-8") as f:
+				json.dump(self._expiries, f)
+			os.replace(tmpPath, self.path)
+		except OSError:
+			log.debugWarning("askOpenRouter: could not save the blacklist", exc_info=True)
+
+	def cleanup(self) -> None:
+		"""
+		Remove expired entries.
+
+		Returns:
+			None
+		"""
+		now: float = time.time()
+		with self._lock:
+			self._load()
+			removed: bool = False
+			while self._heap and self._heap[0][0] <= now:
+				expiry, model = heapq.heappop(self._heap)
+				# Entries extended since were pushed again with a later expiry
+				if self._expiries.get(model) == expiry:
+					del self._expiries[model]
+					removed = True
+			if removed:
+				self._save()
+
+	def add(self, model: str, cooldown: float) -> None:
+		"""
+		Blacklist a model for the given duration.
+
+		Args:
+			model (str): Model identifier.
+			cooldown (float): Duration of the ban, in seconds.
+
+		Returns:
+			None
+		"""
+		expiry: float = time.time() + cooldown
+		with self._lock:
+			self._load()
+			if self._expiries.get(model, 0.0) >= expiry:
+				return
+			self._expiries[model] = expiry
+			heapq.heappush(self._heap, (expiry, model))
+			self._save()
+
+	def __contains__(self, model: object) -> bool:
+		with self._lock:
+			self._load()
+			expiry: Optional[float] = self._expiries.get(model) if isinstance(model, str) else None
+			return expiry is not None and expiry > time.time()
+
+	def __len__(self) -> int:
+		with self._lock:
+			self._load()
+			return len(self._expiries)
+
+	def clear(self) -> None:
+		"""
+		Remove every entry.
+
+		Returns:
+			None
+		"""
+		with self._lock:
+			self._loaded = True
+			self._expiries = {}
+			self._heap = []
+			self._save()
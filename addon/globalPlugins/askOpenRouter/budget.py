@@ -0,0 +1,130 @@
+# globalPlugins/askOpenRouter/budget.py
+
+# Copyright(C) 2026-2028 Abdel <abdelkrim.bensaid@gmail.com>
+# Released under GPL 2
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+# Average number of characters per token used by the estimate
+_CHARS_PER_TOKEN: float = 4.0
+
+# Tokens added by the chat format around each message
+_MESSAGE_OVERHEAD: int = 4
+
+# Share of the model context length which the history may use,
+# the rest being left for the answer
+DEFAULT_CONTEXT_RATIO: float = 0.75
+
+# Maximum number of cached token estimates
+_MAX_CACHED_ESTIMATES: int = 5000
+
+_estimates: "OrderedDict[str, int]" = OrderedDict()
+_estimatesLock: threading.Lock = threading.Lock()
+
+
+def estimateTokens(message: Dict[str, str]) -> int:
+	"""
+	Estimate the number of tokens a message uses in a request.
+
+	The estimate is based on the content length and cached per message,
+	so each message is only measured once.
+
+	Args:
+		message (Dict[str, str]): Chat message with role and content.
+
+	Returns:
+		int: Estimated number of tokens.
+	"""
+	content: str = message.get("content", "") or ""
+	key: str = hashlib.sha1(f"{message.get('role', '')}\0{content}".encode("utf-8")).hexdigest()
+
+	with _estimatesLock:
+		tokens: Optional[int] = _estimates.get(key)
+		if tokens is not None:
+			_estimates.move_to_end(key)
+			return tokens
+
+	# Non-ASCII text is usually split into more tokens per character
+	nonAscii: int = sum(1 for c in content if ord(c) > 127)
+	tokens = int((len(content) + nonAscii) / _CHARS_PER_TOKEN) + _MESSAGE_OVERHEAD
+
+	with _estimatesLock:
+		_estimates[key] = tokens
+		while len(_estimates) > _MAX_CACHED_ESTIMATES:
+			_estimates.popitem(last=False)
+
+	return tokens
+
+
+def computeBudget(
+	contextLength: Optional[int],
+	maxTokens: int = 0,
+	contextRatio: float = DEFAULT_CONTEXT_RATIO,
+) -> Optional[int]:
+	"""
+	Compute the number of tokens the history may use for a request.
+
+	Args:
+		contextLength (Optional[int]): Context length of the model, if known.
+		maxTokens (int, optional): User defined limit, 0 meaning no limit.
+		contextRatio (float, optional): Share of the context length usable by the history.
+
+	Returns:
+		Optional[int]: The budget, or None if the history does not need trimming.
+	"""
+	budgets: List[int] = []
+	if contextLength:
+		budgets.append(int(contextLength * contextRatio))
+	if maxTokens > 0:
+		budgets.append(maxTokens)
+	return min(budgets) if budgets else None
+
+
+def fitHistory(messages: List[Dict[str, str]], budget: Optional[int]) -> List[Dict[str, str]]:
+	"""
+	Select the messages to send so that they fit the token budget.
+
+	System messages at the start of the history and the newest message
+	(the question) are always kept. Older turns are then added from the
+	most recent to the oldest, as long as they fit the budget. The window
+	never starts with an assistant message.
+
+	Args:
+		messages (List[Dict[str, str]]): Full conversation history.
+		budget (Optional[int]): Token budget, or None to send everything.
+
+	Returns:
+		List[Dict[str, str]]: Messages to send, in their original order.
+	"""
+	if budget is None or not messages:
+		return messages
+
+	if sum(estimateTokens(m) for m in messages) <= budget:
+		return messages
+
+	systemCount: int = 0
+	while systemCount < len(messages) - 1 and messages[systemCount].get("role") == "system":
+		systemCount += 1
+
+	head: List[Dict[str, str]] = messages[:systemCount]
+	body: List[Dict[str, str]] = messages[systemCount:]
+
+	used: int = sum(estimateTokens(m) for m in head) + estimateTokens(body[-1])
+	start: int = len(body) - 1
+
+	while start > 0:
+		cost: int = estimateTokens(body[start - 1])
+		if used + cost > budget:
+			break
+		used += cost
+		start -= 1
+
+	while start < len(body) - 1 and body[start].get("role") == "assistant":
+		start += 1
+
+	return head + body[start:]
@@ -0,0 +1,405 @@
+# globalPlugins/askOpenRouter/catalogue.py
+
+# Copyright(C) 2026-2028 Abdel <abdelkrim.bensaid@gmail.com>
+# Released under GPL 2
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import json
+import os
+import threading
+import time
+from logHandler import log
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .httpClient import CancelToken, RequestCancelled
+
+# Default time (seconds) during which the catalogue is used without revalidation
+DEFAULT_TTL: float = 600.0
+
+# Age (seconds) beyond which a stale catalogue is not served while revalidating
+_MAX_STALE: float = 86400.0
+
+# Fetch function: takes the API key, conditional request headers and an optional cancel token,
+# returns the models (None when the server answered "304 Not Modified") and the response validators.
+FetchFunc = Callable[
+	[str, Dict[str, str], Optional[CancelToken]],
+	Tuple[Optional[List[Dict[str, Any]]], Dict[str, str]],
+]
+
+# Time (seconds) between two checks of the cancel token of a caller waiting for a shared download
+_CANCEL_POLL_INTERVAL: float = 0.1
+
+
+# Sort orders precomputed by ModelIndex
+SORT_BY_PROMPT_PRICE: str = "promptPricing"
+SORT_BY_COMPLETION_PRICE: str = "completionPricing"
+SORT_BY_CONTEXT_LENGTH: str = "contextLength"
+
+
+def _parsePrice(value: Any) -> Optional[float]:
+	try:
+		return float(value)
+	except (TypeError, ValueError):
+		return None
+
+
+class ModelInfo:
+	"""
+	Compact record of a model of the catalogue.
+	"""
+
+	__slots__ = (
+		"id",
+		"promptPricing",
+		"completionPricing",
+		"contextLength",
+		"deprecated",
+		"hasProvider",
+		"isFree",
+	)
+
+	def __init__(self, entry: Dict[str, Any]) -> None:
+		"""
+		Build the record from a catalogue entry.
+
+		Args:
+			entry (Dict[str, Any]): Model entry of the /models catalogue.
+		"""
+		pricing: Any = entry.get("pricing") or {}
+		prompt: Optional[float] = _parsePrice(pricing.get("prompt"))
+		completion: Optional[float] = _parsePrice(pricing.get("completion"))
+		self.id: str = entry.get("id") or ""
+		self.promptPricing: float = prompt or 0.0
+		self.completionPricing: float = completion or 0.0
+		self.contextLength: int = int(entry.get("context_length") or 0)
+		self.deprecated: bool = bool(entry.get("deprecated", False))
+		self.hasProvider: bool = bool(entry.get("top_provider"))
+		# Missing prices are not taken as free
+		self.isFree: bool = prompt == 0 and completion == 0
+
+	@property
+	def isUsable(self) -> bool:
+		"""
+		Whether the model can be offered: not deprecated, with a provider and a context length.
+		"""
+		return not self.deprecated and self.hasProvider and self.contextLength > 0
+
+
+class ModelIndex:
+	"""
+	Indexed, read-only view of a catalogue.
+
+	Built once per downloaded catalogue, it gives the usable models, the
+	usable free models and the usable models sorted by price or context
+	length without scanning the catalogue again, and finds a model by id
+	in constant time.
+	"""
+
+	def __init__(self, entries: List[Dict[str, Any]]) -> None:
+		"""
+		Index the catalogue entries.
+
+		Args:
+			entries (List[Dict[str, Any]]): Model entries of the /models catalogue.
+		"""
+		records: List[ModelInfo] = [ModelInfo(entry) for entry in entries if entry.get("id")]
+		self._byId: Dict[str, ModelInfo] = {record.id: record for record in records}
+		self.available: Tuple[ModelInfo, ...] = tuple(record for record in records if record.isUsable)
+		self.freeModels: Tuple[str, ...] = tuple(record.id for record in self.available if record.isFree)
+		self._orders: Dict[str, Tuple[ModelInfo, ...]] = {
+			key: tuple(sorted(self.available, key=lambda record, key=key: getattr(record, key)))
+			for key in (SORT_BY_PROMPT_PRICE, SORT_BY_COMPLETION_PRICE, SORT_BY_CONTEXT_LENGTH)
+		}
+
+	def get(self, modelId: str) -> Optional[ModelInfo]:
+		"""
+		Find a model by id, whether usable or not.
+
+		Args:
+			modelId (str): Model identifier.
+
+		Returns:
+			Optional[ModelInfo]: The model, or None if it is not in the catalogue.
+		"""
+		return self._byId.get(modelId)
+
+	def sortedBy(self, key: str) -> Tuple[ModelInfo, ...]:
+		"""
+		Return the usable models in a precomputed order, ascending.
+
+		Args:
+			key (str): One of SORT_BY_PROMPT_PRICE, SORT_BY_COMPLETION_PRICE and SORT_BY_CONTEXT_LENGTH.
+
+		Returns:
+			Tuple[ModelInfo, ...]: The sorted models.
+
+		Raises:
+			KeyError: If the order is unknown.
+		"""
+		return self._orders[key]
+
+	def __contains__(self, modelId: object) -> bool:
+		return modelId in self._byId
+
+	def __iter__(self) -> Iterator[ModelInfo]:
+		return iter(self.available)
+
+	def __len__(self) -> int:
+		return len(self.available)
+
+
+class ModelCatalogue:
+	"""
+	Cache of the OpenRouter /models catalogue.
+
+	The catalogue is kept in memory for ttl seconds and persisted to disk,
+	so it survives NVDA restarts. Once expired, it is still served while
+	being revalidated in the background with ETag / If-Modified-Since.
+	Concurrent callers share a single download; each of them can still be
+	cancelled through its own token while waiting for it.
+	"""
+
+	def __init__(self, fetch: FetchFunc, cacheFile: Optional[str] = None, ttl: float = DEFAULT_TTL) -> None:
+		"""
+		Initialize the catalogue.
+
+		Args:
+			fetch (FetchFunc): Function downloading the catalogue.
+			cacheFile (Optional[str], optional): JSON file used to persist the catalogue.
+			ttl (float, optional): Seconds during which the catalogue is considered fresh.
+		"""
+		self._fetch: FetchFunc = fetch
+		self.cacheFile: Optional[str] = cacheFile
+		self.ttl: float = ttl
+		self._models: Optional[List[Dict[str, Any]]] = None
+		self._fetchedAt: float = 0.0
+		self._validators: Dict[str, str] = {}
+		self._loaded: bool = False
+		self._lock: threading.Lock = threading.Lock()
+		self._loadLock: threading.Lock = threading.Lock()
+		self._inFlight: Optional[threading.Event] = None
+		self._lastError: Optional[BaseException] = None
+		# Index of the catalogue, with the model list it was built from
+		self._index: Optional[Tuple[List[Dict[str, Any]], ModelIndex]] = None
+		self._indexLock: threading.Lock = threading.Lock()
+
+	@property
+	def age(self) -> float:
+		"""
+		Seconds elapsed since the catalogue was last downloaded or revalidated.
+		"""
+		return time.time() - self._fetchedAt
+
+	def isFresh(self) -> bool:
+		"""
+		Return whether the cached catalogue can be used without revalidation.
+
+		Returns:
+			bool: True if a catalogue is cached and younger than the TTL.
+		"""
+		self._loadFromDisk()
+		return self._models is not None and self.age < self.ttl
+
+	def get(self, apiKey: str, cancelToken: Optional[CancelToken] = None) -> List[Dict[str, Any]]:
+		"""
+		Return the catalogue, downloading or revalidating it as needed.
+
+		A fresh catalogue is returned directly. A stale one is returned
+		immediately while a background revalidation starts. Without any
+		usable cached copy, the call waits for the download.
+
+		Args:
+			apiKey (str): OpenRouter API key.
+			cancelToken (Optional[CancelToken], optional): Token allowing to abort the wait for the download.
+
+		Returns:
+			List[Dict[str, Any]]: Raw model entries.
+
+		Raises:
+			urllib.error.URLError: If the catalogue has to be downloaded and the request fails.
+			RequestCancelled: If the download is waited for and the token is cancelled.
+		"""
+		self._loadFromDisk()
+		models: Optional[List[Dict[str, Any]]] = self._models
+
+		if models is not None:
+			age: float = self.age
+			if age < self.ttl:
+				return models
+			if age < _MAX_STALE:
+				self.refreshInBackground(apiKey)
+				return models
+
+		return self.refresh(apiKey, cancelToken)
+
+	def getIndex(self, apiKey: str, cancelToken: Optional[CancelToken] = None) -> ModelIndex:
+		"""
+		Return the indexed catalogue, following the same caching rules as get.
+
+		The index is rebuilt only when a new catalogue has been downloaded.
+
+		Args:
+			apiKey (str): OpenRouter API key.
+			cancelToken (Optional[CancelToken], optional): Token allowing to abort the wait for the download.
+
+		Returns:
+			ModelIndex: The indexed catalogue.
+
+		Raises:
+			urllib.error.URLError: If the catalogue has to be downloaded and the request fails.
+			RequestCancelled: If the download is waited for and the token is cancelled.
+		"""
+		models: List[Dict[str, Any]] = self.get(apiKey, cancelToken)
+		indexed: Optional[Tuple[List[Dict[str, Any]], ModelIndex]] = self._index
+		if indexed is not None and indexed[0] is models:
+			return indexed[1]
+		with self._indexLock:
+			indexed = self._index
+			if indexed is None or indexed[0] is not models:
+				indexed = self._index = (models, ModelIndex(models))
+			return indexed[1]
+
+	def refresh(self, apiKey: str, cancelToken: Optional[CancelToken] = None) -> List[Dict[str, Any]]:
+		"""
+		Revalidate the catalogue now, sharing any download already in progress.
+
+		When the caller which started the shared download is cancelled, a
+		caller still waiting for it downloads the catalogue instead.
+
+		Args:
+			apiKey (str): OpenRouter API key.
+			cancelToken (Optional[CancelToken], optional): Token allowing to abort the download,
+				or the wait for the download of another caller.
+
+		Returns:
+			List[Dict[str, Any]]: Raw model entries.
+
+		Raises:
+			urllib.error.URLError: If the request fails and no catalogue is cached.
+			RequestCancelled: If the token is cancelled.
+		"""
+		while True:
+			with self._lock:
+				event: Optional[threading.Event] = self._inFlight
+				leader: bool = event is None
+				if leader:
+					event = self._inFlight = threading.Event()
+			if leader:
+				break
+
+			if cancelToken is None:
+				event.wait()
+			else:
+				while not event.wait(_CANCEL_POLL_INTERVAL):
+					cancelToken.raiseIfCancelled()
+			if not isinstance(self._lastError, RequestCancelled):
+				if self._models is None and self._lastError is not None:
+					raise self._lastError
+				return self._models or []
+
+		try:
+			self._download(apiKey, cancelToken)
+			self._lastError = None
+		except RequestCancelled as e:
+			self._lastError = e
+			raise
+		except Exception as e:
+			self._lastError = e
+			if self._models is None:
+				raise
+			log.debugWarning("askOpenRouter: catalogue revalidation failed", exc_info=True)
+		finally:
+			with self._lock:
+				self._inFlight = None
+			event.set()
+
+		return self._models or []
+
+	def refreshInBackground(self, apiKey: str) -> None:
+		"""
+		Start a background revalidation unless one is already running.
+
+		Args:
+			apiKey (str): OpenRouter API key.
+
+		Returns:
+			None
+		"""
+		if self._inFlight is not None:
+			return
+		threading.Thread(
+			target=self._refreshQuietly,
+			args=(apiKey,),
+			name="askOpenRouter.catalogue",
+			daemon=True,
+		).start()
+
+	def _refreshQuietly(self, apiKey: str) -> None:
+		try:
+			self.refresh(apiKey)
+		except Exception:
+			log.debugWarning("askOpenRouter: background catalogue refresh failed", exc_info=True)
+
+	def _download(self, apiKey: str, cancelToken: Optional[CancelToken] = None) -> None:
+		conditional: Dict[str, str] = {}
+		if self._models is not None:
+			if "etag" in self._validators:
+				conditional["If-None-Match"] = self._validators["etag"]
+			if "lastModified" in self._validators:
+				conditional["If-Modified-Since"] = self._validators["lastModified"]
+
+		models, validators = self._fetch(apiKey, conditional, cancelToken)
+
+		if models is not None:
+			self._models = models
+			self._validators = validators
+		self._fetchedAt = time.time()
+		self._saveToDisk()
+
+	def invalidate(self) -> None:
+		"""
+		Mark the cached catalogue as expired, keeping it for revalidation.
+
+		Returns:
+			None
+		"""
+		self._fetchedAt = 0.0
+
+	def _loadFromDisk(self) -> None:
+		if self._loaded:
+			return
+		with self._loadLock:
+			if not self._loaded:
+				self._readCacheFile()
+				self._loaded = True
+
+	def _readCacheFile(self) -> None:
+		if not self.cacheFile or not os.path.exists(self.cacheFile):
+			return
+		try:
+			with open(self.cacheFile, "r", encoding="utf-8") as f:
+				cached = json.load(f)
+			self._models = cached["data"]
+			self._fetchedAt = float(cached.get("fetchedAt", 0))
+			self._validators = cached.get("validators", {})
+		except (OSError, ValueError, KeyError, TypeError):
+			log.debugWarning("askOpenRouter: ignoring unreadable catalogue cache", exc_info=True)
+
+	def _saveToDisk(self) -> None:
+		if not self.cacheFile or self._models is None:
+			return
+		tmpFile: str = self.cacheFile + ".tmp"
+		try:
+			with open(tmpFile, "w", encoding="utf-8") as f:
+				json.dump(
+					{
+						"fetchedAt": self._fetchedAt,
+						"validators": self._validators,
+						"data": self._models,
+					},
+					f,
+				)
+			os.replace(tmpFile, self.cacheFile)
+		except OSError:
+			log.debugWarning("askOpenRouter: could not persist the catalogue cache", exc_info=True)
@@ -0,0 +1,138 @@
+# globalPlugins/askOpenRouter/compaction.py
+
+# Copyright(C) 2026-2028 Abdel <abdelkrim.bensaid@gmail.com>
+# Released under GPL 2
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+from typing import Dict, List, Optional
+
+from .budget import estimateTokens
+from .sessions import ConversationSummary
+
+# Default size (estimated tokens) beyond which a conversation is summarised
+DEFAULT_THRESHOLD: int = 4000
+
+# Number of recent messages always sent as they are
+DEFAULT_KEEP_RECENT: int = 6
+
+# Tokens reserved for the instructions of a summary request
+SUMMARY_REQUEST_OVERHEAD: int = 200
+
+_INSTRUCTIONS: str = (
+	"You summarise conversations between a user and an assistant. "
+	"Write a concise summary of the conversation below, keeping the facts, decisions, names, "
+	"figures and open questions needed to continue it. If a previous summary is given, merge it "
+	"into the new summary. Answer with the summary only, in the language of the conversation."
+)
+
+_SUMMARY_INTRODUCTION: str = "Summary of the earlier part of this conversation:\n\n"
+
+
+def applySummary(
+	history: List[Dict[str, str]],
+	summary: Optional[ConversationSummary],
+) -> List[Dict[str, str]]:
+	"""
+	Replace the summarised messages of a conversation by their summary.
+
+	The summary becomes a system message at the start of the history,
+	which fitHistory always keeps.
+
+	Args:
+		history (List[Dict[str, str]]): Full conversation history.
+		summary (Optional[ConversationSummary]): Summary of the first messages, if any.
+
+	Returns:
+		List[Dict[str, str]]: The summary followed by the messages it does not cover.
+	"""
+	if summary is None or summary.coveredCount <= 0 or summary.coveredCount > len(history):
+		return history
+	return [{"role": "system", "content": _SUMMARY_INTRODUCTION + summary.content}] + history[
+		summary.coveredCount :
+	]
+
+
+def needsCompaction(
+	messages: List[Dict[str, str]],
+	threshold: int = DEFAULT_THRESHOLD,
+	keepRecent: int = DEFAULT_KEEP_RECENT,
+) -> bool:
+	"""
+	Tell whether the messages sent for a conversation should be summarised further.
+
+	Args:
+		messages (List[Dict[str, str]]): History as sent, summary included.
+		threshold (int, optional): Size, in estimated tokens, beyond which to summarise.
+		keepRecent (int, optional): Number of recent messages which are never summarised.
+
+	Returns:
+		bool: True if the messages exceed the threshold and older messages can be summarised.
+	"""
+	turns: int = sum(1 for m in messages if m.get("role") != "system")
+	if turns <= keepRecent:
+		return False
+	return sum(estimateTokens(m) for m in messages) > threshold
+
+
+def selectMessagesToSummarise(
+	history: List[Dict[str, str]],
+	coveredCount: int,
+	keepRecent: int = DEFAULT_KEEP_RECENT,
+	budget: Optional[int] = None,
+) -> int:
+	"""
+	Choose up to which message a conversation is summarised.
+
+	The keepRecent last messages are left out, the messages left out
+	start with a question, and the messages to summarise fit the budget
+	of the summarising model. Longer backlogs are then summarised over
+	several rounds.
+
+	Args:
+		history (List[Dict[str, str]]): Full conversation history.
+		coveredCount (int): Number of messages already summarised.
+		keepRecent (int, optional): Number of recent messages which are never summarised.
+		budget (Optional[int], optional): Tokens available for the messages, None for no limit.
+
+	Returns:
+		int: Number of messages the new summary covers, coveredCount if there is nothing to do.
+	"""
+	end: int = len(history) - keepRecent
+	stop: int = coveredCount
+	used: int = 0
+	while stop < end:
+		cost: int = estimateTokens(history[stop])
+		if budget is not None and used + cost > budget and stop > coveredCount:
+			break
+		used += cost
+		stop += 1
+
+	while stop > coveredCount and stop < len(history) and history[stop].get("role") != "user":
+		stop -= 1
+	return stop
+
+
+def buildSummaryRequest(
+	messages: List[Dict[str, str]],
+	previousSummary: Optional[str] = None,
+) -> List[Dict[str, str]]:
+	"""
+	Build the messages asking a model to summarise part of a conversation.
+
+	Args:
+		messages (List[Dict[str, str]]): Messages to summarise.
+		previousSummary (Optional[str], optional): Summary of the messages before them.
+
+	Returns:
+		List[Dict[str, str]]: Messages of the summary request.
+	"""
+	transcript: str = "\n\n".join(
+		f"{m.get('role', '').capitalize()}: {m.get('content', '')}" for m in messages
+	)
+	if previousSummary:
+		transcript = f"Previous summary:\n{previousSummary}\n\nConversation continued:\n{transcript}"
+	return [
+		{"role": "system", "content": _INSTRUCTIONS},
+		{"role": "user", "content": transcript},
+	]
@@ -0,0 +1,41 @@
+# globalPlugins/askOpenRouter/confSpec.py
+
+# Copyright(C) 2026-2028 Abdel <abdelkrim.bensaid@gmail.com>
+# Released under GPL 2
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+from typing import Dict
+
+# Specification of the askOpenRouter section of the NVDA configuration
+CONF_SPEC: Dict[str, str] = {
+	"apiKey": "string(default='')",
+	"fullHistory": "boolean(default=True)",
+	"useAllModels": "boolean(default=False)",
+	"selectedModel": "string(default='')",
+	"streamResponses": "boolean(default=False)",
+	"connectionPoolSize": "integer(default=4, min=1, max=16)",
+	"connectionIdleTimeout": "integer(default=60, min=5, max=600)",
+	"modelCacheTTL": "integer(default=600, min=0, max=86400)",
+	"maxHistoryTokens": "integer(default=0, min=0)",
+	"hedgedRequests": "integer(default=1, min=1, max=4)",
+	"hedgeDelay": "integer(default=0, min=0, max=30000)",
+	"rateLimitCooldown": "integer(default=300, min=0)",
+	"policyCooldown": "integer(default=180, min=0)",
+	"paymentCooldown": "integer(default=1800, min=0)",
+	"serverErrorCooldown": "integer(default=60, min=0)",
+	"useResponseCache": "boolean(default=False)",
+	"responseCacheSize": "integer(default=20, min=1, max=1024)",
+	"responseCacheMaxAge": "integer(default=168, min=1)",
+	"questionDeadline": "integer(default=120, min=10, max=900)",
+	"maxConcurrentQuestions": "integer(default=2, min=1, max=8)",
+	"warmUp": "boolean(default=True)",
+	"probeModelOnWarmUp": "boolean(default=False)",
+	"compactHistory": "boolean(default=False)",
+	"compactionThreshold": "integer(default=4000, min=500)",
+	"summaryModel": "string(default='')",
+	"markdownExtensions": "string(default='fenced_code, tables')",
+	"connectTimeout": "integer(default=10, min=1, max=120)",
+	"firstByteTimeout": "integer(default=60, min=5, max=900)",
+	"streamIdleTimeout": "integer(default=30, min=5, max=900)",
+}
@@ -0,0 +1,201 @@
+# globalPlugins/askOpenRouter/diagnostics.py
+
+# Copyright(C) 2026-2028 Abdel <abdelkrim.bensaid@gmail.com>
+# Released under GPL 2
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from logHandler import log
+from typing import Deque, Dict, Iterator, List, Optional
+
+# Maximum number of spans kept in memory
+_MAX_SPANS: int = 2000
+
+# Stages of a question, in the order they happen
+STAGES: List[str] = [
+	"queueWait",
+	"catalogue",
+	"modelSelection",
+	"connect",
+	"firstByte",
+	"response",
+	"retryWait",
+	"persistence",
+	"markdown",
+	"display",
+	"total",
+	"compaction",
+]
+
+
+class Span:
+	"""
+	Duration of one stage of a request.
+	"""
+
+	__slots__ = ("stage", "duration", "requestId", "detail", "endedAt")
+
+	def __init__(self, stage: str, duration: float, requestId: Optional[int], detail: str) -> None:
+		self.stage: str = stage
+		self.duration: float = duration
+		self.requestId: Optional[int] = requestId
+		self.detail: str = detail
+		self.endedAt: float = time.time()
+
+
+class StageStats:
+	"""
+	Aggregated durations of one stage.
+	"""
+
+	__slots__ = ("stage", "count", "mean", "median", "p90", "maximum")
+
+	def __init__(self, stage: str, durations: List[float]) -> None:
+		ordered: List[float] = sorted(durations)
+		self.stage: str = stage
+		self.count: int = len(ordered)
+		self.mean: float = sum(ordered) / len(ordered)
+		self.median: float = ordered[(len(ordered) - 1) // 2]
+		self.p90: float = ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))]
+		self.maximum: float = ordered[-1]
+
+
+class TimingRecorder:
+	"""
+	Bounded ring buffer of timing spans.
+
+	Each span is also written to the NVDA log at debug level. Spans
+	recorded while a request is current on the calling thread are tagged
+	with its identifier, so the stages of one question can be told apart.
+	"""
+
+	def __init__(self, maxSpans: int = _MAX_SPANS) -> None:
+		"""
+		Initialize the recorder.
+
+		Args:
+			maxSpans (int, optional): Maximum number of spans kept; the oldest are dropped.
+		"""
+		self._spans: Deque[Span] = deque(maxlen=maxSpans)
+		self._lock: threading.Lock = threading.Lock()
+		self._requestIds: Iterator[int] = itertools.count(1)
+		self._local: threading.local = threading.local()
+
+	def startRequest(self) -> int:
+		"""
+		Make a new request current on the calling thread.
+
+		Returns:
+			int: Identifier of the request.
+		"""
+		with self._lock:
+			requestId: int = next(self._requestIds)
+		self._local.requestId = requestId
+		return requestId
+
+	def setCurrentRequest(self, requestId: Optional[int]) -> None:
+		"""
+		Make a request current on the calling thread, such as a worker thread of the request.
+
+		Args:
+			requestId (Optional[int]): Identifier of the request, or None to forget it.
+
+		Returns:
+			None
+		"""
+		self._local.requestId = requestId
+
+	@property
+	def currentRequest(self) -> Optional[int]:
+		"""
+		Identifier of the request current on the calling thread, if any.
+		"""
+		return getattr(self._local, "requestId", None)
+
+	def record(self, stage: str, duration: float, detail: str = "", requestId: Optional[int] = None) -> None:
+		"""
+		Record the duration of a stage.
+
+		Args:
+			stage (str): Stage name, one of STAGES.
+			duration (float): Duration, in seconds.
+			detail (str, optional): Extra information, such as the model.
+			requestId (Optional[int], optional): Request, defaults to the current one.
+
+		Returns:
+			None
+		"""
+		if requestId is None:
+			requestId = self.currentRequest
+		span = Span(stage, duration, requestId, detail)
+		with self._lock:
+			self._spans.append(span)
+		log.debug(
+			f"askOpenRouter timing: request={requestId} stage={stage} duration={duration * 1000:.1f}ms {detail}",
+		)
+
+	@contextmanager
+	def span(self, stage: str, detail: str = "") -> Iterator[None]:
+		"""
+		Record the duration of the enclosed block, even if it raises.
+
+		Args:
+			stage (str): Stage name, one of STAGES.
+			detail (str, optional): Extra information, such as the model.
+		"""
+		start: float = time.perf_counter()
+		try:
+			yield
+		finally:
+			self.record(stage, time.perf_counter() - start, detail)
+
+	def getSpans(self) -> List[Span]:
+		"""
+		Return the recorded spans, the oldest first.
+
+		Returns:
+			List[Span]: The spans.
+		"""
+		with self._lock:
+			return list(self._spans)
+
+	def aggregate(self) -> List[StageStats]:
+		"""
+		Aggregate the recorded durations per stage.
+
+		Returns:
+			List[StageStats]: Statistics of the stages having spans, in the order of STAGES.
+		"""
+		durations: Dict[str, List[float]] = {}
+		for span in self.getSpans():
+			durations.setdefault(span.stage, []).append(span.duration)
+		order: List[str] = STAGES + sorted(set(durations) - set(STAGES))
+		return [StageStats(stage, durations[stage]) for stage in order if stage in durations]
+
+	def clear(self) -> None:
+		"""
+		Remove every span.
+
+		Returns:
+			None
+		"""
+		with self._lock:
+			self._spans.clear()
+
+
+_recorder: TimingRecorder = TimingRecorder()
+
+
+def getRecorder() -> TimingRecorder:
+	"""
+	Return the shared timing recorder.
+
+	Returns:
+		TimingRecorder: The shared recorder.
+	"""
+	return _recorder
@@ -3,19 +3,154 @@
 # Copyright(C) 2026-2028 Abdel <abdelkrim.bensaid@gmail.com>
 # Released under GPL 2
 
+import functools
+import threading
+import time
 import wx
 import addonHandler
-import config
 import gui
-from typing import Callable, List, Dict, Optional, cast
+from logHandler import log
+from typing import Callable, Dict, List, Optional
 
-from gui.settingsDialogs import SettingsPanel
-from .functions import askOpenRouter, inputBox, getAvailableModels
+from .diagnostics import StageStats, getRecorder
+from .functions import askOpenRouterInBackground, getSessionStore, inputBox, showHistory, startWarmUp
+from .sessions import SearchHit, SessionInfo
+from .worker import QueueStats, getWorker
 
 addonHandler.initTranslation()
 
 _: Callable[[str], str]
-addonSummary: str = addonHandler.getCodeAddon().manifest["summary"]
+
+# Number of conversations read from the store at once by the list
+_PAGE_SIZE: int = 100
+
+# Delay (milliseconds) between the last key typed and the search
+_SEARCH_DELAY: int = 250
+
+# Maximum number of search results displayed
+_MAX_SEARCH_RESULTS: int = 200
+
+
+# Sessions List
+class SessionsListCtrl(wx.ListCtrl):
+	"""
+	Virtual list of the stored conversations, the most recently used first.
+
+	Conversations are read from the session store by pages, only when
+	their rows are displayed. The store is opened, and the first page
+	read, on a background thread, so that opening the dialog never waits
+	for the database.
+	"""
+
+	def __init__(self, parent: wx.Window) -> None:
+		"""
+		Initialize the list.
+
+		Args:
+			parent (wx.Window): Parent window.
+		"""
+		super().__init__(
+			parent,
+			style=wx.LC_REPORT | wx.LC_VIRTUAL | wx.LC_SINGLE_SEL,
+			size=(560, 240),
+		)
+		# Translators: Header of the column containing the names of the conversations.
+		self.InsertColumn(0, _("Name"), width=280)
+		# Translators: Header of the column containing the model of the conversations.
+		self.InsertColumn(1, _("Model"), width=160)
+		# Translators: Header of the column containing the date of the last message.
+		self.InsertColumn(2, _("Last used"), width=120)
+		self._pages: Dict[int, List[SessionInfo]] = {}
+		self._loaded: bool = False
+		self._request: int = 0
+		self.refresh()
+
+	def refresh(self) -> None:
+		"""
+		Read the number of conversations and the first page again in the background.
+
+		The rows displayed are kept until the new ones arrive.
+
+		Returns:
+			None
+		"""
+		self._request += 1
+		threading.Thread(
+			target=self._load,
+			args=(self._request,),
+			name="askOpenRouter.sessionsList",
+			daemon=True,
+		).start()
+
+	def _load(self, request: int) -> None:
+		"""
+		Count the conversations and read the first page, then hand them to the GUI thread.
+		"""
+		count: Optional[int] = None
+		firstPage: List[SessionInfo] = []
+		try:
+			store = getSessionStore()
+			count = store.countSessions()
+			firstPage = store.listSessions(0, _PAGE_SIZE)
+		except Exception:
+			log.debugWarning("askOpenRouter: could not read the stored chats", exc_info=True)
+
+		wx.CallAfter(self._onLoaded, count, firstPage, request)
+
+	def _onLoaded(self, count: Optional[int], firstPage: List[SessionInfo], request: int) -> None:
+		"""
+		Display the conversations read, unless the list was closed or refreshed meanwhile.
+		"""
+		if not self or request != self._request or count is None:
+			return
+
+		self._pages = {0: firstPage}
+		self.SetItemCount(count)
+		self.Refresh()
+
+		# The most recent conversation is selected when the dialog opens
+		if not self._loaded and count:
+			self.Select(0)
+			self.Focus(0)
+		self._loaded = True
+
+	def getSession(self, item: int) -> Optional[SessionInfo]:
+		"""
+		Return the conversation displayed at the given row.
+
+		Args:
+			item (int): Row index.
+
+		Returns:
+			Optional[SessionInfo]: The conversation, or None.
+		"""
+		if item < 0:
+			return None
+		page: int = item // _PAGE_SIZE
+		if page not in self._pages:
+			self._pages[page] = getSessionStore().listSessions(page * _PAGE_SIZE, _PAGE_SIZE)
+		sessions = self._pages[page]
+		index: int = item % _PAGE_SIZE
+		return sessions[index] if index < len(sessions) else None
+
+	def getSelectedSession(self) -> Optional[SessionInfo]:
+		"""
+		Return the selected conversation.
+
+		Returns:
+			Optional[SessionInfo]: The selected conversation, or None.
+		"""
+		return self.getSession(self.GetFirstSelected())
+
+	def OnGetItemText(self, item: int, column: int) -> str:
+		session: Optional[SessionInfo] = self.getSession(item)
+		if session is None:
+			return ""
+		if column == 0:
+			return session.name
+		if column == 1:
+			return session.model
+		return time.strftime("%Y-%m-%d %H:%M", time.localtime(session.updatedAt))
 
 
 # Chat Dialog
@@ -25,7 +160,8 @@ class ChatDialog(wx.Dialog):
 
 	Allows the user to:
 		- Start a new chat
-		- Continue an existing chat
+		- Continue any stored chat
+		- Rename or delete a stored chat
 		- Close the dialog
 	"""
 
@@ -60,6 +196,12 @@ class ChatDialog(wx.Dialog):
 			wx.VERTICAL,
 		)
 
+		self.sessionsList: SessionsListCtrl = sHelper.addLabeledControl(
+			# Translators: Label of the list of stored chats.
+			_("&Chats:"),
+			SessionsListCtrl,
+		)
+
 		buttonGroup: gui.guiHelper.ButtonHelper = gui.guiHelper.ButtonHelper(wx.HORIZONTAL)
 
 		self.newButton: wx.Button = buttonGroup.addButton(
@@ -74,6 +216,24 @@ class ChatDialog(wx.Dialog):
 			label=_("Co&ntinue a Chat"),
 		)
 
+		self.searchButton: wx.Button = buttonGroup.addButton(
+			self,
+			# Translators: Label of the button opening the search in the stored chats.
+			label=_("&Search…"),
+		)
+
+		self.renameButton: wx.Button = buttonGroup.addButton(
+			self,
+			# Translators: Label of the button renaming the selected chat.
+			label=_("Rena&me"),
+		)
+
+		self.deleteButton: wx.Button = buttonGroup.addButton(
+			self,
+			# Translators: Label of the button deleting the selected chat.
+			label=_("&Delete"),
+		)
+
 		self.closeButton: wx.Button = buttonGroup.addButton(
 			self,
 			# Translators: Label of the closing button.
@@ -85,6 +245,11 @@ class ChatDialog(wx.Dialog):
 
 		self.newButton.Bind(wx.EVT_BUTTON, self.onNew)
 		self.continueButton.Bind(wx.EVT_BUTTON, self.onContinue)
+		self.searchButton.Bind(wx.EVT_BUTTON, self.onSearch)
+		self.renameButton.Bind(wx.EVT_BUTTON, self.onRename)
+		self.deleteButton.Bind(wx.EVT_BUTTON, self.onDelete)
+		self.sessionsList.Bind(wx.EVT_LIST_ITEM_ACTIVATED, self.onContinue)
+		self.Bind(wx.EVT_ACTIVATE, self.onActivate)
 		self.Bind(wx.EVT_BUTTON, self.onClose, self.closeButton)
 
 		sHelper.addItem(buttonGroup)
@@ -98,6 +263,9 @@ class ChatDialog(wx.Dialog):
 		self.SetSizerAndFit(mainSizer)
 		self.newButton.SetFocus()
 
+		# Prepare the connection and the model while the user chooses a chat
+		startWarmUp()
+
 	def __del__(self) -> None:
 		ChatDialog._instance = None
 
@@ -115,226 +283,460 @@ class ChatDialog(wx.Dialog):
 		inputBox(
 			# Translators: Title of the dialog box to start a new chat.
 			_("New Chat"),
-			askOpenRouter,
+			askOpenRouterInBackground,
 		)
 
-	def onContinue(self, evt: wx.CommandEvent) -> None:
+	def onActivate(self, evt: wx.ActivateEvent) -> None:
 		"""
-		Continue an existing OpenRouter chat.
+		Refresh the list of chats, which may have changed while the dialog was inactive.
 		"""
-		inputBox(
+		if evt.GetActive():
+			self.sessionsList.refresh()
+		evt.Skip()
+
+	def onContinue(self, evt: Optional[wx.CommandEvent]) -> None:
+		"""
+		Continue the selected OpenRouter chat, or the most recent one.
+		"""
+		session: Optional[SessionInfo] = self.sessionsList.getSelectedSession()
+		title: str = (
 			# Translators: Title of the dialog box to continue an existing chat.
-			_("Continue Chat"),
-			askOpenRouter,
+			_("Continue Chat")
+			if session is None
+			# Translators: Title of the dialog box to continue a chat, with the name of the chat.
+			else _("Continue Chat: {name}").format(name=session.name)
+		)
+		inputBox(
+			title,
+			functools.partial(
+				askOpenRouterInBackground,
+				sessionId=session.id if session is not None else None,
+			),
 			new=False,
 		)
 
+	def onSearch(self, evt: Optional[wx.CommandEvent]) -> None:
+		"""
+		Open the search in the stored chats.
+		"""
+		dialog = SearchDialog(self if self.IsShown() else gui.mainFrame)
+		dialog.Show()
+		dialog.Raise()
 
-# Settings Panel
-class OpenRouterSettingsPanel(SettingsPanel):
+	def onRename(self, evt: wx.CommandEvent) -> None:
+		"""
+		Rename the selected chat.
+		"""
+		session: Optional[SessionInfo] = self.sessionsList.getSelectedSession()
+		if session is None:
+			return
+		with wx.TextEntryDialog(
+			self,
+			# Translators: Label of the field containing the new name of a chat.
+			_("New name of the chat:"),
+			# Translators: Title of the dialog box renaming a chat.
+			_("Rename Chat"),
+			value=session.name,
+		) as dialog:
+			if dialog.ShowModal() != wx.ID_OK or not dialog.Value.strip():
+				return
+			getSessionStore().renameSession(session.id, dialog.Value.strip())
+		self.sessionsList.refresh()
+
+	def onDelete(self, evt: wx.CommandEvent) -> None:
+		"""
+		Delete the selected chat after confirmation.
+		"""
+		session: Optional[SessionInfo] = self.sessionsList.getSelectedSession()
+		if session is None:
+			return
+		if (
+			gui.messageBox(
+				# Translators: Message asking the user to confirm the deletion of a chat.
+				_("Do you really want to delete the chat {name}?").format(name=session.name),
+				# Translators: Title of the message confirming the deletion of a chat.
+				_("Delete Chat"),
+				wx.YES_NO | wx.NO_DEFAULT | wx.ICON_WARNING,
+				self,
+			)
+			!= wx.YES
+		):
+			return
+		getSessionStore().deleteSession(session.id)
+		self.sessionsList.refresh()
+
+
+# Search Dialog
+class SearchDialog(wx.Dialog):
 	"""
-	NVDA settings panel for configuring OpenRouter integration.
-
-	This panel allows the user to:
-		- Enter and store their OpenRouter API key
-		- Toggle visibility of the API key
-		- Enable full chat history display
-		- Enable selection of all available models (free and paid)
-		- Choose a specific model sorted by price
+	Dialog searching the messages of every stored chat.
+
+	Results are ranked by relevance and show an excerpt of each message,
+	with the matched words between brackets. A result can be displayed
+	with its whole conversation, or its chat continued.
 	"""
 
-	title: str = addonSummary
+	_instance: Optional["SearchDialog"] = None
 
-	def makeSettings(self, settingsSizer: wx.Sizer) -> None:
+	def __new__(cls, *args, **kwargs) -> "SearchDialog":
+		if not SearchDialog._instance:
+			return super().__new__(cls, *args, **kwargs)
+		return SearchDialog._instance
+
+	def __init__(self, parent: wx.Window) -> None:
 		"""
-		Build the settings UI components.
+		Initialize the SearchDialog.
 
 		Args:
-			settingsSizer (wx.Sizer): Parent sizer provided by NVDA.
+			parent (wx.Window): Parent window.
 		"""
-		self.sHelper: gui.guiHelper.BoxSizerHelper = gui.guiHelper.BoxSizerHelper(self, sizer=settingsSizer)
-
-		# =========================
-		# API KEY
-		# =========================
-
-		self.apiKeyLabel: wx.StaticText = wx.StaticText(
-			self,
-			# Translators: Label of the field that must contain the OpenRouter API key.
-			label=_("OpenRouter API Key:"),
-		)
-		self.sHelper.addItem(self.apiKeyLabel)
+		if SearchDialog._instance is not None:
+			return
 
-		self.apiKeyHidden: wx.TextCtrl = wx.TextCtrl(
-			self,
-			style=wx.TE_PASSWORD,
-		)
-		self.sHelper.addItem(self.apiKeyHidden, flag=wx.EXPAND)
+		SearchDialog._instance = self
 
-		self.apiKeyHidden.SetValue(
-			config.conf["askOpenRouter"]["apiKey"],
+		super().__init__(
+			parent,
+			# Translators: Title of the dialog searching the stored chats.
+			title=_("Search Chats"),
 		)
 
-		self.apiKeyVisible: wx.TextCtrl = wx.TextCtrl(self)
-		self.sHelper.addItem(self.apiKeyVisible, flag=wx.EXPAND)
-		self.apiKeyVisible.Hide()
+		self.hits: List[SearchHit] = []
+		self._searchTimer: Optional[wx.CallLater] = None
 
-		self.showApiKeyCheckBox: wx.CheckBox = wx.CheckBox(
+		mainSizer: wx.BoxSizer = wx.BoxSizer(wx.VERTICAL)
+		sHelper: gui.guiHelper.BoxSizerHelper = gui.guiHelper.BoxSizerHelper(
 			self,
-			# Translators: Label of the checkbox to display the OpenRouter API key.
-			label=_("Show API key"),
+			wx.VERTICAL,
 		)
-		self.sHelper.addItem(self.showApiKeyCheckBox)
 
-		self.showApiKeyCheckBox.Bind(
-			wx.EVT_CHECKBOX,
-			self.onToggleApiVisibility,
+		self.searchEdit: wx.TextCtrl = sHelper.addLabeledControl(
+			# Translators: Label of the field containing the words to search for.
+			_("Search &for:"),
+			wx.TextCtrl,
+		)
+		self.searchEdit.Bind(wx.EVT_TEXT, self.onSearchText)
+
+		self.resultsList: wx.ListCtrl = sHelper.addLabeledControl(
+			# Translators: Label of the list of search results.
+			_("&Results:"),
+			wx.ListCtrl,
+			style=wx.LC_REPORT | wx.LC_SINGLE_SEL,
+			size=(640, 280),
 		)
+		# Translators: Header of the column containing the names of the chats.
+		self.resultsList.InsertColumn(0, _("Chat"), width=180)
+		# Translators: Header of the column indicating who wrote the message.
+		self.resultsList.InsertColumn(1, _("Author"), width=80)
+		# Translators: Header of the column containing the excerpts of the messages.
+		self.resultsList.InsertColumn(2, _("Excerpt"), width=380)
+		self.resultsList.Bind(wx.EVT_LIST_ITEM_ACTIVATED, self.onOpen)
 
-		# =========================
-		# FULL HISTORY
-		# =========================
+		buttonGroup: gui.guiHelper.ButtonHelper = gui.guiHelper.ButtonHelper(wx.HORIZONTAL)
 
-		self.fullHistoryCheckBox: wx.CheckBox = wx.CheckBox(
+		self.openButton: wx.Button = buttonGroup.addButton(
 			self,
-			# Translators: Label of the checkbox to display chat history.
-			label=_("Display the full chat history for continuous discussions"),
+			# Translators: Label of the button displaying the chat of the selected result.
+			label=_("&Open the chat"),
 		)
-		self.sHelper.addItem(self.fullHistoryCheckBox)
 
-		self.fullHistoryCheckBox.SetValue(
-			config.conf["askOpenRouter"]["fullHistory"],
+		self.continueButton: wx.Button = buttonGroup.addButton(
+			self,
+			# Translators: Label of the button continuing the chat of the selected result.
+			label=_("Co&ntinue the chat"),
 		)
 
-		# =========================
-		# USE ALL MODELS
-		# =========================
-
-		self.useAllModelsCheckBox: wx.CheckBox = wx.CheckBox(
+		self.closeButton: wx.Button = buttonGroup.addButton(
 			self,
-			# Translators:
-			# Translators: Label of the checkbox to show the list of models, including paid ones.
-			label=_("Use all models, including paid ones."),
+			# Translators: Label of the closing button.
+			label=_("&Close"),
 		)
-		self.sHelper.addItem(self.useAllModelsCheckBox)
 
-		self.useAllModelsCheckBox.SetValue(
-			config.conf["askOpenRouter"].get("useAllModels", False),
-		)
+		self.SetEscapeId(self.closeButton.GetId())
 
-		self.useAllModelsCheckBox.Bind(
-			wx.EVT_CHECKBOX,
-			self.onToggleModelsList,
-		)
+		self.openButton.Bind(wx.EVT_BUTTON, self.onOpen)
+		self.continueButton.Bind(wx.EVT_BUTTON, self.onContinue)
+		self.Bind(wx.EVT_BUTTON, self.onClose, self.closeButton)
+		self.Bind(wx.EVT_CLOSE, self.onClose)
 
-		# =========================
-		# MODELS LIST
-		# =========================
+		sHelper.addItem(buttonGroup)
 
-		self.modelsList: wx.ListBox = wx.ListBox(self)
-		self.sHelper.addItem(self.modelsList, flag=wx.EXPAND)
+		mainSizer.Add(
+			sHelper.sizer,
+			border=gui.guiHelper.BORDER_FOR_DIALOGS,
+			flag=wx.ALL | wx.EXPAND,
+		)
 
-		self.modelsList.Hide()
-		self.modelsData: List[Dict[str, object]] = []
+		self.SetSizerAndFit(mainSizer)
+		self.searchEdit.SetFocus()
 
-		wx.CallAfter(self.onToggleModelsList, None)
+	def onClose(self, evt: wx.Event) -> None:
+		"""
+		Close the dialog and reset the singleton instance.
+		"""
+		if self._searchTimer is not None:
+			self._searchTimer.Stop()
+		SearchDialog._instance = None
+		self.Destroy()
 
-	def onToggleApiVisibility(self, evt: wx.CommandEvent) -> None:
+	def onSearchText(self, evt: wx.CommandEvent) -> None:
 		"""
-		Toggle visibility of the API key field.
+		Search again shortly after the user stops typing.
 		"""
-		if self.showApiKeyCheckBox.IsChecked():
-			self.apiKeyVisible.SetValue(self.apiKeyHidden.GetValue())
-			self.apiKeyHidden.Hide()
-			self.apiKeyVisible.Show()
-			self.apiKeyVisible.SetFocus()
+		if self._searchTimer is not None and self._searchTimer.IsRunning():
+			self._searchTimer.Restart(_SEARCH_DELAY)
 		else:
-			self.apiKeyHidden.SetValue(self.apiKeyVisible.GetValue())
-			self.apiKeyVisible.Hide()
-			self.apiKeyHidden.Show()
-			self.apiKeyHidden.SetFocus()
+			self._searchTimer = wx.CallLater(_SEARCH_DELAY, self.search)
 
-		self.Layout()
+	def search(self) -> None:
+		"""
+		Search the stored chats and display the results.
 
-	def onToggleModelsList(self, evt: Optional[wx.CommandEvent]) -> None:
+		Returns:
+			None
 		"""
-		Show or hide the models list depending on checkbox state.
+		if not self:
+			return
+		self.hits = getSessionStore().search(self.searchEdit.GetValue(), limit=_MAX_SEARCH_RESULTS)
+		authors: Dict[str, str] = {
+			# Translators: Author of the messages written by the user.
+			"user": _("You"),
+			# Translators: Author of the messages written by the model.
+			"assistant": _("Model"),
+		}
+
+		self.resultsList.DeleteAllItems()
+		for hit in self.hits:
+			item: int = self.resultsList.InsertItem(self.resultsList.GetItemCount(), hit.sessionName)
+			self.resultsList.SetItem(item, 1, authors.get(hit.role, hit.role))
+			self.resultsList.SetItem(item, 2, " ".join(hit.snippet.split()))
+
+		if self.hits:
+			self.resultsList.Select(0)
+			self.resultsList.Focus(0)
+
+	def getSelectedHit(self) -> Optional[SearchHit]:
 		"""
-		if self.useAllModelsCheckBox.IsChecked():
-			self.modelsList.Show()
-			self._loadModelsIfNeeded()
-		else:
-			self.modelsList.Hide()
+		Return the selected search result.
 
-		self.Layout()
+		Returns:
+			Optional[SearchHit]: The selected result, or None.
+		"""
+		item: int = self.resultsList.GetFirstSelected()
+		return self.hits[item] if 0 <= item < len(self.hits) else None
 
-	def _loadModelsIfNeeded(self) -> None:
+	def onOpen(self, evt: wx.CommandEvent) -> None:
+		"""
+		Display the whole chat of the selected result.
 		"""
-		Load available models from OpenRouter if required.
+		hit: Optional[SearchHit] = self.getSelectedHit()
+		if hit is not None:
+			showHistory(hit.sessionId, hit.sessionName)
 
-		Models are sorted by ascending prompt price.
+	def onContinue(self, evt: wx.CommandEvent) -> None:
+		"""
+		Continue the chat of the selected result.
 		"""
-		if not self.useAllModelsCheckBox.IsChecked():
+		hit: Optional[SearchHit] = self.getSelectedHit()
+		if hit is None:
 			return
+		inputBox(
+			# Translators: Title of the dialog box to continue a chat, with the name of the chat.
+			_("Continue Chat: {name}").format(name=hit.sessionName),
+			functools.partial(askOpenRouterInBackground, sessionId=hit.sessionId),
+			new=False,
+		)
 
-		if self.modelsData:
-			return
 
-		apiKey: str = self.getApiKeyValue().strip()
+# Diagnostics Dialog
+class DiagnosticsDialog(wx.Dialog):
+	"""
+	Dialog displaying the time spent in each stage of the recent questions.
+	"""
 
-		if not apiKey:
-			return
+	_instance: Optional["DiagnosticsDialog"] = None
 
-		try:
-			models: List[Dict[str, object]] = getAvailableModels(apiKey)
-		except Exception:
+	def __new__(cls, *args, **kwargs) -> "DiagnosticsDialog":
+		if not DiagnosticsDialog._instance:
+			return super().__new__(cls, *args, **kwargs)
+		return DiagnosticsDialog._instance
+
+	def __init__(self, parent: wx.Window) -> None:
+		"""
+		Initialize the DiagnosticsDialog.
+
+		Args:
+			parent (wx.Window): Parent window.
+		"""
+		if DiagnosticsDialog._instance is not None:
 			return
 
-		models.sort(key=lambda m: cast(float, m["promptPricing"]))
+		DiagnosticsDialog._instance = self
+
+		super().__init__(
+			parent,
+			# Translators: Title of the dialog displaying the timing diagnostics.
+			title=_("Timing Diagnostics"),
+		)
+
+		self.stageLabels: Dict[str, str] = {
+			# Translators: Stage of a question: wait in the queue before the question is sent.
+			"queueWait": _("Wait in the queue"),
+			# Translators: Stage of a question: download of the list of models.
+			"catalogue": _("Download of the models list"),
+			# Translators: Stage of a question: choice of a free model.
+			"modelSelection": _("Model selection"),
+			# Translators: Stage of a question: opening of a connection to OpenRouter.
+			"connect": _("Connection"),
+			# Translators: Stage of a question: time until the model starts answering.
+			"firstByte": _("Time to first byte"),
+			# Translators: Stage of a question: duration of a request to a model.
+			"response": _("Model response"),
+			# Translators: Stage of a question: wait before trying another model.
+			"retryWait": _("Wait before retrying"),
+			# Translators: Stage of a question: saving of the conversation.
+			"persistence": _("Saving the conversation"),
+			# Translators: Stage of a question: conversion of the answer from Markdown.
+			"markdown": _("Markdown conversion"),
+			# Translators: Stage of a question: display of the answer.
+			"display": _("Display"),
+			# Translators: Stage of a question: whole duration of the question.
+			"total": _("Whole question"),
+			# Translators: Background task: summary of the older part of a long chat.
+			"compaction": _("Summary of a long chat"),
+		}
+
+		mainSizer: wx.BoxSizer = wx.BoxSizer(wx.VERTICAL)
+		sHelper: gui.guiHelper.BoxSizerHelper = gui.guiHelper.BoxSizerHelper(
+			self,
+			wx.VERTICAL,
+		)
+
+		self.queueStatus: wx.StaticText = sHelper.addItem(wx.StaticText(self))
 
-		self.modelsData = models
+		self.stagesList: wx.ListCtrl = sHelper.addLabeledControl(
+			# Translators: Label of the list of timing statistics per stage.
+			_("&Stages (durations in milliseconds):"),
+			wx.ListCtrl,
+			style=wx.LC_REPORT | wx.LC_SINGLE_SEL,
+			size=(640, 260),
+		)
+		for index, (label, width) in enumerate(
+			(
+				# Translators: Header of the column containing the stages of the questions.
+				(_("Stage"), 200),
+				# Translators: Header of the column containing the number of measures of a stage.
+				(_("Count"), 70),
+				# Translators: Header of the column containing the average duration of a stage.
+				(_("Average"), 90),
+				# Translators: Header of the column containing the median duration of a stage.
+				(_("Median"), 90),
+				# Translators: Header of the column containing the 90th percentile of the durations of a stage.
+				(_("90th percentile"), 100),
+				# Translators: Header of the column containing the longest duration of a stage.
+				(_("Maximum"), 90),
+			),
+		):
+			self.stagesList.InsertColumn(index, label, width=width)
 
-		displayNames: List[str] = []
+		buttonGroup: gui.guiHelper.ButtonHelper = gui.guiHelper.ButtonHelper(wx.HORIZONTAL)
 
-		for m in models:
-			price: float = cast(float, m["promptPricing"])
-			priceLabel: str = "FREE" if price == 0 else f"{price}$"
-			displayNames.append(f"{m['id']} ({priceLabel})")
+		self.refreshButton: wx.Button = buttonGroup.addButton(
+			self,
+			# Translators: Label of the button updating the timing diagnostics.
+			label=_("&Refresh"),
+		)
 
-		self.modelsList.Set(displayNames)
+		self.clearButton: wx.Button = buttonGroup.addButton(
+			self,
+			# Translators: Label of the button removing the recorded timings.
+			label=_("C&lear"),
+		)
 
-		savedModel: str = config.conf["askOpenRouter"].get(
-			"selectedModel",
-			"",
+		self.closeButton: wx.Button = buttonGroup.addButton(
+			self,
+			# Translators: Label of the closing button.
+			label=_("&Close"),
 		)
 
-		for index, m in enumerate(models):
-			if m["id"] == savedModel:
-				self.modelsList.SetSelection(index)
-				break
+		self.SetEscapeId(self.closeButton.GetId())
 
-	def getApiKeyValue(self) -> str:
+		self.refreshButton.Bind(wx.EVT_BUTTON, self.onRefresh)
+		self.clearButton.Bind(wx.EVT_BUTTON, self.onClear)
+		self.Bind(wx.EVT_BUTTON, self.onClose, self.closeButton)
+		self.Bind(wx.EVT_CLOSE, self.onClose)
+
+		sHelper.addItem(buttonGroup)
+
+		mainSizer.Add(
+			sHelper.sizer,
+			border=gui.guiHelper.BORDER_FOR_DIALOGS,
+			flag=wx.ALL | wx.EXPAND,
+		)
+
+		self.SetSizerAndFit(mainSizer)
+		self.refresh()
+		self.stagesList.SetFocus()
+
+	def refresh(self) -> None:
 		"""
-		Return the currently entered API key.
+		Display the statistics of the recorded timings.
 
 		Returns:
-			str: API key value.
+			None
 		"""
-		if self.showApiKeyCheckBox.IsChecked():
-			return self.apiKeyVisible.GetValue()
-		return self.apiKeyHidden.GetValue()
+		queue: QueueStats = getWorker().getStats()
+		self.queueStatus.SetLabel(
+			# Translators: State of the queue of questions, in the timing diagnostics.
+			_(
+				"Questions waiting: {pending}, running: {running}. "
+				"Recent waits in the queue: {average:.0f} ms on average, {maximum:.0f} ms at most.",
+			).format(
+				pending=queue.pending,
+				running=queue.running,
+				average=queue.averageWait * 1000,
+				maximum=queue.maximumWait * 1000,
+			),
+		)
+
+		stages: List[StageStats] = getRecorder().aggregate()
+
+		self.stagesList.DeleteAllItems()
+		for stats in stages:
+			item: int = self.stagesList.InsertItem(
+				self.stagesList.GetItemCount(),
+				self.stageLabels.get(stats.stage, stats.stage),
+			)
+			self.stagesList.SetItem(item, 1, str(stats.count))
+			for column, value in enumerate((stats.mean, stats.median, stats.p90, stats.maximum), start=2):
+				self.stagesList.SetItem(item, column, f"{value * 1000:.0f}")
+
+		if stages:
+			self.stagesList.Select(0)
+			self.stagesList.Focus(0)
+		else:
+			self.stagesList.InsertItem(
+				0,
+				# Translators: Displayed in the timing diagnostics when no question was asked yet.
+				_("No question was asked since NVDA started."),
+			)
 
-	def onSave(self) -> None:
+	def onRefresh(self, evt: wx.CommandEvent) -> None:
 		"""
-		Save settings into NVDA configuration.
+		Update the displayed statistics.
 		"""
-		config.conf["askOpenRouter"]["apiKey"] = self.getApiKeyValue().strip()
+		self.refresh()
 
-		config.conf["askOpenRouter"]["fullHistory"] = self.fullHistoryCheckBox.GetValue()
-
-		config.conf["askOpenRouter"]["useAllModels"] = self.useAllModelsCheckBox.GetValue()
-
-		index: int = self.modelsList.GetSelection()
+	def onClear(self, evt: wx.CommandEvent) -> None:
+		"""
+		Remove the recorded timings.
+		"""
+		getRecorder().clear()
+		self.refresh()
 
-		if index != wx.NOT_FOUND and self.modelsData:
-			config.conf["askOpenRouter"]["selectedModel"] = self.modelsData[index]["id"]
+	def onClose(self, evt: wx.Event) -> None:
+		"""
+		Close the dialog and reset the singleton instance.
+		"""
+		DiagnosticsDialog._instance = None
+		self.Destroy()
@@ -10,30 +10,87 @@ import globalPluginHandler
 import globalVars
 import os
 import addonHandler
-import pickle
-import random
-import markdown
 import json
 import config
 import ui
 import gui
-import urllib.request
 import urllib.error
 import time
-from typing import List, Dict, Callable, Optional, Any
+import functools
+import io
+import threading
+from logHandler import log
+from typing import TYPE_CHECKING, List, Dict, Callable, Hashable, Iterator, Optional, Set, Tuple, Any
+from .worker import (
+	DEFAULT_MAX_CONCURRENT,
+	LATEST_CONVERSATION,
+	RequestJob,
+	getCurrentJob,
+	getWorker,
+	reportProgress,
+)
+from .diagnostics import getRecorder
+
+# The HTTP stack (http.client, ssl), SQLite and the other helper modules are only
+# imported by the functions using them, so that loading the add-on stays cheap
+if TYPE_CHECKING:
+	from .blacklist import ModelBlacklist
+	from .catalogue import ModelCatalogue, ModelIndex, ModelInfo
+	from .httpClient import CancelToken, OpenRouterClient
+	from .rendering import MarkdownRenderer, RenderPool
+	from .responseCache import ResponseCache
+	from .retryPolicy import Deadline, RetryPolicy
+	from .scoreboard import ModelScoreboard
+	from .sessions import ConversationSummary, SessionInfo, SessionStore
 
 addonHandler.initTranslation()
 
 
 _: Callable[[str], str]
 
-# Temporary in-memory blacklist for unavailable models
-_unavailableModels: Dict[str, float] = {}
+# Base URL of the OpenRouter API
+_API_URL: str = "https://openrouter.ai/api/v1"
 
-# Cooldowns (seconds)
+# Shared HTTP client holding the keep-alive connection pool
+_client: Optional["OpenRouterClient"] = None
+
+# Shared cache of the /models catalogue
+_catalogue: Optional["ModelCatalogue"] = None
+
+# Store of the named conversations, opened lazily
+_sessionStore: Optional["SessionStore"] = None
+_sessionStoreLock: threading.Lock = threading.Lock()
+
+# Optional on-disk cache of the answers, opened lazily
+_responseCache: Optional["ResponseCache"] = None
+
+# Latency and reliability statistics of the models
+_scoreboard: Optional["ModelScoreboard"] = None
+
+# Persistent blacklist of temporarily unavailable models, loaded lazily
+_unavailableModels: Optional["ModelBlacklist"] = None
+
+# Policy deciding whether and when failed requests are sent again, created on first use
+_retryPolicy: Optional["RetryPolicy"] = None
+
+# Free model chosen in advance for the next new chat, with the time it was chosen
+_preselectedModel: Optional[Tuple[str, float]] = None
+
+# Last warm-up job, to avoid queuing several of them
+_warmUpJob: Optional[RequestJob] = None
+
+# Conversations whose summary is being written
+_compactingSessions: Set[int] = set()
+_compactingSessionsLock: threading.Lock = threading.Lock()
+
+# Time (seconds) during which a model chosen in advance is used
+_PRESELECTION_MAX_AGE: float = 120.0
+
+# Default cooldowns (seconds), overridden by the add-on configuration
 _RATE_LIMIT_COOLDOWN: int = 300  # 429
 _POLICY_COOLDOWN: int = 180  # 404
 _PAYMENT_COOLDOWN: int = 1800  # 402
+_SERVER_ERROR_COOLDOWN: int = 60  # 408, 5xx, network errors and timeouts
 
 
 def disableInSecureMode(decoratedCls):
@@ -45,111 +102,392 @@ def disableInSecureMode(decoratedCls):
 	return decoratedCls
 
 
-def saveModel(model: str, filename: str) -> None:
+def getClient() -> "OpenRouterClient":
 	"""
-	Save the selected model identifier to a text file.
+	Return the shared OpenRouter HTTP client.
 
-	Args:
-		model (str): Model identifier to save.
-		filename (str): Destination file path.
+	The client is created on first use, and its pool size, idle timeout
+	and request timeouts follow the add-on configuration.
+
+	Returns:
+		OpenRouterClient: The shared client.
+	"""
+	from .httpClient import (
+		DEFAULT_CONNECT_TIMEOUT,
+		DEFAULT_FIRST_BYTE_TIMEOUT,
+		DEFAULT_READ_TIMEOUT,
+		OpenRouterClient,
+	)
+
+	global _client
+	conf = config.conf["askOpenRouter"]
+	poolSize: int = conf.get("connectionPoolSize", 4)
+	idleTimeout: int = conf.get("connectionIdleTimeout", 60)
+
+	if _client is None:
+		_client = OpenRouterClient(poolSize=poolSize, idleTimeout=idleTimeout)
+	elif _client.poolSize != poolSize or _client.idleTimeout != idleTimeout:
+		_client.configure(poolSize, idleTimeout)
+
+	_client.setTimeouts(
+		conf.get("connectTimeout", DEFAULT_CONNECT_TIMEOUT),
+		conf.get("firstByteTimeout", DEFAULT_FIRST_BYTE_TIMEOUT),
+		conf.get("streamIdleTimeout", DEFAULT_READ_TIMEOUT),
+	)
+	return _client
+
+
+def getScoreboard() -> "ModelScoreboard":
+	"""
+	Return the shared model scoreboard, persisted in the add-on data directory.
+
+	Returns:
+		ModelScoreboard: The shared scoreboard.
+	"""
+	from .scoreboard import ModelScoreboard
+
+	global _scoreboard
+	if _scoreboard is None:
+		_scoreboard = ModelScoreboard(os.path.join(getDataDir(), "scoreboard.json"))
+	return _scoreboard
+
+
+def terminate() -> None:
+	"""
+	Release the shared resources: close the HTTP client, the session
+	store and the response cache, save the scoreboard and stop the
+	rendering threads.
 
 	Returns:
 		None
 	"""
-	with open(filename, "w", encoding="utf-8") as f:
-		f.write(model)
+	from . import rendering
+
+	global _client, _sessionStore, _responseCache
+	if _client is not None:
+		_client.close()
+		_client = None
+	if _sessionStore is not None:
+		_sessionStore.close()
+		_sessionStore = None
+	if _responseCache is not None:
+		_responseCache.close()
+		_responseCache = None
+	if _scoreboard is not None:
+		_scoreboard.save()
+	rendering.terminate()
+
+
+def getDataDir() -> str:
+	"""
+	Return the add-on data directory inside the NVDA user configuration.
 
+	Unlike the add-on folder, this directory survives add-on updates.
+	It is created if needed.
 
-def loadModel(filename: str) -> str:
+	Returns:
+		str: Path to the data directory.
 	"""
-	Load a model identifier from a text file.
+	dataDir: str = os.path.join(globalVars.appArgs.configPath, "askOpenRouter")
+	os.makedirs(dataDir, exist_ok=True)
+	return dataDir
+
+
+def _fetchModels(
+	apiKey: str,
+	conditionalHeaders: Dict[str, str],
+	cancelToken: Optional["CancelToken"] = None,
+) -> Tuple[Optional[List[Dict[str, Any]]], Dict[str, str]]:
+	"""
+	Download the /models catalogue, possibly as a conditional request.
+
+	The catalogue is requested compressed and parsed while it is being
+	received, keeping only the fields used by the add-on.
 
 	Args:
-		filename (str): Path to the model file.
+		apiKey (str): OpenRouter API key.
+		conditionalHeaders (Dict[str, str]): If-None-Match / If-Modified-Since headers.
+		cancelToken (Optional[CancelToken], optional): Token allowing to abort the download.
+
+	Returns:
+		Tuple[Optional[List[Dict[str, Any]]], Dict[str, str]]:
+			The model entries (None if not modified) and the response validators.
+
+	Raises:
+		urllib.error.URLError: If network request fails.
+		urllib.error.HTTPError: If API request fails.
+		RequestCancelled: If the download is cancelled.
+	"""
+	from .modelsParser import ACCEPT_ENCODING, parseModels
+
+	modelsURL: str = f"{_API_URL}/models"
+
+	headers: Dict[str, str] = {
+		"Authorization": f"Bearer {apiKey}",
+		"User-Agent": "Python-urllib",
+		"Accept-Encoding": ACCEPT_ENCODING,
+	}
+	headers.update(conditionalHeaders)
+
+	with (
+		getRecorder().span("catalogue"),
+		getClient().request("GET", modelsURL, headers=headers, cancelToken=cancelToken) as response,
+	):
+		if response.status == 304:
+			response.read()
+			return None, {}
+		try:
+			models: List[Dict[str, Any]] = parseModels(
+				response.read,
+				response.headers.get("Content-Encoding", ""),
+			)
+		except ValueError as e:
+			raise urllib.error.URLError(e) from e
+		validators: Dict[str, str] = {}
+		if response.headers.get("ETag"):
+			validators["etag"] = response.headers["ETag"]
+		if response.headers.get("Last-Modified"):
+			validators["lastModified"] = response.headers["Last-Modified"]
+
+	return models, validators
+
+
+def getCatalogue() -> "ModelCatalogue":
+	"""
+	Return the shared model catalogue cache.
+
+	The cache is persisted in the add-on data directory, and its TTL
+	follows the add-on configuration.
 
 	Returns:
-		str: Model identifier if the file exists, otherwise an empty string.
+		ModelCatalogue: The shared catalogue.
 	"""
-	if os.path.exists(filename):
-		with open(filename, "r", encoding="utf-8") as f:
-			return f.read()
-	return ""
+	from .catalogue import ModelCatalogue
 
+	global _catalogue
+	if _catalogue is None:
+		_catalogue = ModelCatalogue(
+			_fetchModels,
+			cacheFile=os.path.join(getDataDir(), "models.json"),
+		)
+	_catalogue.ttl = config.conf["askOpenRouter"].get("modelCacheTTL", 600)
+	return _catalogue
+
+
+def getSessionStore() -> "SessionStore":
+	"""
+	Return the shared store of named conversations.
 
-def saveHistory(history: List[Dict[str, str]], filename: str) -> None:
+	The store lives in the add-on data directory. When it is first opened,
+	the single conversation kept by older versions in the add-on folder
+	is imported into it.
+
+	Returns:
+		SessionStore: The shared session store.
 	"""
-	Serialize and save conversation history to disk.
+	from .sessions import SessionStore
+
+	global _sessionStore
+	with _sessionStoreLock:
+		if _sessionStore is None:
+			store = SessionStore(os.path.join(getDataDir(), "sessions.db"))
+			_migrateLegacyHistory(store)
+			_sessionStore = store
+		return _sessionStore
+
+
+def getResponseCache() -> Optional["ResponseCache"]:
+	"""
+	Return the shared response cache, if it is enabled.
+
+	The cache is stored in the add-on data directory, and its size and
+	age limits follow the add-on configuration.
+
+	Returns:
+		Optional[ResponseCache]: The cache, or None if the useResponseCache option is disabled.
+	"""
+	from .responseCache import ResponseCache
+
+	global _responseCache
+	conf = config.conf["askOpenRouter"]
+	if not conf.get("useResponseCache", False):
+		return None
+	if _responseCache is None:
+		_responseCache = ResponseCache(os.path.join(getDataDir(), "responses.db"))
+	_responseCache.maxBytes = conf.get("responseCacheSize", 20) * 1024 * 1024
+	_responseCache.maxAge = conf.get("responseCacheMaxAge", 168) * 3600.0
+	return _responseCache
+
+
+def appendHistory(messages: List[Dict[str, str]], sessionId: int) -> None:
+	"""
+	Append new messages to a stored conversation.
+
+	The messages are written in a single transaction, so the cost does
+	not depend on the size of the conversation.
 
 	Args:
-		history (List[Dict[str, str]]): Conversation messages.
-		filename (str): Destination file path.
+		messages (List[Dict[str, str]]): Messages to append.
+		sessionId (int): Conversation identifier.
 
 	Returns:
 		None
 	"""
-	with open(filename, "wb") as f:
-		pickle.dump(history, f)
+	getSessionStore().appendMessages(sessionId, messages)
 
 
-def loadHistory(filename: str) -> List[Dict[str, str]]:
+def loadHistory(sessionId: int) -> List[Dict[str, str]]:
 	"""
-	Load serialized conversation history from disk.
+	Load the messages of a stored conversation.
 
 	Args:
-		filename (str): Path to history file.
+		sessionId (int): Conversation identifier.
 
 	Returns:
-		List[Dict[str, str]]: Loaded conversation history, or an empty list.
+		List[Dict[str, str]]: Conversation history, or an empty list.
 	"""
-	if os.path.exists(filename):
-		with open(filename, "rb") as f:
-			return pickle.load(f)
-	return []
+	return getSessionStore().loadMessages(sessionId)
 
 
-def _cleanupUnavailableModels() -> None:
+def _migrateLegacyHistory(store: "SessionStore") -> None:
 	"""
-	Remove expired entries from the temporary model blacklist.
+	Import the conversation saved by older versions in the add-on folder.
+
+	The pickled history is imported along with the model file. The legacy
+	files are removed once imported.
+
+	Args:
+		store (SessionStore): Store receiving the conversation.
 
 	Returns:
 		None
 	"""
-	currentTime: float = time.time()
+	from .sessions import makeSessionName
 
-	expired = [model for model, expiry in _unavailableModels.items() if currentTime > expiry]
+	addonPath: str = addonHandler.getCodeAddon().path
+	pickleFile: str = os.path.join(addonPath, "open_router_history.pkl")
+	modelFile: str = os.path.join(addonPath, "model.txt")
+	legacyFiles: List[str] = [path for path in (pickleFile, modelFile) if os.path.exists(path)]
 
-	for model in expired:
-		del _unavailableModels[model]
+	if not legacyFiles:
+		return
+
+	try:
+		history: List[Dict[str, str]] = []
+		if os.path.exists(pickleFile):
+			import pickle
+
+			with open(pickleFile, "rb") as f:
+				history = pickle.load(f)
+
+		model: str = ""
+		if os.path.exists(modelFile):
+			with open(modelFile, "r", encoding="utf-8") as f:
+				model = f.read().strip()
+
+		if history:
+			firstQuestion: str = next((m["content"] for m in history if m.get("role") == "user"), "")
+			# Translators: Name given to the conversation imported from a previous version of the add-on.
+			name: str = makeSessionName(firstQuestion) or _("Previous chat")
+			sessionId: int = store.createSession(name, model)
+			store.appendMessages(sessionId, history)
+
+		for path in legacyFiles:
+			os.remove(path)
+	except Exception:
+		log.error("askOpenRouter: could not migrate the previous history", exc_info=True)
+
+
+def getBlacklist() -> "ModelBlacklist":
+	"""
+	Return the blacklist of temporarily unavailable models.
+
+	The blacklist is persisted in the add-on data directory, so models
+	which recently failed are not picked again after an NVDA restart.
+
+	Returns:
+		ModelBlacklist: The shared blacklist.
+	"""
+	from .blacklist import ModelBlacklist
+
+	global _unavailableModels
+	if _unavailableModels is None:
+		_unavailableModels = ModelBlacklist(os.path.join(getDataDir(), "blacklist.json"))
+	return _unavailableModels
+
+
+def _cleanupUnavailableModels() -> None:
+	"""
+	Remove expired entries from the temporary model blacklist.
+
+	Returns:
+		None
+	"""
+	getBlacklist().cleanup()
 
 
 def _markModelUnavailable(model: str, errorCode: int) -> None:
 	"""
 	Mark a model as temporarily unavailable based on error code.
 
+	The cooldowns come from the rateLimitCooldown, policyCooldown and
+	paymentCooldown settings; models failing with a server error or not
+	answering in time use the serverErrorCooldown setting. Network errors
+	are not the model's fault and must not be passed here.
+
 	Args:
 		model (str): Model identifier.
-		errorCode (int): HTTP error code received.
+		errorCode (int): HTTP error code received, or 0 for a model which did not answer in time.
 
 	Returns:
 		None
 	"""
-	currentTime: float = time.time()
+	conf = config.conf["askOpenRouter"]
 
 	if errorCode == 429:
-		cooldown = _RATE_LIMIT_COOLDOWN
+		cooldown = conf.get("rateLimitCooldown", _RATE_LIMIT_COOLDOWN)
 	elif errorCode == 404:
-		cooldown = _POLICY_COOLDOWN
+		cooldown = conf.get("policyCooldown", _POLICY_COOLDOWN)
 	elif errorCode == 402:
-		cooldown = _PAYMENT_COOLDOWN
+		cooldown = conf.get("paymentCooldown", _PAYMENT_COOLDOWN)
 	else:
-		cooldown = _RATE_LIMIT_COOLDOWN
+		cooldown = conf.get("serverErrorCooldown", _SERVER_ERROR_COOLDOWN)
+
+	getBlacklist().add(model, cooldown)
 
-	_unavailableModels[model] = currentTime + cooldown
 
+def getRetryPolicy() -> "RetryPolicy":
+	"""
+	Return the policy deciding whether and when failed requests are sent again.
 
-def getRandomFreeModel(apiKey: str) -> str:
+	Returns:
+		RetryPolicy: The current retry policy.
 	"""
-	Retrieve a random free model from OpenRouter.
+	from .retryPolicy import BackoffRetryPolicy
+
+	global _retryPolicy
+	if _retryPolicy is None:
+		_retryPolicy = BackoffRetryPolicy()
+	return _retryPolicy
+
+
+def setRetryPolicy(policy: "RetryPolicy") -> None:
+	"""
+	Replace the retry policy, for example with a custom backoff.
+
+	Args:
+		policy (RetryPolicy): The new policy.
+
+	Returns:
+		None
+	"""
+	global _retryPolicy
+	_retryPolicy = policy
+
+
+def getFreeModelCandidates(apiKey: str, cancelToken: Optional["CancelToken"] = None) -> List[str]:
+	"""
+	List the free models which can currently be used.
 
 	Filters:
 		- Zero pricing (prompt and completion)
@@ -159,62 +497,59 @@ def getRandomFreeModel(apiKey: str) -> str:
 
 	Args:
 		apiKey (str): OpenRouter API key.
+		cancelToken (Optional[CancelToken], optional): Token allowing to abort the catalogue download.
 
 	Returns:
-		str: A valid free model identifier.
+		List[str]: Identifiers of the usable free models.
 
 	Raises:
-		RuntimeError: If no free model is currently available.
 		urllib.error.URLError: If network request fails.
+		RequestCancelled: If the catalogue download is cancelled.
 	"""
 	_cleanupUnavailableModels()
 
-	modelsURL: str = "https://openrouter.ai/api/v1/models"
+	index: "ModelIndex" = getCatalogue().getIndex(apiKey, cancelToken)
+	blacklist: "ModelBlacklist" = getBlacklist()
+
+	return [modelId for modelId in index.freeModels if modelId not in blacklist]
 
-	headers: Dict[str, str] = {
-		"Authorization": f"Bearer {apiKey}",
-		"User-Agent": "Python-urllib",
-	}
 
-	req = urllib.request.Request(modelsURL, headers=headers, method="GET")
+def getRandomFreeModel(apiKey: str, cancelToken: Optional["CancelToken"] = None) -> str:
+	"""
+	Retrieve a free model from the cached OpenRouter catalogue.
 
-	with urllib.request.urlopen(req) as response:
-		data = json.loads(response.read().decode("utf-8"))
+	Candidates are the models returned by getFreeModelCandidates. The
+	choice is random, weighted by the scoreboard so that fast and
+	reliable models are favoured.
 
-	models = data["data"]
+	Args:
+		apiKey (str): OpenRouter API key.
+		cancelToken (Optional[CancelToken], optional): Token allowing to abort the catalogue download.
+
+	Returns:
+		str: A valid free model identifier.
 
-	candidates: List[str] = [
-		m["id"]
-		for m in models
-		if float(m.get("pricing", {}).get("prompt", 1)) == 0
-		and float(m.get("pricing", {}).get("completion", 1)) == 0
-		and not m.get("deprecated", False)
-		and m.get("top_provider")
-		and m.get("context_length")
-		and m["id"] not in _unavailableModels
-	]
+	Raises:
+		RuntimeError: If no free model is currently available.
+		urllib.error.URLError: If network request fails.
+		RequestCancelled: If the catalogue download is cancelled.
+	"""
+	candidates: List[str] = getFreeModelCandidates(apiKey, cancelToken)
 
 	if not candidates:
 		# Translators: Message informing that no free model is available.
 		raise RuntimeError(_("No free model currently available."))
 
-	return random.choice(candidates)
+	return getScoreboard().choose(candidates)
 
 
-def getAvailableModels(apiKey: str) -> List[Dict[str, object]]:
+def getAvailableModels(apiKey: str, sortBy: Optional[str] = None) -> Tuple["ModelInfo", ...]:
 	"""
 	Retrieve the full list of available models for the current user.
 
-	This function queries the OpenRouter API and returns all models
-	accessible with the provided API key, including both free and
-	paid models.
-
-	Each returned entry contains:
-		- id (str): Model identifier
-		- promptPricing (float): Cost per prompt token
-		- completionPricing (float): Cost per completion token
-		- contextLength (int): Maximum context length
-		- deprecated (bool): Whether the model is deprecated
+	This function reads the indexed OpenRouter model catalogue and
+	returns all models accessible with the provided API key, including
+	both free and paid models.
 
 	Filters:
 		- Excludes deprecated models
@@ -222,51 +557,357 @@ def getAvailableModels(apiKey: str) -> List[Dict[str, object]]:
 
 	Args:
 		apiKey (str): OpenRouter API key.
+		sortBy (Optional[str], optional): Precomputed order (catalogue.SORT_BY_*),
+			defaults to the catalogue order.
 
 	Returns:
-		List[Dict[str, object]]: List of available model metadata.
+		Tuple[ModelInfo, ...]: The available models.
 
 	Raises:
 		urllib.error.URLError: If network request fails.
 		urllib.error.HTTPError: If API request fails.
 	"""
-	modelsURL: str = "https://openrouter.ai/api/v1/models"
+	index: "ModelIndex" = getCatalogue().getIndex(apiKey)
+	if sortBy:
+		return index.sortedBy(sortBy)
+	return index.available
 
-	headers: Dict[str, str] = {
+
+def getModelContextLength(
+	apiKey: str,
+	model: str,
+	cancelToken: Optional["CancelToken"] = None,
+) -> Optional[int]:
+	"""
+	Return the context length of a model, as published in the catalogue.
+
+	Args:
+		apiKey (str): OpenRouter API key.
+		model (str): Model identifier.
+		cancelToken (Optional[CancelToken], optional): Token allowing to abort the catalogue download.
+
+	Returns:
+		Optional[int]: The context length in tokens, or None if unknown.
+
+	Raises:
+		RequestCancelled: If the catalogue download is cancelled.
+	"""
+	try:
+		info: Optional["ModelInfo"] = getCatalogue().getIndex(apiKey, cancelToken).get(model)
+	except urllib.error.URLError:
+		return None
+
+	if info is None or not info.contextLength:
+		return None
+	return info.contextLength
+
+
+def budgetHistory(
+	history: List[Dict[str, str]],
+	model: str,
+	apiKey: str,
+	cancelToken: Optional["CancelToken"] = None,
+) -> List[Dict[str, str]]:
+	"""
+	Select the part of the history to send so that it fits the model context.
+
+	The budget is a share of the model context length, further limited by
+	the maxHistoryTokens setting when it is not zero. The newest question
+	is always kept, and older turns are dropped first.
+
+	Args:
+		history (List[Dict[str, str]]): Full conversation history.
+		model (str): Model identifier.
+		apiKey (str): OpenRouter API key.
+		cancelToken (Optional[CancelToken], optional): Token allowing to abort the catalogue download.
+
+	Returns:
+		List[Dict[str, str]]: Messages to send.
+
+	Raises:
+		RequestCancelled: If the catalogue download is cancelled.
+	"""
+	from .budget import computeBudget, fitHistory
+
+	maxTokens: int = config.conf["askOpenRouter"].get("maxHistoryTokens", 0)
+	budget: Optional[int] = computeBudget(getModelContextLength(apiKey, model, cancelToken), maxTokens)
+	messages: List[Dict[str, str]] = fitHistory(history, budget)
+
+	if len(messages) < len(history):
+		log.debug(
+			f"askOpenRouter: sending {len(messages)} of {len(history)} messages to {model} (budget {budget} tokens)",
+		)
+
+	return messages
+
+
+def _makeChatHeaders(apiKey: str) -> Dict[str, str]:
+	"""
+	Return the headers of a chat completion request.
+
+	Args:
+		apiKey (str): OpenRouter API key.
+
+	Returns:
+		Dict[str, str]: The headers.
+	"""
+	return {
 		"Authorization": f"Bearer {apiKey}",
-		"User-Agent": "Python-urllib",
+		"Content-Type": "application/json",
+		"HTTP-Referer": "http://localhost",
+		"X-Title": "My question",
 	}
 
-	req = urllib.request.Request(modelsURL, headers=headers, method="GET")
 
-	with urllib.request.urlopen(req) as response:
-		data = json.loads(response.read().decode("utf-8"))
+def _probeModel(apiKey: str, model: str) -> bool:
+	"""
+	Check that a model answers, with a request of a single token.
+
+	A model answering with an error meaning it is unavailable is blacklisted.
+
+	Args:
+		apiKey (str): OpenRouter API key.
+		model (str): Model identifier.
 
-	models = data.get("data", [])
+	Returns:
+		bool: True if the model answered.
+	"""
+	from .retryPolicy import MODEL_UNAVAILABLE_CODES
 
-	availableModels: List[Dict[str, object]] = []
+	data: Dict[str, Any] = {
+		"model": model,
+		"messages": [{"role": "user", "content": "Hi"}],
+		"max_tokens": 1,
+	}
+	try:
+		_sendRequest(f"{_API_URL}/chat/completions", _makeChatHeaders(apiKey), data)
+	except urllib.error.HTTPError as e:
+		if e.code in MODEL_UNAVAILABLE_CODES:
+			_markModelUnavailable(model, e.code)
+		return False
+	except (urllib.error.URLError, KeyError, IndexError, ValueError):
+		return False
+	return True
+
+
+def warmUp(apiKey: str, chooseModel: bool = True) -> None:
+	"""
+	Prepare the next question while the user is typing it.
 
-	for m in models:
-		if m.get("deprecated", False):
-			continue
+	Opens a connection to OpenRouter, refreshes the catalogue if it is
+	stale and, for a new chat with free models, chooses the model in
+	advance, optionally checking that it answers (probeModelOnWarmUp
+	setting). Failures are only logged: the question will redo the
+	missing steps.
 
-		if not m.get("top_provider") or not m.get("context_length"):
-			continue
+	Args:
+		apiKey (str): OpenRouter API key.
+		chooseModel (bool, optional): Whether to choose a free model in advance.
 
-		availableModels.append(
-			{
-				"id": m.get("id"),
-				"promptPricing": float(m.get("pricing", {}).get("prompt", 0)),
-				"completionPricing": float(m.get("pricing", {}).get("completion", 0)),
-				"contextLength": m.get("context_length"),
-				"deprecated": m.get("deprecated", False),
-			},
-		)
+	Returns:
+		None
+	"""
+	global _preselectedModel
+	conf = config.conf["askOpenRouter"]
+	try:
+		getClient().preconnect(_API_URL)
+		getCatalogue().getIndex(apiKey)
+		if not chooseModel or (conf.get("useAllModels", False) and conf.get("selectedModel", "")):
+			return
+		model: str = getRandomFreeModel(apiKey)
+		if conf.get("probeModelOnWarmUp", False) and not _probeModel(apiKey, model):
+			model = getRandomFreeModel(apiKey)
+		_preselectedModel = (model, time.monotonic())
+	except (urllib.error.URLError, RuntimeError):
+		log.debugWarning("askOpenRouter: warm-up failed", exc_info=True)
+
+
+def startWarmUp(chooseModel: bool = True) -> None:
+	"""
+	Queue a warm-up on the request worker, as background work.
+
+	Nothing is done when warm-up is disabled, when no API key is
+	configured, or when a warm-up is already queued or running.
+
+	Args:
+		chooseModel (bool, optional): Whether to choose a free model in advance.
+
+	Returns:
+		None
+	"""
+	global _warmUpJob
+	conf = config.conf["askOpenRouter"]
+	apiKey: str = conf.get("apiKey", "").strip()
+	if not conf.get("warmUp", True) or not apiKey:
+		return
+	if _warmUpJob is not None and _warmUpJob.state in (RequestJob.PENDING, RequestJob.RUNNING):
+		return
+	_warmUpJob = getWorker().submit(
+		RequestJob(
+			warmUp,
+			apiKey,
+			chooseModel=chooseModel,
+			description="warmUp",
+			priority=RequestJob.BACKGROUND,
+		),
+	)
+
+
+def _takePreselectedModel() -> str:
+	"""
+	Return the free model chosen in advance, if it is still recent and usable.
+
+	The model is only used once.
+
+	Returns:
+		str: The model identifier, or an empty string.
+	"""
+	global _preselectedModel
+	preselected: Optional[Tuple[str, float]] = _preselectedModel
+	_preselectedModel = None
+	if preselected is None:
+		return ""
+	model, chosenAt = preselected
+	if time.monotonic() - chosenAt > _PRESELECTION_MAX_AGE or model in getBlacklist():
+		return ""
+	return model
+
+
+def compactConversation(sessionId: int, apiKey: str) -> None:
+	"""
+	Summarise the older messages of a long conversation.
 
-	return availableModels
+	The summary is written by the model of the summaryModel setting, or
+	by a free model, and stored next to the messages, which are kept.
+	The following questions send the summary instead of the messages it
+	covers. Failures are only logged: the messages are then sent as they
+	are.
 
+	Args:
+		sessionId (int): Conversation identifier.
+		apiKey (str): OpenRouter API key.
 
-def _sendRequest(url: str, headers: Dict[str, str], data: Dict) -> str:
+	Returns:
+		None
+	"""
+	from .budget import computeBudget, estimateTokens
+	from .compaction import (
+		DEFAULT_KEEP_RECENT,
+		DEFAULT_THRESHOLD,
+		SUMMARY_REQUEST_OVERHEAD,
+		applySummary,
+		buildSummaryRequest,
+		needsCompaction,
+		selectMessagesToSummarise,
+	)
+
+	conf = config.conf["askOpenRouter"]
+	store: "SessionStore" = getSessionStore()
+	try:
+		history: List[Dict[str, str]] = store.loadMessages(sessionId)
+		summary: Optional["ConversationSummary"] = store.getSummary(sessionId)
+		if not needsCompaction(
+			applySummary(history, summary),
+			conf.get("compactionThreshold", DEFAULT_THRESHOLD),
+		):
+			return
+
+		model: str = conf.get("summaryModel", "") or getRandomFreeModel(apiKey)
+		previousSummary: Optional[str] = summary.content if summary is not None else None
+		coveredCount: int = summary.coveredCount if summary is not None else 0
+
+		budget: Optional[int] = computeBudget(getModelContextLength(apiKey, model))
+		if budget is not None:
+			budget -= SUMMARY_REQUEST_OVERHEAD
+			if previousSummary:
+				budget -= estimateTokens({"role": "user", "content": previousSummary})
+
+		end: int = selectMessagesToSummarise(history, coveredCount, DEFAULT_KEEP_RECENT, budget)
+		if end <= coveredCount:
+			return
+
+		data: Dict[str, Any] = {
+			"model": model,
+			"messages": buildSummaryRequest(history[coveredCount:end], previousSummary),
+		}
+		with getRecorder().span("compaction", model):
+			content: str = _sendRequest(f"{_API_URL}/chat/completions", _makeChatHeaders(apiKey), data)
+
+		if content and content.strip():
+			store.setSummary(sessionId, content.strip(), end, model)
+			log.debug(f"askOpenRouter: conversation {sessionId} summarised up to message {end} by {model}")
+	except (urllib.error.URLError, RuntimeError, KeyError, IndexError, ValueError):
+		log.debugWarning(f"askOpenRouter: could not summarise conversation {sessionId}", exc_info=True)
+	finally:
+		with _compactingSessionsLock:
+			_compactingSessions.discard(sessionId)
+
+
+def scheduleCompaction(sessionId: int, apiKey: str) -> None:
+	"""
+	Queue the summary of a conversation on the request worker, as background work.
+
+	Nothing is done when a summary of the conversation is already queued or being written.
+
+	Args:
+		sessionId (int): Conversation identifier.
+		apiKey (str): OpenRouter API key.
+
+	Returns:
+		None
+	"""
+	with _compactingSessionsLock:
+		if sessionId in _compactingSessions:
+			return
+		_compactingSessions.add(sessionId)
+	getWorker().submit(
+		RequestJob(
+			compactConversation,
+			sessionId,
+			apiKey,
+			description="compaction",
+			priority=RequestJob.BACKGROUND,
+		),
+	)
+
+
+def _recordOutcome(
+	model: str,
+	status: int,
+	startTime: float,
+	ttfb: Optional[float],
+	scored: bool = True,
+) -> None:
+	"""
+	Record the outcome of a chat completion request in the scoreboard
+	and its timings in the diagnostics.
+
+	Args:
+		model (str): Model identifier.
+		status (int): HTTP status code, or 0 for a network error.
+		startTime (float): Monotonic time at which the request was sent.
+		ttfb (Optional[float]): Time to first byte, if it was received.
+		scored (bool, optional): Whether the outcome counts in the scoreboard;
+			failures which are not the model's fault only go to the diagnostics.
+
+	Returns:
+		None
+	"""
+	latency: Optional[float] = time.monotonic() - startTime if 200 <= status < 300 else None
+	if scored:
+		getScoreboard().record(model, status, ttfb=ttfb, latency=latency)
+	recorder = getRecorder()
+	if ttfb is not None:
+		recorder.record("firstByte", ttfb, model)
+	recorder.record("response", time.monotonic() - startTime, f"{model} status={status}")
+
+
+def _sendRequest(
+	url: str,
+	headers: Dict[str, str],
+	data: Dict,
+	cancelToken: Optional["CancelToken"] = None,
+) -> str:
 	"""
 	Send an HTTP POST request to OpenRouter.
 
@@ -274,6 +915,7 @@ def _sendRequest(url: str, headers: Dict[str, str], data: Dict) -> str:
 		url (str): Endpoint URL.
 		headers (Dict[str, str]): HTTP headers.
 		data (Dict): JSON payload.
+		cancelToken (Optional[CancelToken], optional): Token allowing to abort the request.
 
 	Returns:
 		str: Assistant response text.
@@ -281,23 +923,327 @@ def _sendRequest(url: str, headers: Dict[str, str], data: Dict) -> str:
 	Raises:
 		urllib.error.HTTPError: If HTTP request fails.
 		urllib.error.URLError: If network error occurs.
+		RequestCancelled: If the request is cancelled.
 	"""
-	body: bytes = json.dumps(data).encode("utf-8")
-	req = urllib.request.Request(url=url, data=body, headers=headers, method="POST")
-
-	with urllib.request.urlopen(req) as response:
-		responseData = response.read()
+	from .retryPolicy import isModelError
 
+	body: bytes = json.dumps(data).encode("utf-8")
+	startTime: float = time.monotonic()
+	ttfb: Optional[float] = None
+
+	try:
+		with getClient().request(
+			"POST",
+			url,
+			headers=headers,
+			body=body,
+			cancelToken=cancelToken,
+		) as response:
+			ttfb = time.monotonic() - startTime
+			responseData = response.read()
+	except urllib.error.HTTPError as e:
+		_recordOutcome(data["model"], e.code, startTime, ttfb, scored=isModelError(e))
+		raise
+	except urllib.error.URLError as e:
+		_recordOutcome(data["model"], 0, startTime, ttfb, scored=isModelError(e))
+		raise
+
+	_recordOutcome(data["model"], 200, startTime, ttfb)
 	result = json.loads(responseData.decode("utf-8"))
 	return result["choices"][0]["message"]["content"]
 
 
+def _sendHedgedRequest(
+	url: str,
+	headers: Dict[str, str],
+	history: List[Dict[str, str]],
+	apiKey: str,
+	model: str,
+	count: int,
+	delay: float,
+	consumer: Optional["_SpeechStreamConsumer"] = None,
+	cancelToken: Optional["CancelToken"] = None,
+) -> Tuple[str, str]:
+	"""
+	Send the question to several free models at once and keep the first answer.
+
+	The current model is raced against other free candidates. When
+	streaming, the first model to produce a token wins; otherwise the
+	first complete answer wins. The other requests are cancelled.
+
+	Args:
+		url (str): Endpoint URL.
+		headers (Dict[str, str]): HTTP headers.
+		history (List[Dict[str, str]]): Full conversation history.
+		apiKey (str): OpenRouter API key.
+		model (str): Preferred model, always part of the race.
+		count (int): Maximum number of models raced.
+		delay (float): Seconds before starting the next candidate; 0 starts all at once.
+		consumer (Optional[_SpeechStreamConsumer], optional): Stream consumer, enabling streaming.
+		cancelToken (Optional[CancelToken], optional): Token aborting every attempt.
+
+	Returns:
+		Tuple[str, str]: The winning model and its answer.
+
+	Raises:
+		urllib.error.HTTPError: The error of the preferred model if every attempt failed.
+		urllib.error.URLError: If network error occurs on every attempt.
+		RequestCancelled: If the question is cancelled.
+	"""
+	from .httpClient import RequestCancelled
+	from .hedging import HedgedRace, HedgedRequestError
+
+	others: List[str] = [m for m in getFreeModelCandidates(apiKey, cancelToken) if m != model]
+	candidates: List[str] = [model] + getScoreboard().chooseMany(others, count - 1)
+	requestId: Optional[int] = getRecorder().currentRequest
+
+	def send(candidate: str, token: "CancelToken", claim: Callable[[], bool]) -> str:
+		# Timings of the attempts belong to the question being asked
+		getRecorder().setCurrentRequest(requestId)
+		data: Dict[str, Any] = {
+			"model": candidate,
+			"messages": budgetHistory(history, candidate, apiKey, cancelToken),
+		}
+		if consumer is None:
+			return _sendRequest(url, headers, data, cancelToken=token)
+
+		def onToken(text: str) -> None:
+			if not claim():
+				token.cancel()
+				raise RequestCancelled()
+			consumer.feed(text)
+
+		return _sendStreamingRequest(url, headers, data, onToken, cancelToken=token)
+
+	try:
+		return HedgedRace(send, delay=delay, cancelToken=cancelToken).run(candidates)
+	except HedgedRequestError as e:
+		primaryError: Optional[BaseException] = None
+		for candidate, error in e.errors:
+			if isinstance(error, urllib.error.HTTPError) and error.code in (402, 404, 429):
+				_markModelUnavailable(candidate, error.code)
+			if candidate == model or primaryError is None:
+				primaryError = error
+		if primaryError is None:
+			raise urllib.error.URLError("all hedged requests were cancelled")
+		raise primaryError
+
+
+def _iterServerSentEvents(response: Any) -> Iterator[str]:
+	"""
+	Yield the data payload of each server-sent event read from a response.
+
+	Lines are read incrementally, so events are available as soon as
+	the server flushes them. Comment lines (starting with a colon),
+	used by OpenRouter as keep-alive, are ignored.
+
+	Args:
+		response (Any): File-like HTTP response object.
+
+	Yields:
+		str: Data payload of each event.
+	"""
+	dataLines: List[str] = []
+
+	for rawLine in response:
+		line: str = rawLine.decode("utf-8").rstrip("\r\n")
+
+		if not line:
+			if dataLines:
+				yield "\n".join(dataLines)
+				dataLines = []
+			continue
+
+		if line.startswith(":"):
+			continue
+
+		field, _sep, value = line.partition(":")
+		if field == "data":
+			dataLines.append(value[1:] if value.startswith(" ") else value)
+
+	if dataLines:
+		yield "\n".join(dataLines)
+
+
+def _sendStreamingRequest(
+	url: str,
+	headers: Dict[str, str],
+	data: Dict,
+	onToken: Callable[[str], None],
+	cancelToken: Optional["CancelToken"] = None,
+) -> str:
+	"""
+	Send a streaming chat completion request to OpenRouter.
+
+	The request is sent with "stream" enabled and the server-sent event
+	stream is parsed incrementally. Each content delta is passed to
+	the consumer callback as soon as it arrives.
+
+	Args:
+		url (str): Endpoint URL.
+		headers (Dict[str, str]): HTTP headers.
+		data (Dict): JSON payload.
+		onToken (Callable[[str], None]): Consumer called with each content delta.
+		cancelToken (Optional[CancelToken], optional): Token allowing to abort the request.
+
+	Returns:
+		str: The fully assembled assistant response text.
+
+	Raises:
+		urllib.error.HTTPError: If HTTP request fails, or if the stream reports an error.
+		urllib.error.URLError: If network error occurs.
+		RequestCancelled: If the request is cancelled.
+	"""
+	from .retryPolicy import isModelError
+
+	payload: Dict[str, Any] = dict(data, stream=True)
+	body: bytes = json.dumps(payload).encode("utf-8")
+	parts: List[str] = []
+	startTime: float = time.monotonic()
+	ttfb: Optional[float] = None
+
+	try:
+		with getClient().request(
+			"POST",
+			url,
+			headers=headers,
+			body=body,
+			cancelToken=cancelToken,
+		) as response:
+			for event in _iterServerSentEvents(response):
+				if event == "[DONE]":
+					# Drain the end of the stream so the connection can be reused
+					response.read()
+					break
+
+				chunk = json.loads(event)
+
+				if "error" in chunk:
+					error = chunk["error"]
+					code = error.get("code")
+					raise urllib.error.HTTPError(
+						url,
+						code if isinstance(code, int) else 500,
+						error.get("message", ""),
+						response.headers,
+						io.BytesIO(event.encode("utf-8")),
+					)
+
+				choices = chunk.get("choices") or []
+				if not choices:
+					continue
+
+				token: Optional[str] = choices[0].get("delta", {}).get("content")
+				if token:
+					if ttfb is None:
+						ttfb = time.monotonic() - startTime
+					parts.append(token)
+					onToken(token)
+	except urllib.error.HTTPError as e:
+		_recordOutcome(data["model"], e.code, startTime, ttfb, scored=isModelError(e))
+		raise
+	except urllib.error.URLError as e:
+		_recordOutcome(data["model"], 0, startTime, ttfb, scored=isModelError(e))
+		raise
+
+	_recordOutcome(data["model"], 200, startTime, ttfb)
+	return "".join(parts)
+
+
+class _SpeechStreamConsumer:
+	"""
+	Speak a streamed answer sentence by sentence as tokens arrive.
+
+	Tokens are buffered until a sentence boundary is seen, then the
+	completed text is spoken with light Markdown markup removed. The
+	progress message of the job is cleared on the first token, so that the
+	worker does not repeat it in the middle of the answer.
+
+	Attributes:
+		spoken (bool): Whether part of the answer has already been spoken.
+	"""
+
+	_BOUNDARIES: str = ".!?:\n"
+
+	def __init__(self) -> None:
+		self._buffer: str = ""
+		self.spoken: bool = False
+		# Hedged requests feed the consumer from their own threads
+		self._job: Optional[RequestJob] = getCurrentJob()
+
+	def feed(self, token: str) -> None:
+		"""
+		Add a token to the buffer and speak any completed sentence.
+
+		Args:
+			token (str): Content delta received from the stream.
+
+		Returns:
+			None
+		"""
+		if self._job is not None and self._job.progress:
+			self._job.reportProgress("", speak=False)
+		self._buffer += token
+		cut: int = max(self._buffer.rfind(c) for c in self._BOUNDARIES)
+		if cut < 0:
+			return
+		sentence, self._buffer = self._buffer[: cut + 1], self._buffer[cut + 1 :]
+		self._speak(sentence)
+
+	def flush(self) -> None:
+		"""
+		Speak whatever remains in the buffer.
+
+		Returns:
+			None
+		"""
+		sentence, self._buffer = self._buffer, ""
+		self._speak(sentence)
+
+	def _speak(self, text: str) -> None:
+		text = text.translate(str.maketrans("", "", "*#`_>|")).strip()
+		if text:
+			self.spoken = True
+			wx.CallAfter(ui.message, text)
+
+
+def getRenderer() -> "MarkdownRenderer":
+	"""
+	Return the shared Markdown renderer.
+
+	Its extensions follow the markdownExtensions setting.
+
+	Returns:
+		MarkdownRenderer: The shared renderer.
+	"""
+	from . import rendering
+	from .rendering import DEFAULT_EXTENSIONS
+
+	renderer: "MarkdownRenderer" = rendering.getRenderer()
+	extensions: str = config.conf["askOpenRouter"].get("markdownExtensions", ", ".join(DEFAULT_EXTENSIONS))
+	renderer.configure(rendering.parseExtensions(extensions))
+	return renderer
+
+
+def getRenderPool() -> "RenderPool":
+	"""
+	Return the shared render pool, its renderer following the configuration.
+
+	Returns:
+		RenderPool: The shared pool.
+	"""
+	from . import rendering
+
+	getRenderer()
+	return rendering.getRenderPool()
+
+
 def markdownToHtml(markdownText: str) -> str:
 	"""
 	Convert Markdown text into HTML.
 
-	This function creates a fresh Markdown parser instance
-	and converts the provided Markdown string into HTML.
+	This function reuses the Markdown parser of the calling thread, reset
+	between conversions, to convert the provided Markdown string into HTML.
 
 	Args:
 		markdownText (str): Text containing Markdown formatting.
@@ -305,57 +1251,132 @@ def markdownToHtml(markdownText: str) -> str:
 	Returns:
 		str: Converted HTML string.
 	"""
-	if not markdownText:
-		return ""
+	return getRenderer().convert(markdownText)
 
-	md = markdown.Markdown()
-	return md.convert(markdownText)
 
-
-def getHistory(filename: str) -> str:
+def getHistory(sessionId: int) -> str:
 	"""
 	Convert stored conversation history into formatted HTML.
 
-	Reads the serialized conversation history file and converts it
-	into formatted HTML using Markdown.
+	Reads the conversation from the session store and assembles its HTML
+	from the rendered fragment of each message. Only messages which were
+	never rendered before are converted from Markdown.
 
 	Args:
-		filename (str): Path to the serialized history file.
+		sessionId (int): Conversation identifier.
 
 	Returns:
 		str: HTML-formatted conversation history,
 		or an empty string if no history exists.
 	"""
-	historyLines: List[str] = []
-	allChat: List[Dict[str, str]] = []
-	# Translators: Message announcing what the user said.
-	userQuestion: str = _("You said:")
-	# Translators: Message announcing what the model responded.
-	modelResponse: str = _("Model replied:")
+	headings: Dict[str, str] = {
+		# Translators: Message announcing what the user said.
+		"user": _("You said:"),
+		# Translators: Message announcing what the model responded.
+		"assistant": _("Model replied:"),
+	}
 
-	if os.path.exists(filename):
-		with open(filename, "rb") as f:
-			allChat = pickle.load(f)
+	allChat: List[Dict[str, str]] = loadHistory(sessionId)
 
 	if not allChat:
 		return ""
 
-	for message in allChat:
-		role = message.get("role")
-		content = message.get("content", "")
+	return getRenderer().renderConversation(allChat, headings)
 
-		if role == "user":
-			historyLines.append(f"# {userQuestion}")
-			historyLines.append(content)
-		elif role == "assistant":
-			historyLines.append(f"# {modelResponse}")
-			historyLines.append(content)
 
-	markdownText: str = "\n".join(historyLines)
-	return markdownToHtml(markdownText)
+def showHistory(sessionId: int, title: str) -> None:
+	"""
+	Display a stored conversation in a browseable message.
 
+	The conversation is rendered by the render pool, so this can be
+	called from the main thread.
 
-def askOpenRouter(prompt: str, apiKey: str, new: bool = True) -> None:
+	Args:
+		sessionId (int): Conversation identifier.
+		title (str): Window title.
+
+	Returns:
+		None
+	"""
+	from .rendering import HISTORY_PRIORITY
+
+	getRenderPool().submit(
+		lambda renderer: getHistory(sessionId),
+		functools.partial(_showMessage, title=title, isHtml=True, copyButton=True),
+		priority=HISTORY_PRIORITY,
+	)
+
+
+def _showMessage(
+	message: str,
+	title: Optional[str] = None,
+	isHtml: bool = False,
+	copyButton: bool = False,
+) -> None:
+	"""
+	Display a browseable message from any thread.
+
+	The call is marshalled to the NVDA main thread with wx.CallAfter,
+	so it is safe to use from the request worker. The time until the
+	message is displayed is recorded in the diagnostics.
+
+	Args:
+		message (str): Text or HTML to display.
+		title (Optional[str], optional): Window title.
+		isHtml (bool, optional): Whether the message is HTML. Defaults to False.
+		copyButton (bool, optional): Whether to show a copy button. Defaults to False.
+
+	Returns:
+		None
+	"""
+	recorder = getRecorder()
+	requestId: Optional[int] = recorder.currentRequest
+	start: float = time.perf_counter()
+
+	def show() -> None:
+		ui.browseableMessage(
+			message=message,
+			title=title,
+			isHtml=isHtml,
+			copyButton=copyButton,
+		)
+		# Includes the wait for the main thread
+		recorder.record("display", time.perf_counter() - start, requestId=requestId)
+
+	wx.CallAfter(show)
+
+
+def _showRequestError(error: urllib.error.URLError) -> None:
+	"""
+	Display the error of a request which will not be retried.
+
+	Args:
+		error (urllib.error.URLError): HTTP or network error.
+
+	Returns:
+		None
+	"""
+	if isinstance(error, urllib.error.HTTPError):
+		_showMessage(
+			f"HTTP Error: {error.code}, {error.read().decode('utf-8', 'replace')}",
+			# Translators: Title of the HTTP error message.
+			title=_("HTTP Error"),
+		)
+		return
+
+	_showMessage(
+		# Translators: Network error message.
+		message=f"{_('Network error:')} {error.reason}",
+		title="Network Error",
+	)
+
+
+def askOpenRouter(
+	prompt: str,
+	apiKey: str,
+	new: bool = True,
+	sessionId: Optional[int] = None,
+) -> None:
 	"""
 	Send a prompt to OpenRouter and display the response in NVDA.
 
@@ -365,43 +1386,108 @@ def askOpenRouter(prompt: str, apiKey: str, new: bool = True) -> None:
 		apiKey (str):
 			The OpenRouter API key used for authentication.
 		new (bool, optional):
-			If True, starts a new conversation by clearing stored history
-			and model files. If False, continues the previous conversation.
+			If True, starts a new conversation, stored once the first answer
+			arrives. If False, continues a stored conversation.
 			Defaults to True.
+		sessionId (Optional[int], optional):
+			Conversation to continue when new is False. Defaults to the
+			most recently used conversation.
+
+	Each stage of the question is timed in the diagnostics. The question
+	can be cancelled with cancelQuestion, and is abandoned once the
+	questionDeadline setting is reached.
 
 	Returns:
 		None
 	"""
+	from .httpClient import CancelToken, RequestCancelled
+	from .retryPolicy import DEFAULT_DEADLINE, Deadline
+
+	recorder = getRecorder()
+	recorder.startRequest()
+	deadlineSeconds: int = config.conf["askOpenRouter"].get("questionDeadline", DEFAULT_DEADLINE)
+	deadline = Deadline(deadlineSeconds)
+
+	# The question is abandoned when the user cancels it or when its deadline is reached;
+	# nothing is stored then, so the conversation is left as it was
+	cancelToken = CancelToken()
+	job: Optional[RequestJob] = getCurrentJob()
+	if job is not None:
+		job.addCancelCallback(cancelToken.cancel)
+	deadline.cancelOnExpiry(cancelToken)
+	try:
+		with recorder.span("total"):
+			_askOpenRouter(prompt, apiKey, new, sessionId, cancelToken, deadline)
+	except RequestCancelled:
+		if not deadline.expired:
+			log.debug("askOpenRouter: question cancelled")
+			return
+		_showMessage(
+			# Translators: Message displayed when no answer arrived before the deadline of the question.
+			_("No answer was received within {seconds} seconds. Please try again later.").format(
+				seconds=deadlineSeconds,
+			),
+			# Translators: Title of the message displayed when a question took too long.
+			title=_("Question Timed Out"),
+		)
+	finally:
+		deadline.stop()
+		recorder.setCurrentRequest(None)
+
+
+def _askOpenRouter(
+	prompt: str,
+	apiKey: str,
+	new: bool,
+	sessionId: Optional[int],
+	cancelToken: "CancelToken",
+	deadline: "Deadline",
+) -> None:
+	"""
+	Implementation of askOpenRouter, timed as one diagnostics request.
 
-	url: str = "https://openrouter.ai/api/v1/chat/completions"
+	Raises:
+		RequestCancelled: If the question is cancelled, or reaches its deadline before its answer is complete.
+	"""
+	from .compaction import DEFAULT_THRESHOLD, applySummary, needsCompaction
+	from .httpClient import RequestCancelled, RequestTimeout
+	from .rendering import ANSWER_PRIORITY
+	from .retryPolicy import MODEL_UNAVAILABLE_CODES, isModelError
+	from .sessions import makeSessionName
 
-	addonPath: str = addonHandler.getCodeAddon().path
-	historyFile: str = os.path.join(addonPath, "open_router_history.pkl")
-	modelFile: str = os.path.join(addonPath, "model.txt")
+	url: str = f"{_API_URL}/chat/completions"
+	recorder = getRecorder()
+
+	store: "SessionStore" = getSessionStore()
 
 	useAll: bool = config.conf["askOpenRouter"].get("useAllModels", False)
 	selectedModel: str = config.conf["askOpenRouter"].get("selectedModel", "")
+	stream: bool = config.conf["askOpenRouter"].get("streamResponses", False)
+	hedgeCount: int = config.conf["askOpenRouter"].get("hedgedRequests", 1)
+	hedgeDelay: float = config.conf["askOpenRouter"].get("hedgeDelay", 0) / 1000
+	hedged: bool = not useAll and hedgeCount > 1
 
-	# Reset conversation if requested
-	if new:
-		if os.path.exists(historyFile):
-			os.remove(historyFile)
-		if os.path.exists(modelFile):
-			os.remove(modelFile)
+	# A new conversation is only stored once its first answer arrives
+	session: Optional["SessionInfo"] = None
+	if not new:
+		session = store.getSession(sessionId) if sessionId is not None else store.getLatestSession()
 
-	model: str = loadModel(modelFile)
+	model: str = session.model if session is not None else ""
 
 	# Model selection logic
-	if new:
+	if not model:
 		if useAll and selectedModel:
 			model = selectedModel
-			saveModel(model, modelFile)
 		else:
+			model = _takePreselectedModel()
+		if not model:
+			# Translators: Progress message announced while a free model is being chosen.
+			reportProgress(_("Choosing a free model…"))
 			try:
-				model = getRandomFreeModel(apiKey)
-				saveModel(model, modelFile)
+				with recorder.span("modelSelection"):
+					model = getRandomFreeModel(apiKey, cancelToken)
 			except RuntimeError:
-				ui.browseableMessage(
+				_showMessage(
 					# Translators: Message informing that no free models are available.
 					_("No free model available at the moment."),
 					# Translators: Title of the error message.
@@ -409,25 +1495,12 @@ def askOpenRouter(prompt: str, apiKey: str, new: bool = True) -> None:
 				)
 				return
 
-	elif not model:
-		# Continuing conversation but no stored model
-		if useAll and selectedModel:
-			model = selectedModel
-			saveModel(model, modelFile)
-		else:
-			try:
-				model = getRandomFreeModel(apiKey)
-				saveModel(model, modelFile)
-			except RuntimeError:
-				ui.browseableMessage(
-					# Translators: Message informing that no free models are available.
-					_("No free model available at the moment."),
-					# Translators: Title of the error message.
-					title=_("Model Error"),
-				)
-				return
+	history: List[Dict[str, str]] = loadHistory(session.id) if session is not None else []
 
-	history: List[Dict[str, str]] = loadHistory(historyFile)
+	# Summarised messages are replaced by their summary
+	compact: bool = config.conf["askOpenRouter"].get("compactHistory", False)
+	if compact and session is not None:
+		history = applySummary(history, store.getSummary(session.id))
 
 	history.append(
 		{
@@ -436,68 +1509,112 @@ def askOpenRouter(prompt: str, apiKey: str, new: bool = True) -> None:
 		},
 	)
 
-	headers: Dict[str, str] = {
-		"Authorization": f"Bearer {apiKey}",
-		"Content-Type": "application/json",
-		"HTTP-Referer": "http://localhost",
-		"X-Title": "My question",
-	}
+	headers: Dict[str, str] = _makeChatHeaders(apiKey)
 
 	data: Dict[str, Any] = {
 		"model": model,
-		"messages": history,
+		"messages": budgetHistory(history, model, apiKey, cancelToken),
 	}
 
-	maxAttempts: int = 5
+	policy: "RetryPolicy" = getRetryPolicy()
 	attempt: int = 0
 	answer: Optional[str] = None
 
-	while attempt < maxAttempts:
+	# Identical questions already answered by this model are not sent again
+	cache: Optional["ResponseCache"] = getResponseCache()
+	if cache is not None:
+		answer = cache.get(model, data["messages"])
+	cached: bool = answer is not None
+
+	while not cached:
+		# Translators: Progress message announced while waiting for the model to answer.
+		reportProgress(_("Waiting for model {model}…").format(model=model))
+		attempt += 1
 		try:
-			answer = _sendRequest(url, headers, data)
+			consumer: Optional[_SpeechStreamConsumer] = _SpeechStreamConsumer() if stream else None
+			if hedged:
+				model, answer = _sendHedgedRequest(
+					url,
+					headers,
+					history,
+					apiKey,
+					model,
+					hedgeCount,
+					hedgeDelay,
+					consumer,
+					cancelToken,
+				)
+				# The conversation continues with the model which answered first
+			elif consumer is not None:
+				answer = _sendStreamingRequest(url, headers, data, consumer.feed, cancelToken=cancelToken)
+			else:
+				answer = _sendRequest(url, headers, data, cancelToken=cancelToken)
+			if consumer is not None:
+				consumer.flush()
 			break
 
-		except urllib.error.HTTPError as e:
-			# If the user uses their own paid model, do not fallback
-			if useAll:
-				ui.browseableMessage(
-					f"HTTP Error: {e.code}, {e.read().decode('utf-8')}",
-					# Translators: Title of the HTTP error message.
-					title=_("HTTP Error"),
-				)
+		except urllib.error.URLError as e:
+			errorCode: int = e.code if isinstance(e, urllib.error.HTTPError) else 0
+
+			# In free model mode, a model which is unavailable, fails or does not answer
+			# is replaced by another one; network failures are retried with the same model,
+			# and the model chosen by the user is never replaced
+			modelError: bool = isModelError(e)
+			unavailable: bool = errorCode in MODEL_UNAVAILABLE_CODES
+			switchingModel: bool = not useAll and modelError
+			if switchingModel:
+				_markModelUnavailable(model, errorCode)
+
+			# The beginning of the answer has already been read aloud, and a model chosen
+			# by the user which timed out would probably time out again
+			if (consumer is not None and consumer.spoken) or (
+				useAll and modelError and isinstance(e, RequestTimeout)
+			):
+				_showRequestError(e)
 				return
 
-			# Free model mode: retry on specific errors
-			if e.code in (402, 404, 429):
-				_markModelUnavailable(model, e.code)
+			delay: Optional[float] = policy.getDelay(e, attempt, switchingModel)
+
+			if delay is None:
+				if unavailable and switchingModel:
+					break
+				_showRequestError(e)
+				return
+			if deadline.remaining <= 0:
+				# The question would be sent again, but its time is over
+				raise RequestCancelled()
 
+			# The last wait is shortened, so that the question is tried until its deadline
+			delay = min(delay, deadline.remaining)
+
+			if switchingModel:
 				try:
-					model = getRandomFreeModel(apiKey)
-					saveModel(model, modelFile)
+					model = getRandomFreeModel(apiKey, cancelToken)
 					data["model"] = model
+					data["messages"] = budgetHistory(history, model, apiKey, cancelToken)
 				except RuntimeError:
-					break
-
-				attempt += 1
-				time.sleep(0.5)
-			else:
-				ui.browseableMessage(
-					f"HTTP Error: {e.code}, {e.read().decode('utf-8')}",
-					# Translators: Title of the HTTP error message.
-					title=_("HTTP Error"),
+					if unavailable:
+						break
+					_showRequestError(e)
+					return
+			elif delay >= 1:
+				reportProgress(
+					# Translators: Progress message announced before sending a question again to a busy model.
+					_("Model {model} is busy, trying again in {seconds} seconds…").format(
+						model=model,
+						seconds=round(delay),
+					),
 				)
-				return
 
-		except urllib.error.URLError as e:
-			ui.browseableMessage(
-				# Translators: Network error message.
-				message=f"{_('Network error:')} {e.reason}",
-				title="Network Error",
-			)
-			return
+			with recorder.span("retryWait", f"attempt={attempt} status={errorCode}"):
+				if cancelToken.wait(delay):
+					raise RequestCancelled()
+
+	# Once the answer is complete, reaching the deadline would only throw it away
+	deadline.stop()
 
 	if not answer:
-		ui.browseableMessage(
+		_showMessage(
 			# Translators: Message informing that no free models are available at the moment.
 			_("All free models are currently unavailable. Please try again later."),
 			# Translators: Title of the model unavailable error.
@@ -512,27 +1629,128 @@ def askOpenRouter(prompt: str, apiKey: str, new: bool = True) -> None:
 		},
 	)
 
-	saveHistory(history, historyFile)
+	# A question cancelled by the user just as its answer arrived is not stored either;
+	# an answer which arrived as the deadline was reached is kept
+	if cancelToken.cancelled and not deadline.expired:
+		raise RequestCancelled()
 
-	answerHtml: str = markdownToHtml(answer)
+	with recorder.span("persistence"):
+		if cache is not None and not cached:
+			# Hedged requests budget the history for the model which answered
+			cache.put(model, budgetHistory(history, model, apiKey) if hedged else data["messages"], answer)
 
-	if config.conf["askOpenRouter"]["fullHistory"]:
-		messageToDisplay: str = getHistory(historyFile)
-	else:
-		messageToDisplay = answerHtml
+		if session is None:
+			sessionId = store.createSession(makeSessionName(prompt), model)
+		else:
+			sessionId = session.id
+			if model != session.model:
+				store.setModel(sessionId, model)
+
+		# Only the question and its answer are written
+		appendHistory(history[-2:], sessionId)
+
+	threshold: int = config.conf["askOpenRouter"].get("compactionThreshold", DEFAULT_THRESHOLD)
+	if compact and needsCompaction(history, threshold):
+		scheduleCompaction(sessionId, apiKey)
 
-	ui.browseableMessage(
-		message=messageToDisplay,
+	fullHistory: bool = config.conf["askOpenRouter"]["fullHistory"]
+
+	title: str = (
+		# Translators: Title of the model response message, when the answer comes from the local cache.
+		_("Model Response (cached)")
+		if cached
 		# Translators: Title of the model response message.
-		title=_("Model Response"),
-		isHtml=True,
-		copyButton=True,
+		else _("Model Response")
+	)
+
+	def render(renderer: "MarkdownRenderer") -> str:
+		messageToDisplay: str = renderer.convert(answer)
+		if cached:
+			# Translators: Note displayed before an answer which was read from the local cache.
+			messageToDisplay = (
+				f"<p><em>{_('This answer was read from the local cache.')}</em></p>\n{messageToDisplay}"
+			)
+		return messageToDisplay
+
+	sessionName: str = session.name if session is not None else makeSessionName(prompt)
+
+	def display(message: str) -> None:
+		_showMessage(message, title=title, isHtml=True, copyButton=True)
+		if fullHistory:
+			# The whole chat is rendered after the answer, so it never delays it
+			showHistory(sessionId, sessionName)
+
+	# The request worker does not wait for the rendering
+	getRenderPool().submit(render, display, priority=ANSWER_PRIORITY)
+
+
+def askOpenRouterInBackground(
+	prompt: str,
+	apiKey: str,
+	new: bool = True,
+	sessionId: Optional[int] = None,
+	priority: int = RequestJob.INTERACTIVE,
+) -> RequestJob:
+	"""
+	Queue a call to askOpenRouter on the background request worker.
+
+	The network requests, history persistence and Markdown rendering
+	all run off the NVDA main thread; only the final message is
+	displayed on the main thread. Questions of the same conversation
+	are answered one after the other, in the order they were asked.
+
+	Args:
+		prompt (str): The user's input message to send to the model.
+		apiKey (str): The OpenRouter API key used for authentication.
+		new (bool, optional): Whether to start a new conversation. Defaults to True.
+		sessionId (Optional[int], optional): Conversation to continue when new is False,
+			defaults to the most recently used conversation at the time of the call.
+		priority (int, optional): RequestJob.INTERACTIVE or RequestJob.BACKGROUND.
+
+	Returns:
+		RequestJob: The queued job.
+	"""
+	# "The latest chat" is resolved now, so that its questions share the conversation
+	# key of the questions naming the same chat; when there is no chat yet, the
+	# questions continuing it are still kept in order
+	conversation: Optional[Hashable] = None
+	if not new:
+		if sessionId is None:
+			latest: Optional["SessionInfo"] = getSessionStore().getLatestSession()
+			sessionId = latest.id if latest is not None else None
+		conversation = sessionId if sessionId is not None else LATEST_CONVERSATION
+
+	job = RequestJob(
+		askOpenRouter,
+		prompt,
+		apiKey,
+		new,
+		sessionId,
+		description="askOpenRouter",
+		priority=priority,
+		conversation=conversation,
 	)
+	return getWorker(
+		config.conf["askOpenRouter"].get("maxConcurrentQuestions", DEFAULT_MAX_CONCURRENT),
+	).submit(job)
+
+
+def cancelQuestion() -> bool:
+	"""
+	Cancel the question being answered, or else the last question waiting in the queue.
+
+	The connection of the question is closed at once, and nothing is
+	stored in its conversation.
+
+	Returns:
+		bool: True if a question was cancelled.
+	"""
+	return getWorker().cancelLatest(RequestJob.INTERACTIVE) is not None
 
 
 def inputBox(
 	title: str,
-	func: Callable[[str, str, bool], None],
+	func: Callable[[str, str, bool], Any],
 	new: bool = True,
 ) -> None:
 	"""
@@ -543,8 +1761,9 @@ def inputBox(
 
 	Args:
 		title (str): Dialog window title.
-		func (Callable[[str, str, bool], None]):
-			Function to call with parameters (prompt, apiKey, new).
+		func (Callable[[str, str, bool], Any]):
+			Function to call with parameters (prompt, apiKey, new),
+			typically askOpenRouterInBackground.
 		new (bool, optional):
 			Whether to start a new conversation. Defaults to True.
 
@@ -553,6 +1772,7 @@ def inputBox(
 	"""
 	if gui.message.isModalMessageBoxActive():
 		return
+	startWarmUp(chooseModel=new)
 	dialog: wx.TextEntryDialog = wx.TextEntryDialog(
 		gui.mainFrame,
 		# Translators: Message inviting the user to enter his question.
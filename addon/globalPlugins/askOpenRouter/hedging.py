@@ -0,0 +1,162 @@
+# globalPlugins/askOpenRouter/hedging.py
+
+# Copyright(C) 2026-2028 Abdel <abdelkrim.bensaid@gmail.com>
+# Released under GPL 2
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import queue
+import threading
+from typing import Callable, List, Optional, Tuple
+
+from .httpClient import CancelToken, RequestCancelled
+
+# Send function: takes the model, the cancel token of the attempt and a claim
+# function, and returns the answer. Calling claim() makes the attempt the
+# winner of the race (it returns False if another attempt already won);
+# attempts which do not claim are claimed when they return.
+SendFunc = Callable[[str, CancelToken, Callable[[], bool]], str]
+
+
+class HedgedRequestError(Exception):
+	"""
+	Raised when every attempt of a hedged request failed.
+	"""
+
+	def __init__(self, errors: List[Tuple[str, BaseException]]) -> None:
+		"""
+		Initialize the error.
+
+		Args:
+			errors (List[Tuple[str, BaseException]]): Model and error of each failed attempt.
+		"""
+		super().__init__(", ".join(f"{model}: {error!r}" for model, error in errors))
+		self.errors: List[Tuple[str, BaseException]] = errors
+
+
+class _Attempt:
+	__slots__ = ("model", "token")
+
+	def __init__(self, model: str) -> None:
+		self.model: str = model
+		self.token: CancelToken = CancelToken()
+
+
+class HedgedRace:
+	"""
+	Send the same request to several models and keep the first answer.
+
+	Attempts start all at once, or one after the other when a stagger
+	delay is given: the next candidate is then only tried if no answer
+	arrived within the delay, or as soon as an attempt fails. The first
+	attempt to claim the race wins and all the others are cancelled.
+	"""
+
+	def __init__(self, send: SendFunc, delay: float = 0.0, cancelToken: Optional[CancelToken] = None) -> None:
+		"""
+		Initialize the race.
+
+		Args:
+			send (SendFunc): Function sending the request to one model.
+			delay (float, optional): Seconds to wait before starting the next candidate;
+				0 starts all candidates at once.
+			cancelToken (Optional[CancelToken], optional): Token cancelling the whole race.
+		"""
+		self._send: SendFunc = send
+		self.delay: float = delay
+		self._cancelToken: Optional[CancelToken] = cancelToken
+		self._lock: threading.Lock = threading.Lock()
+		self._winner: Optional[_Attempt] = None
+		self._attempts: List[_Attempt] = []
+		self._results: "queue.Queue[Tuple[_Attempt, Optional[str], Optional[BaseException]]]" = queue.Queue()
+
+	def _claim(self, attempt: _Attempt) -> bool:
+		with self._lock:
+			if self._winner is None and not attempt.token.cancelled:
+				self._winner = attempt
+			won: bool = self._winner is attempt
+			losers: List[_Attempt] = [a for a in self._attempts if a is not attempt] if won else []
+		for loser in losers:
+			loser.token.cancel()
+		return won
+
+	def _runAttempt(self, attempt: _Attempt) -> None:
+		try:
+			answer: str = self._send(attempt.model, attempt.token, lambda: self._claim(attempt))
+			if not self._claim(attempt):
+				raise RequestCancelled()
+			self._results.put((attempt, answer, None))
+		except BaseException as e:
+			self._results.put((attempt, None, e))
+
+	def _start(self, model: str) -> None:
+		attempt = _Attempt(model)
+		with self._lock:
+			self._attempts.append(attempt)
+		threading.Thread(
+			target=self._runAttempt,
+			args=(attempt,),
+			name=f"askOpenRouter.hedge.{model}",
+			daemon=True,
+		).start()
+
+	def cancel(self) -> None:
+		"""
+		Cancel every attempt of the race.
+
+		Returns:
+			None
+		"""
+		with self._lock:
+			attempts: List[_Attempt] = list(self._attempts)
+		for attempt in attempts:
+			attempt.token.cancel()
+
+	def run(self, candidates: List[str]) -> Tuple[str, str]:
+		"""
+		Race the candidates and return the first successful answer.
+
+		Args:
+			candidates (List[str]): Model identifiers, the preferred one first.
+
+		Returns:
+			Tuple[str, str]: The winning model and its answer.
+
+		Raises:
+			HedgedRequestError: If every attempt failed.
+			RequestCancelled: If the race itself was cancelled.
+		"""
+		pending: List[str] = list(candidates)
+		errors: List[Tuple[str, BaseException]] = []
+		active: int = 0
+
+		while pending and (active == 0 or self.delay <= 0):
+			self._start(pending.pop(0))
+			active += 1
+
+		while active:
+			if self._cancelToken is not None and self._cancelToken.cancelled:
+				self.cancel()
+				raise RequestCancelled()
+			timeout: float = self.delay if pending and self.delay > 0 else 0.25
+			try:
+				attempt, answer, error = self._results.get(timeout=timeout)
+			except queue.Empty:
+				if pending and self.delay > 0:
+					self._start(pending.pop(0))
+					active += 1
+				continue
+
+			active -= 1
+
+			if error is None and answer is not None:
+				return attempt.model, answer
+
+			if not isinstance(error, RequestCancelled):
+				errors.append((attempt.model, error))
+
+			if pending and not self._winner:
+				self._start(pending.pop(0))
+				active += 1
+
+		raise HedgedRequestError(errors)
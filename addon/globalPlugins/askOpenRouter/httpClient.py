@@ -0,0 +1,561 @@
+# globalPlugins/askOpenRouter/httpClient.py
+
+# Copyright(C) 2026-2028 Abdel <abdelkrim.bensaid@gmail.com>
+# Released under GPL 2
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import http.client
+import io
+import socket
+import ssl
+import threading
+import time
+import urllib.error
+import urllib.parse
+from typing import Any, Dict, Iterator, List, NoReturn, Optional, Set, Tuple
+
+from .diagnostics import getRecorder
+
+# Default number of idle keep-alive connections kept per origin
+DEFAULT_POOL_SIZE: int = 4
+
+# Default time (seconds) after which an idle connection is closed
+DEFAULT_IDLE_TIMEOUT: float = 60.0
+
+# Default time (seconds) given to open a connection
+DEFAULT_CONNECT_TIMEOUT: float = 10.0
+
+# Default time (seconds) between sending a request and receiving the response headers
+DEFAULT_FIRST_BYTE_TIMEOUT: float = 60.0
+
+# Default time (seconds) the response body may stay silent, such as between streamed chunks
+DEFAULT_READ_TIMEOUT: float = 30.0
+
+# Stages of a request, as given by RequestTimeout.stage
+CONNECT_STAGE: str = "Connection"
+FIRST_BYTE_STAGE: str = "Waiting for the response"
+READ_STAGE: str = "Reading the response"
+
+# Errors meaning that a reused keep-alive connection was closed by the server
+_STALE_CONNECTION_ERRORS: Tuple[type, ...] = (
+	http.client.RemoteDisconnected,
+	http.client.BadStatusLine,
+	ConnectionResetError,
+	ConnectionAbortedError,
+	BrokenPipeError,
+)
+
+_Origin = Tuple[str, str, int]
+
+
+def _splitUrl(url: str) -> Tuple[_Origin, str]:
+	"""
+	Split an absolute URL into its origin and its request target.
+	"""
+	parts = urllib.parse.urlsplit(url)
+	scheme: str = parts.scheme or "https"
+	origin: _Origin = (
+		scheme,
+		parts.hostname or "",
+		parts.port or (443 if scheme == "https" else 80),
+	)
+	target: str = parts.path or "/"
+	if parts.query:
+		target += "?" + parts.query
+	return origin, target
+
+
+def _setTimeout(connection: http.client.HTTPConnection, timeout: float) -> None:
+	"""
+	Set the timeout of a connection, applied to its socket if it is open.
+	"""
+	connection.timeout = timeout
+	if connection.sock is not None:
+		connection.sock.settimeout(timeout)
+
+
+def _timeoutError(stage: str, timeout: float) -> "RequestTimeout":
+	"""
+	Build the error raised when a stage of a request times out.
+	"""
+	return RequestTimeout(stage, f"{stage} timed out after {timeout:g} seconds")
+
+
+class RequestCancelled(Exception):
+	"""
+	Raised when a request is aborted through its CancelToken.
+	"""
+
+
+class RequestTimeout(urllib.error.URLError):
+	"""
+	Raised when a stage of a request times out.
+
+	Attributes:
+		stage (str): The stage which timed out: CONNECT_STAGE, FIRST_BYTE_STAGE or READ_STAGE.
+	"""
+
+	def __init__(self, stage: str, reason: str) -> None:
+		super().__init__(reason)
+		self.stage: str = stage
+
+
+class CancelToken:
+	"""
+	Allow another thread to abort requests in flight.
+
+	Connections used by requests bound to the token are shut down when
+	the token is cancelled, which immediately unblocks the thread waiting
+	on them. The aborted request then raises RequestCancelled.
+	"""
+
+	def __init__(self) -> None:
+		self._event: threading.Event = threading.Event()
+		self._connections: Set[http.client.HTTPConnection] = set()
+		self._lock: threading.Lock = threading.Lock()
+
+	@property
+	def cancelled(self) -> bool:
+		"""
+		Whether the token has been cancelled.
+		"""
+		return self._event.is_set()
+
+	def cancel(self) -> None:
+		"""
+		Cancel the token and shut down the connections bound to it.
+
+		Returns:
+			None
+		"""
+		with self._lock:
+			self._event.set()
+			connections = list(self._connections)
+		for connection in connections:
+			sock: Optional[socket.socket] = connection.sock
+			if sock is None:
+				continue
+			try:
+				sock.shutdown(socket.SHUT_RDWR)
+			except OSError:
+				pass
+
+	def raiseIfCancelled(self) -> None:
+		"""
+		Raise RequestCancelled if the token has been cancelled.
+
+		Returns:
+			None
+		"""
+		if self._event.is_set():
+			raise RequestCancelled()
+
+	def wait(self, timeout: float) -> bool:
+		"""
+		Sleep for up to timeout seconds, waking up early on cancellation.
+
+		Args:
+			timeout (float): Maximum time to wait, in seconds.
+
+		Returns:
+			bool: True if the token was cancelled.
+		"""
+		return self._event.wait(timeout)
+
+	def _bind(self, connection: http.client.HTTPConnection) -> None:
+		with self._lock:
+			self._connections.add(connection)
+
+	def _unbind(self, connection: http.client.HTTPConnection) -> None:
+		with self._lock:
+			self._connections.discard(connection)
+
+
+class PooledResponse:
+	"""
+	HTTP response bound to a pooled connection.
+
+	Use it as a context manager: on exit, the connection goes back to the
+	pool when the body has been fully read, and is closed otherwise.
+	"""
+
+	def __init__(
+		self,
+		client: "OpenRouterClient",
+		origin: _Origin,
+		connection: http.client.HTTPConnection,
+		response: http.client.HTTPResponse,
+		cancelToken: Optional[CancelToken] = None,
+	) -> None:
+		self._client: "OpenRouterClient" = client
+		self._cancelToken: Optional[CancelToken] = cancelToken
+		self._origin: _Origin = origin
+		self._connection: Optional[http.client.HTTPConnection] = connection
+		self._response: http.client.HTTPResponse = response
+		self.status: int = response.status
+		self.reason: str = response.reason
+		self.headers: Any = response.headers
+
+	def read(self, amt: Optional[int] = None) -> bytes:
+		"""
+		Read the response body, or up to amt bytes of it.
+
+		Args:
+			amt (Optional[int], optional): Maximum number of bytes to read.
+
+		Returns:
+			bytes: Body data.
+
+		Raises:
+			urllib.error.URLError: If a network error occurs.
+			RequestTimeout: If the body stays silent for longer than the read timeout.
+			RequestCancelled: If the request is cancelled through its token.
+		"""
+		try:
+			data: bytes = self._response.read(amt)
+		except (OSError, http.client.HTTPException) as e:
+			self._raiseReadError(e)
+		self._checkCancelled()
+		return data
+
+	def readline(self) -> bytes:
+		"""
+		Read one line of the response body.
+
+		Returns:
+			bytes: The line, including its terminator, or b"" at the end.
+
+		Raises:
+			urllib.error.URLError: If a network error occurs.
+			RequestTimeout: If the body stays silent for longer than the read timeout.
+			RequestCancelled: If the request is cancelled through its token.
+		"""
+		try:
+			line: bytes = self._response.readline()
+		except (OSError, http.client.HTTPException) as e:
+			self._raiseReadError(e)
+		self._checkCancelled()
+		return line
+
+	def __iter__(self) -> Iterator[bytes]:
+		while True:
+			line: bytes = self.readline()
+			if not line:
+				return
+			yield line
+
+	def _checkCancelled(self) -> None:
+		if self._cancelToken is not None:
+			self._cancelToken.raiseIfCancelled()
+
+	def _raiseReadError(self, error: BaseException) -> NoReturn:
+		self._checkCancelled()
+		if isinstance(error, TimeoutError):
+			raise _timeoutError(READ_STAGE, self._client.readTimeout) from error
+		raise urllib.error.URLError(error) from error
+
+	def close(self) -> None:
+		"""
+		Release the underlying connection.
+
+		Returns:
+			None
+		"""
+		connection, self._connection = self._connection, None
+		if connection is None:
+			return
+		cancelled: bool = False
+		if self._cancelToken is not None:
+			self._cancelToken._unbind(connection)
+			cancelled = self._cancelToken.cancelled
+		if not cancelled and self._response.isclosed() and not self._response.will_close:
+			self._client._release(self._origin, connection)
+		else:
+			self._response.close()
+			connection.close()
+
+	def __enter__(self) -> "PooledResponse":
+		return self
+
+	def __exit__(self, *exc: Any) -> None:
+		self.close()
+
+
+class OpenRouterClient:
+	"""
+	Thread-safe HTTP client keeping keep-alive connections in a pool.
+
+	Connections are pooled per origin (scheme, host, port) and reused
+	across requests and retries, so DNS resolution and TCP/TLS handshakes
+	are paid once instead of on every call. Connections idle for longer
+	than idleTimeout are evicted.
+
+	Each stage of a request has its own timeout: opening the connection
+	(connectTimeout), waiting for the response headers (firstByteTimeout)
+	and reading the body, where readTimeout bounds the silence between
+	two received blocks, such as the chunks of a streamed answer.
+
+	HTTP error statuses are raised as urllib.error.HTTPError and network
+	failures as urllib.error.URLError, like urllib.request.urlopen does.
+	"""
+
+	def __init__(
+		self,
+		poolSize: int = DEFAULT_POOL_SIZE,
+		idleTimeout: float = DEFAULT_IDLE_TIMEOUT,
+		userAgent: str = "Python-urllib",
+		connectTimeout: float = DEFAULT_CONNECT_TIMEOUT,
+		firstByteTimeout: float = DEFAULT_FIRST_BYTE_TIMEOUT,
+		readTimeout: float = DEFAULT_READ_TIMEOUT,
+	) -> None:
+		"""
+		Initialize the client.
+
+		Args:
+			poolSize (int, optional): Maximum idle connections kept per origin.
+			idleTimeout (float, optional): Seconds before an idle connection is evicted.
+			userAgent (str, optional): User-Agent header sent when none is given.
+			connectTimeout (float, optional): Seconds given to open a connection.
+			firstByteTimeout (float, optional): Seconds given to receive the response headers.
+			readTimeout (float, optional): Seconds the response body may stay silent.
+		"""
+		self.poolSize: int = poolSize
+		self.idleTimeout: float = idleTimeout
+		self.userAgent: str = userAgent
+		self.connectTimeout: float = connectTimeout
+		self.firstByteTimeout: float = firstByteTimeout
+		self.readTimeout: float = readTimeout
+		self._pools: Dict[_Origin, List[Tuple[http.client.HTTPConnection, float]]] = {}
+		self._lock: threading.Lock = threading.Lock()
+		self._sslContext: Optional[ssl.SSLContext] = None
+
+	def configure(self, poolSize: int, idleTimeout: float) -> None:
+		"""
+		Update the pool size and idle timeout, trimming the pools if needed.
+
+		Args:
+			poolSize (int): Maximum idle connections kept per origin.
+			idleTimeout (float): Seconds before an idle connection is evicted.
+
+		Returns:
+			None
+		"""
+		self.poolSize = poolSize
+		self.idleTimeout = idleTimeout
+		self.evictIdle()
+
+	def setTimeouts(self, connectTimeout: float, firstByteTimeout: float, readTimeout: float) -> None:
+		"""
+		Update the timeouts of the next requests.
+
+		Args:
+			connectTimeout (float): Seconds given to open a connection.
+			firstByteTimeout (float): Seconds given to receive the response headers.
+			readTimeout (float): Seconds the response body may stay silent.
+
+		Returns:
+			None
+		"""
+		self.connectTimeout = connectTimeout
+		self.firstByteTimeout = firstByteTimeout
+		self.readTimeout = readTimeout
+
+	def _newConnection(self, origin: _Origin) -> http.client.HTTPConnection:
+		scheme, host, port = origin
+		if scheme == "https":
+			if self._sslContext is None:
+				self._sslContext = ssl.create_default_context()
+			return http.client.HTTPSConnection(
+				host,
+				port,
+				timeout=self.connectTimeout,
+				context=self._sslContext,
+			)
+		return http.client.HTTPConnection(host, port, timeout=self.connectTimeout)
+
+	def _acquire(self, origin: _Origin) -> Tuple[http.client.HTTPConnection, bool]:
+		"""
+		Take an idle connection from the pool, or create a new one.
+
+		Returns:
+			Tuple[http.client.HTTPConnection, bool]: The connection, and whether it was reused.
+		"""
+		now: float = time.monotonic()
+		with self._lock:
+			pool = self._pools.get(origin, [])
+			while pool:
+				connection, lastUsed = pool.pop()
+				if now - lastUsed <= self.idleTimeout:
+					return connection, True
+				connection.close()
+		return self._newConnection(origin), False
+
+	def _release(self, origin: _Origin, connection: http.client.HTTPConnection) -> None:
+		"""
+		Return a connection to the pool, closing it if the pool is full.
+		"""
+		with self._lock:
+			pool = self._pools.setdefault(origin, [])
+			if len(pool) < self.poolSize:
+				pool.append((connection, time.monotonic()))
+				return
+		connection.close()
+
+	def evictIdle(self) -> None:
+		"""
+		Close pooled connections idle for longer than the idle timeout.
+
+		Returns:
+			None
+		"""
+		now: float = time.monotonic()
+		expired: List[http.client.HTTPConnection] = []
+		with self._lock:
+			for origin, pool in self._pools.items():
+				fresh = [item for item in pool if now - item[1] <= self.idleTimeout]
+				overflow: int = max(len(fresh) - self.poolSize, 0)
+				expired.extend(conn for conn, lastUsed in pool if now - lastUsed > self.idleTimeout)
+				expired.extend(conn for conn, _lastUsed in fresh[:overflow])
+				self._pools[origin] = fresh[overflow:]
+		for connection in expired:
+			connection.close()
+
+	def preconnect(self, url: str) -> bool:
+		"""
+		Open a connection to the origin of a URL ahead of the requests, and pool it.
+
+		Nothing is done when an idle connection to the origin is already pooled.
+
+		Args:
+			url (str): Absolute URL on the origin.
+
+		Returns:
+			bool: True if a new connection was opened.
+
+		Raises:
+			urllib.error.URLError: If the connection fails.
+		"""
+		origin, _target = _splitUrl(url)
+		now: float = time.monotonic()
+		with self._lock:
+			if any(
+				now - lastUsed <= self.idleTimeout for _connection, lastUsed in self._pools.get(origin, [])
+			):
+				return False
+
+		connection: http.client.HTTPConnection = self._newConnection(origin)
+		connectStart: float = time.perf_counter()
+		try:
+			connection.connect()
+		except TimeoutError as e:
+			connection.close()
+			raise _timeoutError(CONNECT_STAGE, self.connectTimeout) from e
+		except OSError as e:
+			connection.close()
+			raise urllib.error.URLError(e) from e
+		getRecorder().record("connect", time.perf_counter() - connectStart, origin[1])
+		self._release(origin, connection)
+		return True
+
+	def request(
+		self,
+		method: str,
+		url: str,
+		headers: Optional[Dict[str, str]] = None,
+		body: Optional[bytes] = None,
+		cancelToken: Optional[CancelToken] = None,
+	) -> PooledResponse:
+		"""
+		Send a request and return its response once the headers are received.
+
+		A reused connection found closed by the server is transparently
+		replaced by a fresh one. The connection and the wait for the
+		headers are bounded by connectTimeout and firstByteTimeout; the
+		returned response applies readTimeout to the reads of its body.
+
+		Args:
+			method (str): HTTP method.
+			url (str): Absolute URL.
+			headers (Optional[Dict[str, str]], optional): Request headers.
+			body (Optional[bytes], optional): Request body.
+			cancelToken (Optional[CancelToken], optional): Token allowing to abort the request.
+
+		Returns:
+			PooledResponse: The response, to be used as a context manager.
+
+		Raises:
+			urllib.error.HTTPError: If the server answers with an error status.
+			urllib.error.URLError: If a network error occurs.
+			RequestTimeout: If a stage of the request times out.
+			RequestCancelled: If the request is cancelled through its token.
+		"""
+		origin, target = _splitUrl(url)
+
+		sendHeaders: Dict[str, str] = {"User-Agent": self.userAgent}
+		sendHeaders.update(headers or {})
+
+		while True:
+			if cancelToken is not None:
+				cancelToken.raiseIfCancelled()
+			connection, reused = self._acquire(origin)
+			if cancelToken is not None:
+				cancelToken._bind(connection)
+			connecting: bool = not reused
+			try:
+				if connecting:
+					_setTimeout(connection, self.connectTimeout)
+					connectStart: float = time.perf_counter()
+					connection.connect()
+					getRecorder().record("connect", time.perf_counter() - connectStart, origin[1])
+					connecting = False
+				_setTimeout(connection, self.firstByteTimeout)
+				connection.request(method, target, body=body, headers=sendHeaders)
+				if cancelToken is not None and connection.sock is not None and cancelToken.cancelled:
+					# Cancelled while connecting, before the socket could be shut down
+					connection.sock.shutdown(socket.SHUT_RDWR)
+				response = connection.getresponse()
+				_setTimeout(connection, self.readTimeout)
+			except (OSError, http.client.HTTPException) as e:
+				connection.close()
+				if cancelToken is not None:
+					cancelToken._unbind(connection)
+					cancelToken.raiseIfCancelled()
+				if isinstance(e, TimeoutError):
+					if connecting:
+						raise _timeoutError(CONNECT_STAGE, self.connectTimeout) from e
+					raise _timeoutError(FIRST_BYTE_STAGE, self.firstByteTimeout) from e
+				if reused and isinstance(e, _STALE_CONNECTION_ERRORS):
+					continue
+				raise urllib.error.URLError(e) from e
+			break
+
+		if response.status >= 400:
+			try:
+				errorBody: bytes = response.read()
+			except (OSError, http.client.HTTPException):
+				errorBody = b""
+			pooled = PooledResponse(self, origin, connection, response, cancelToken)
+			pooled.close()
+			raise urllib.error.HTTPError(
+				url,
+				response.status,
+				response.reason,
+				response.headers,
+				io.BytesIO(errorBody),
+			)
+
+		return PooledResponse(self, origin, connection, response, cancelToken)
+
+	def close(self) -> None:
+		"""
+		Close every pooled connection.
+
+		Returns:
+			None
+		"""
+		with self._lock:
+			pools, self._pools = self._pools, {}
+		for pool in pools.values():
+			for connection, _lastUsed in pool:
+				connection.close()
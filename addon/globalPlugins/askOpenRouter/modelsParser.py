@@ -0,0 +1,283 @@
+# globalPlugins/askOpenRouter/modelsParser.py
+
+# Copyright(C) 2026-2028 Abdel <abdelkrim.bensaid@gmail.com>
+# Released under GPL 2
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import codecs
+import json
+import zlib
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+	import brotli
+except ImportError:
+	brotli = None
+
+# Errors raised by the decompressors on corrupted data
+_DECOMPRESSION_ERRORS: Tuple[type, ...] = (zlib.error,) + ((brotli.error,) if brotli is not None else ())
+
+# Size (bytes) of the blocks read from the response
+CHUNK_SIZE: int = 64 * 1024
+
+# Content codings the parser can decode, the preferred one first
+ACCEPT_ENCODING: str = "br, gzip, deflate" if brotli is not None else "gzip, deflate"
+
+# Fields of a model entry used by the add-on
+_PRICING_FIELDS: Tuple[str, ...] = ("prompt", "completion")
+
+_decoder: json.JSONDecoder = json.JSONDecoder()
+
+_WHITESPACE: str = " \t\r\n"
+
+
+class _ZlibDecompressor:
+	"""
+	Incremental decompressor of gzip and deflate bodies.
+	"""
+
+	def __init__(self, wbits: int) -> None:
+		self._decompressor = zlib.decompressobj(wbits)
+
+	def process(self, data: bytes) -> bytes:
+		return self._decompressor.decompress(data)
+
+	def flush(self) -> bytes:
+		return self._decompressor.flush()
+
+
+class _BrotliDecompressor:
+	"""
+	Incremental decompressor of brotli bodies.
+	"""
+
+	def __init__(self) -> None:
+		self._decompressor = brotli.Decompressor()
+
+	def process(self, data: bytes) -> bytes:
+		return self._decompressor.process(data)
+
+	def flush(self) -> bytes:
+		if not self._decompressor.is_finished():
+			raise ValueError("Truncated brotli response body")
+		return b""
+
+
+def _makeDecompressor(encoding: str) -> Optional[Any]:
+	"""
+	Create an incremental decompressor for a Content-Encoding value.
+
+	Args:
+		encoding (str): Content-Encoding of the response.
+
+	Returns:
+		Optional[Any]: Object with process and flush methods, or None for an identity body.
+
+	Raises:
+		ValueError: If the coding is not supported.
+	"""
+	encoding = encoding.strip().lower()
+	if encoding in ("", "identity"):
+		return None
+	if encoding in ("gzip", "x-gzip"):
+		return _ZlibDecompressor(16 + zlib.MAX_WBITS)
+	if encoding == "deflate":
+		return _ZlibDecompressor(zlib.MAX_WBITS)
+	if encoding == "br" and brotli is not None:
+		return _BrotliDecompressor()
+	raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def iterBodyText(read: Callable[[int], bytes], encoding: str = "") -> Iterator[str]:
+	"""
+	Read a response body block by block, decompressing and decoding it as UTF-8.
+
+	Args:
+		read (Callable[[int], bytes]): Read method of the response.
+		encoding (str, optional): Content-Encoding of the response.
+
+	Returns:
+		Iterator[str]: Successive pieces of text of the body.
+
+	Raises:
+		ValueError: If the coding is not supported or the body is corrupted.
+	"""
+	decompressor: Optional[Any] = _makeDecompressor(encoding)
+	textDecoder = codecs.getincrementaldecoder("utf-8")()
+	try:
+		while True:
+			data: bytes = read(CHUNK_SIZE)
+			if not data:
+				break
+			if decompressor is not None:
+				data = decompressor.process(data)
+			if data:
+				yield textDecoder.decode(data)
+		tail: bytes = decompressor.flush() if decompressor is not None else b""
+	except _DECOMPRESSION_ERRORS as e:
+		raise ValueError(f"Corrupted response body: {e}") from e
+	yield textDecoder.decode(tail, final=True)
+
+
+def compactModel(entry: Dict[str, Any]) -> Dict[str, Any]:
+	"""
+	Keep only the fields of a model entry used by the add-on.
+
+	Args:
+		entry (Dict[str, Any]): Model entry of the /models catalogue.
+
+	Returns:
+		Dict[str, Any]: Entry with id, pricing (prompt and completion), deprecated,
+			top_provider and context_length.
+	"""
+	pricing: Any = entry.get("pricing")
+	return {
+		"id": entry.get("id"),
+		"pricing": {key: pricing[key] for key in _PRICING_FIELDS if key in pricing}
+		if isinstance(pricing, dict)
+		else {},
+		"deprecated": entry.get("deprecated", False),
+		"top_provider": entry.get("top_provider"),
+		"context_length": entry.get("context_length"),
+	}
+
+
+class _TextBuffer:
+	"""
+	Text read from an iterator of pieces, consumed from the front.
+	"""
+
+	def __init__(self, pieces: Iterable[str]) -> None:
+		self._pieces: Iterator[str] = iter(pieces)
+		self.text: str = ""
+		self.position: int = 0
+		self.exhausted: bool = False
+
+	def fill(self) -> bool:
+		"""
+		Append the next piece, dropping the text already consumed.
+
+		Returns:
+			bool: False if there was nothing left to read.
+		"""
+		for piece in self._pieces:
+			self.text = self.text[self.position :] + piece
+			self.position = 0
+			return True
+		self.exhausted = True
+		return False
+
+	def peek(self) -> str:
+		"""
+		Skip whitespace and return the next character, or "" at the end.
+
+		Returns:
+			str: The next significant character.
+		"""
+		while True:
+			while self.position < len(self.text) and self.text[self.position] in _WHITESPACE:
+				self.position += 1
+			if self.position < len(self.text):
+				return self.text[self.position]
+			if not self.fill():
+				return ""
+
+	def expect(self, characters: str) -> str:
+		"""
+		Consume the next significant character, which must be one of characters.
+
+		Returns:
+			str: The consumed character.
+
+		Raises:
+			ValueError: If another character or the end of the text is found.
+		"""
+		character: str = self.peek()
+		if not character or character not in characters:
+			raise ValueError(f"Malformed models catalogue: expected one of {characters!r}")
+		self.position += 1
+		return character
+
+	def decodeValue(self) -> Any:
+		"""
+		Decode the next JSON value, reading more text until it is complete.
+
+		A value is only accepted when followed by another character, so
+		that a number cut at the end of a piece is not taken as complete.
+
+		Returns:
+			Any: The decoded value.
+
+		Raises:
+			ValueError: If the text is not valid JSON.
+		"""
+		self.peek()
+		while True:
+			try:
+				value, end = _decoder.raw_decode(self.text, self.position)
+			except json.JSONDecodeError:
+				if self.fill():
+					continue
+				raise
+			if end < len(self.text) or self.exhausted or not self.fill():
+				self.position = end
+				return value
+
+
+def iterModels(pieces: Iterable[str]) -> Iterator[Dict[str, Any]]:
+	"""
+	Parse the /models catalogue incrementally, yielding compact model entries.
+
+	Only one model entry is decoded at a time, so the whole document is
+	never held in memory. Members of the document other than "data" are
+	skipped.
+
+	Args:
+		pieces (Iterable[str]): Successive pieces of text of the document.
+
+	Returns:
+		Iterator[Dict[str, Any]]: Model entries, as returned by compactModel.
+
+	Raises:
+		ValueError: If the document is not a valid catalogue.
+	"""
+	buffer = _TextBuffer(pieces)
+	buffer.expect("{")
+	if buffer.peek() == "}":
+		return
+	while True:
+		key: Any = buffer.decodeValue()
+		buffer.expect(":")
+		if key == "data":
+			buffer.expect("[")
+			if buffer.peek() != "]":
+				while True:
+					entry: Any = buffer.decodeValue()
+					if isinstance(entry, dict):
+						yield compactModel(entry)
+					if buffer.expect(",]") == "]":
+						break
+			else:
+				buffer.expect("]")
+		else:
+			buffer.decodeValue()
+		if buffer.expect(",}") == "}":
+			return
+
+
+def parseModels(read: Callable[[int], bytes], encoding: str = "") -> List[Dict[str, Any]]:
+	"""
+	Read and parse a /models response body.
+
+	Args:
+		read (Callable[[int], bytes]): Read method of the response.
+		encoding (str, optional): Content-Encoding of the response.
+
+	Returns:
+		List[Dict[str, Any]]: Compact model entries.
+
+	Raises:
+		ValueError: If the body cannot be decoded or is not a valid catalogue.
+	"""
+	return list(iterModels(iterBodyText(read, encoding)))
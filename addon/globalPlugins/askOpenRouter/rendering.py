@@ -0,0 +1,395 @@
+# globalPlugins/askOpenRouter/rendering.py
+
+# Copyright(C) 2026-2028 Abdel <abdelkrim.bensaid@gmail.com>
+# Released under GPL 2
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import hashlib
+import heapq
+import itertools
+import re
+import threading
+from collections import OrderedDict
+from logHandler import log
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .diagnostics import getRecorder
+
+# Markdown is only imported when the first message is rendered
+if TYPE_CHECKING:
+	import markdown
+
+# Maximum number of rendered message fragments kept in memory
+_MAX_FRAGMENTS: int = 2000
+
+# Markdown extensions enabled by default, answers often containing code blocks and tables
+DEFAULT_EXTENSIONS: Tuple[str, ...] = ("fenced_code", "tables")
+
+# Number of rendering threads
+DEFAULT_RENDER_THREADS: int = 2
+
+# Render priorities: answers to questions go before stored chats
+ANSWER_PRIORITY: int = 0
+HISTORY_PRIORITY: int = 1
+
+
+def parseExtensions(text: str) -> Tuple[str, ...]:
+	"""
+	Parse a list of Markdown extension names separated by commas or spaces.
+
+	Args:
+		text (str): Extension names, such as "fenced_code, tables".
+
+	Returns:
+		Tuple[str, ...]: The names, without duplicates, in their original order.
+	"""
+	return tuple(dict.fromkeys(name for name in re.split(r"[\s,]+", text) if name))
+
+
+# Errors raised by Markdown for an unknown or invalid extension
+_EXTENSION_ERRORS: Tuple[type, ...] = (ImportError, AttributeError, TypeError, ValueError)
+
+
+def _isValidExtension(name: str) -> bool:
+	import markdown
+
+	try:
+		markdown.Markdown(extensions=[name])
+	except _EXTENSION_ERRORS:
+		return False
+	return True
+
+
+class MarkdownRenderer:
+	"""
+	Markdown to HTML renderer with a per-message fragment cache.
+
+	Each thread builds its Markdown parser once, with the configured
+	extensions, and reuses it through reset() instead of creating one for
+	every conversion, so several threads can render at the same time.
+	Rendered messages are cached by content hash, so displaying a
+	conversation only converts the messages which were not rendered before.
+	"""
+
+	def __init__(
+		self,
+		maxFragments: int = _MAX_FRAGMENTS,
+		extensions: Tuple[str, ...] = DEFAULT_EXTENSIONS,
+	) -> None:
+		"""
+		Initialize the renderer.
+
+		Args:
+			maxFragments (int, optional): Maximum number of cached fragments.
+			extensions (Tuple[str, ...], optional): Names of the Markdown extensions to enable.
+		"""
+		self.maxFragments: int = maxFragments
+		self.extensions: Tuple[str, ...] = extensions
+		# Incremented when the extensions change, so the parsers are rebuilt
+		self._generation: int = 0
+		self._local: threading.local = threading.local()
+		self._fragments: "OrderedDict[str, str]" = OrderedDict()
+		self._lock: threading.Lock = threading.Lock()
+
+	def configure(self, extensions: Tuple[str, ...]) -> None:
+		"""
+		Change the enabled Markdown extensions, forgetting the rendered fragments.
+
+		Args:
+			extensions (Tuple[str, ...]): Names of the Markdown extensions to enable.
+
+		Returns:
+			None
+		"""
+		if extensions == self.extensions:
+			return
+		with self._lock:
+			self.extensions = extensions
+			self._generation += 1
+			self._fragments.clear()
+
+	def _getParser(self) -> "markdown.Markdown":
+		"""
+		Return the parser of the calling thread, building it if needed.
+		"""
+		md: Optional["markdown.Markdown"] = getattr(self._local, "md", None)
+		if md is not None and self._local.generation == self._generation:
+			md.reset()
+			return md
+
+		import markdown
+
+		generation: int = self._generation
+		extensions: Tuple[str, ...] = self.extensions
+		try:
+			md = markdown.Markdown(extensions=list(extensions))
+		except _EXTENSION_ERRORS:
+			log.debugWarning(f"askOpenRouter: invalid Markdown extensions in {extensions!r}", exc_info=True)
+			md = markdown.Markdown(extensions=[name for name in extensions if _isValidExtension(name)])
+		self._local.md = md
+		self._local.generation = generation
+		return md
+
+	def convert(self, markdownText: str) -> str:
+		"""
+		Convert Markdown text into HTML with the parser of the calling thread.
+
+		Args:
+			markdownText (str): Text containing Markdown formatting.
+
+		Returns:
+			str: Converted HTML string.
+		"""
+		if not markdownText:
+			return ""
+
+		return self._getParser().convert(markdownText)
+
+	def renderMessage(self, heading: str, content: str) -> str:
+		"""
+		Render a message preceded by a level 1 heading, using the cache.
+
+		Args:
+			heading (str): Heading text, such as "You said:".
+			content (str): Markdown content of the message.
+
+		Returns:
+			str: HTML fragment of the message.
+		"""
+		key: str = hashlib.sha1(f"{heading}\0{content}".encode("utf-8")).hexdigest()
+
+		with self._lock:
+			fragment: Optional[str] = self._fragments.get(key)
+			if fragment is not None:
+				self._fragments.move_to_end(key)
+				return fragment
+
+		fragment = self.convert(f"# {heading}\n{content}")
+
+		with self._lock:
+			self._fragments[key] = fragment
+			while len(self._fragments) > self.maxFragments:
+				self._fragments.popitem(last=False)
+
+		return fragment
+
+	def renderConversation(
+		self,
+		messages: List[Dict[str, str]],
+		headings: Dict[str, str],
+	) -> str:
+		"""
+		Render a conversation from cached message fragments.
+
+		Args:
+			messages (List[Dict[str, str]]): Conversation messages.
+			headings (Dict[str, str]): Heading to display for each rendered role.
+				Messages whose role has no heading are skipped.
+
+		Returns:
+			str: HTML of the whole conversation.
+		"""
+		fragments: List[str] = []
+
+		for message in messages:
+			heading: Optional[str] = headings.get(message.get("role", ""))
+			if heading is None:
+				continue
+			fragments.append(self.renderMessage(heading, message.get("content", "")))
+
+		return "\n".join(fragments)
+
+
+class RenderTask:
+	"""
+	Rendering queued on the render pool.
+	"""
+
+	def __init__(
+		self,
+		render: Callable[[MarkdownRenderer], str],
+		onDone: Callable[[str], None],
+		priority: int,
+	) -> None:
+		self.render: Callable[[MarkdownRenderer], str] = render
+		self.onDone: Callable[[str], None] = onDone
+		self.priority: int = priority
+		# Diagnostics request the rendering belongs to
+		self.requestId: Optional[int] = getRecorder().currentRequest
+		self.html: Optional[str] = None
+		self._event: threading.Event = threading.Event()
+
+	def wait(self, timeout: Optional[float] = None) -> bool:
+		"""
+		Wait until the rendering is done and handed over.
+
+		Args:
+			timeout (Optional[float], optional): Maximum time to wait, in seconds.
+
+		Returns:
+			bool: True if the rendering is done.
+		"""
+		return self._event.wait(timeout)
+
+
+class RenderPool:
+	"""
+	Threads converting Markdown to HTML off the request worker and the main thread.
+
+	Tasks with the lowest priority value go first and, among them, the
+	newest one, so the answer the user is waiting for is not delayed by
+	older work. The finished HTML is passed to the callback of the task,
+	which hands it to the GUI thread.
+	"""
+
+	def __init__(self, renderer: MarkdownRenderer, threads: int = DEFAULT_RENDER_THREADS) -> None:
+		"""
+		Initialize the pool. Threads are started lazily when tasks are submitted.
+
+		Args:
+			renderer (MarkdownRenderer): Renderer used by the tasks.
+			threads (int, optional): Number of rendering threads.
+		"""
+		self.renderer: MarkdownRenderer = renderer
+		self.threads: int = max(1, threads)
+		self._queue: List[Tuple[int, int, RenderTask]] = []
+		self._sequence: Iterator[int] = itertools.count()
+		self._condition: threading.Condition = threading.Condition()
+		self._started: int = 0
+		self._busy: int = 0
+		self._stopped: bool = False
+
+	def submit(
+		self,
+		render: Callable[[MarkdownRenderer], str],
+		onDone: Callable[[str], None],
+		priority: int = ANSWER_PRIORITY,
+	) -> RenderTask:
+		"""
+		Queue a rendering.
+
+		Args:
+			render (Callable[[MarkdownRenderer], str]): Function returning the HTML, given the renderer.
+			onDone (Callable[[str], None]): Function receiving the HTML, called on the rendering thread.
+			priority (int, optional): ANSWER_PRIORITY or HISTORY_PRIORITY.
+
+		Returns:
+			RenderTask: The queued task.
+		"""
+		task = RenderTask(render, onDone, priority)
+		with self._condition:
+			self._stopped = False
+			# The newest task of a priority goes first
+			heapq.heappush(self._queue, (priority, -next(self._sequence), task))
+			if self._started < self.threads and self._busy + len(self._queue) > self._started:
+				self._started += 1
+				threading.Thread(
+					target=self._run,
+					name=f"askOpenRouter.render{self._started}",
+					daemon=True,
+				).start()
+			self._condition.notify()
+		return task
+
+	@property
+	def pending(self) -> int:
+		"""
+		Number of tasks waiting to be rendered.
+		"""
+		with self._condition:
+			return len(self._queue)
+
+	def waitIdle(self, timeout: Optional[float] = None) -> bool:
+		"""
+		Wait until every queued task is done.
+
+		Args:
+			timeout (Optional[float], optional): Maximum time to wait, in seconds.
+
+		Returns:
+			bool: True if the pool is idle.
+		"""
+		with self._condition:
+			return self._condition.wait_for(lambda: not self._queue and not self._busy, timeout)
+
+	def _run(self) -> None:
+		recorder = getRecorder()
+		while True:
+			with self._condition:
+				while not self._queue and not self._stopped:
+					self._condition.wait()
+				if self._stopped:
+					self._started -= 1
+					return
+				task: RenderTask = heapq.heappop(self._queue)[2]
+				self._busy += 1
+
+			recorder.setCurrentRequest(task.requestId)
+			try:
+				with recorder.span("markdown"):
+					task.html = task.render(self.renderer)
+				task.onDone(task.html)
+			except Exception:
+				log.error("askOpenRouter: rendering failed", exc_info=True)
+			finally:
+				recorder.setCurrentRequest(None)
+				task._event.set()
+				with self._condition:
+					self._busy -= 1
+					self._condition.notify_all()
+
+	def stop(self) -> None:
+		"""
+		Stop the rendering threads. Tasks still queued are discarded.
+
+		Returns:
+			None
+		"""
+		with self._condition:
+			self._stopped = True
+			self._queue.clear()
+			self._condition.notify_all()
+
+
+_renderer: Optional[MarkdownRenderer] = None
+_renderPool: Optional[RenderPool] = None
+
+
+def getRenderer() -> MarkdownRenderer:
+	"""
+	Return the shared Markdown renderer.
+
+	Returns:
+		MarkdownRenderer: The shared renderer.
+	"""
+	global _renderer
+	if _renderer is None:
+		_renderer = MarkdownRenderer()
+	return _renderer
+
+
+def getRenderPool() -> RenderPool:
+	"""
+	Return the shared render pool, using the shared renderer.
+
+	Returns:
+		RenderPool: The shared pool.
+	"""
+	global _renderPool
+	if _renderPool is None:
+		_renderPool = RenderPool(getRenderer())
+	return _renderPool
+
+
+def terminate() -> None:
+	"""
+	Stop the shared render pool, if it was started.
+
+	Returns:
+		None
+	"""
+	global _renderPool
+	if _renderPool is not None:
+		_renderPool.stop()
+		_renderPool = None
@@ -0,0 +1,204 @@
+# globalPlugins/askOpenRouter/responseCache.py
+
+# Copyright(C) 2026-2028 Abdel <abdelkrim.bensaid@gmail.com>
+# Released under GPL 2
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import hashlib
+import json
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+# SQLite is only imported when the cache is first used
+if TYPE_CHECKING:
+	import sqlite3
+
+# Default maximum size of the cached answers, in bytes
+DEFAULT_MAX_BYTES: int = 20 * 1024 * 1024
+
+# Default maximum age of a cached answer, in seconds
+DEFAULT_MAX_AGE: float = 7 * 86400.0
+
+_SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS responses (
+	key TEXT PRIMARY KEY,
+	model TEXT NOT NULL,
+	answer TEXT NOT NULL,
+	size INTEGER NOT NULL,
+	createdAt REAL NOT NULL,
+	usedAt REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responsesByUse ON responses (usedAt);
+CREATE INDEX IF NOT EXISTS responsesByCreation ON responses (createdAt);
+"""
+
+
+def makeCacheKey(model: str, messages: List[Dict[str, str]]) -> str:
+	"""
+	Compute the cache key of a request.
+
+	Roles are kept, and the whitespace of the contents is normalised, so
+	that questions differing only by spacing or line breaks share an entry.
+
+	Args:
+		model (str): Model identifier.
+		messages (List[Dict[str, str]]): Messages sent to the model.
+
+	Returns:
+		str: Hexadecimal hash of the model and the normalised messages.
+	"""
+	normalised: List[List[str]] = [
+		[m.get("role", ""), " ".join((m.get("content", "") or "").split())] for m in messages
+	]
+	payload: str = json.dumps([model, normalised], ensure_ascii=False, separators=(",", ":"))
+	return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+	"""
+	Local cache of model answers, keyed on the model and the messages sent.
+
+	Entries are kept in a SQLite database. They expire after a maximum
+	age, and the least recently used ones are evicted when the total size
+	of the answers exceeds the limit.
+	"""
+
+	def __init__(
+		self,
+		path: str,
+		maxBytes: int = DEFAULT_MAX_BYTES,
+		maxAge: float = DEFAULT_MAX_AGE,
+	) -> None:
+		"""
+		Initialize the cache. The database is opened lazily.
+
+		Args:
+			path (str): Path of the SQLite database.
+			maxBytes (int, optional): Maximum total size of the answers, in bytes.
+			maxAge (float, optional): Maximum age of an entry, in seconds.
+		"""
+		self.path: str = path
+		self.maxBytes: int = maxBytes
+		self.maxAge: float = maxAge
+		self._db: Optional["sqlite3.Connection"] = None
+		self._totalBytes: int = 0
+		self._lock: threading.RLock = threading.RLock()
+
+	def _connect(self) -> "sqlite3.Connection":
+		if self._db is None:
+			import sqlite3
+
+			db = sqlite3.connect(self.path, check_same_thread=False)
+			db.execute("PRAGMA journal_mode=WAL")
+			db.execute("PRAGMA synchronous=NORMAL")
+			db.executescript(_SCHEMA)
+			self._totalBytes = int(db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0])
+			self._db = db
+		return self._db
+
+	def get(self, model: str, messages: List[Dict[str, str]]) -> Optional[str]:
+		"""
+		Return the cached answer to a request.
+
+		Args:
+			model (str): Model identifier.
+			messages (List[Dict[str, str]]): Messages sent to the model.
+
+		Returns:
+			Optional[str]: The answer, or None if it is not cached or expired.
+		"""
+		key: str = makeCacheKey(model, messages)
+		now: float = time.time()
+		with self._lock:
+			db = self._connect()
+			row = db.execute("SELECT answer, createdAt FROM responses WHERE key = ?", (key,)).fetchone()
+			if row is None:
+				return None
+			answer, createdAt = row
+			with db:
+				if now - createdAt > self.maxAge:
+					self._evictExpired(db, now)
+					return None
+				db.execute("UPDATE responses SET usedAt = ? WHERE key = ?", (now, key))
+			return answer
+
+	def put(self, model: str, messages: List[Dict[str, str]], answer: str) -> None:
+		"""
+		Store the answer to a request, evicting old entries if needed.
+
+		Args:
+			model (str): Model identifier.
+			messages (List[Dict[str, str]]): Messages sent to the model.
+			answer (str): Answer of the model.
+
+		Returns:
+			None
+		"""
+		key: str = makeCacheKey(model, messages)
+		size: int = len(answer.encode("utf-8"))
+		if size > self.maxBytes:
+			return
+		now: float = time.time()
+		with self._lock:
+			db = self._connect()
+			with db:
+				previous = db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+				if previous is not None:
+					self._totalBytes -= previous[0]
+				db.execute(
+					"INSERT OR REPLACE INTO responses (key, model, answer, size, createdAt, usedAt) "
+					"VALUES (?, ?, ?, ?, ?, ?)",
+					(key, model, answer, size, now, now),
+				)
+				self._totalBytes += size
+				self._evictExpired(db, now)
+				self._evictLeastRecentlyUsed(db)
+
+	def _evictExpired(self, db: "sqlite3.Connection", now: float) -> None:
+		limit: float = now - self.maxAge
+		removed = db.execute(
+			"SELECT COALESCE(SUM(size), 0) FROM responses WHERE createdAt < ?",
+			(limit,),
+		).fetchone()
+		if removed[0]:
+			db.execute("DELETE FROM responses WHERE createdAt < ?", (limit,))
+			self._totalBytes -= int(removed[0])
+
+	def _evictLeastRecentlyUsed(self, db: "sqlite3.Connection") -> None:
+		while self._totalBytes > self.maxBytes:
+			rows = db.execute("SELECT key, size FROM responses ORDER BY usedAt LIMIT 50").fetchall()
+			if not rows:
+				self._totalBytes = 0
+				return
+			for key, size in rows:
+				if self._totalBytes <= self.maxBytes:
+					return
+				db.execute("DELETE FROM responses WHERE key = ?", (key,))
+				self._totalBytes -= size
+
+	def clear(self) -> None:
+		"""
+		Remove every cached answer.
+
+		Returns:
+			None
+		"""
+		with self._lock:
+			db = self._connect()
+			with db:
+				db.execute("DELETE FROM responses")
+			self._totalBytes = 0
+
+	def close(self) -> None:
+		"""
+		Close the database.
+
+		Returns:
+			None
+		"""
+		with self._lock:
+			if self._db is not None:
+				self._db.close()
+				self._db = None
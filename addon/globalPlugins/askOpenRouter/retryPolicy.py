@@ -0,0 +1,249 @@
+# globalPlugins/askOpenRouter/retryPolicy.py
+
+# Copyright(C) 2026-2028 Abdel <abdelkrim.bensaid@gmail.com>
+# Released under GPL 2
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import email.utils
+import random
+import threading
+import time
+import urllib.error
+from typing import Any, Optional, Tuple
+
+from .httpClient import CONNECT_STAGE, CancelToken, RequestTimeout
+
+# Status codes after which the free model is replaced by another one
+MODEL_UNAVAILABLE_CODES: Tuple[int, ...] = (402, 404, 429)
+
+# Default time (seconds) given to a question, retries included
+DEFAULT_DEADLINE: float = 120.0
+
+
+def isTransientError(error: BaseException) -> bool:
+	"""
+	Tell whether an error may disappear when the same request is sent again.
+
+	Network errors, timeouts, rate limits and server errors are transient;
+	other HTTP errors, such as an invalid key, are not.
+
+	Args:
+		error (BaseException): The error raised by the request.
+
+	Returns:
+		bool: True if the request is worth retrying.
+	"""
+	if isinstance(error, urllib.error.HTTPError):
+		return error.code in (408, 429) or error.code >= 500
+	return isinstance(error, urllib.error.URLError)
+
+
+def isModelError(error: BaseException) -> bool:
+	"""
+	Tell whether an error was caused by the model rather than by the network.
+
+	A model which is unavailable (402, 404, 429), fails (5xx) or does not
+	answer once connected is at fault; a connection which cannot be opened,
+	for example when the network is down, says nothing about the model.
+
+	Args:
+		error (BaseException): The error raised by the request.
+
+	Returns:
+		bool: True if another model may succeed where this one failed.
+	"""
+	if isinstance(error, urllib.error.HTTPError):
+		return error.code in MODEL_UNAVAILABLE_CODES or error.code >= 500
+	return isinstance(error, RequestTimeout) and error.stage != CONNECT_STAGE
+
+
+def getServerDelay(headers: Any, now: Optional[float] = None) -> Optional[float]:
+	"""
+	Read the delay requested by the server before sending again.
+
+	Retry-After is used first, as a number of seconds or an HTTP date.
+	Otherwise, when X-RateLimit-Remaining is 0, the delay lasts until
+	X-RateLimit-Reset, given by OpenRouter as a timestamp in milliseconds.
+
+	Args:
+		headers (Any): Response headers, with a get method.
+		now (Optional[float], optional): Current time, defaults to time.time().
+
+	Returns:
+		Optional[float]: Delay in seconds, or None if the server did not give one.
+	"""
+	if headers is None:
+		return None
+	if now is None:
+		now = time.time()
+
+	retryAfter: Optional[str] = headers.get("Retry-After")
+	if retryAfter:
+		try:
+			return max(float(retryAfter), 0.0)
+		except ValueError:
+			pass
+		try:
+			return max(email.utils.parsedate_to_datetime(retryAfter).timestamp() - now, 0.0)
+		except (TypeError, ValueError, IndexError):
+			pass
+
+	if headers.get("X-RateLimit-Remaining") == "0" and headers.get("X-RateLimit-Reset"):
+		try:
+			reset: float = float(headers["X-RateLimit-Reset"])
+		except ValueError:
+			return None
+		if reset > 1e11:
+			# Timestamp in milliseconds
+			reset /= 1000
+		if reset > 1e9:
+			return max(reset - now, 0.0)
+		return max(reset, 0.0)
+
+	return None
+
+
+class RetryPolicy:
+	"""
+	Decide whether and when a failed request is sent again.
+
+	This base policy never retries; subclasses override getDelay.
+	"""
+
+	def getDelay(self, error: BaseException, attempt: int, switchingModel: bool) -> Optional[float]:
+		"""
+		Return the delay before the next attempt.
+
+		Args:
+			error (BaseException): Error of the failed attempt.
+			attempt (int): Number of attempts already made, starting at 1.
+			switchingModel (bool): Whether the next attempt goes to another model.
+
+		Returns:
+			Optional[float]: Delay in seconds, or None to give up.
+		"""
+		return None
+
+
+class BackoffRetryPolicy(RetryPolicy):
+	"""
+	Exponential backoff with full jitter, honouring the server delays.
+
+	Transient errors are retried after a random delay between 0 and an
+	exponentially growing bound, unless the server requested a delay
+	with Retry-After or the X-RateLimit headers. When the next attempt
+	goes to another model, the delay of the server and the growth of the
+	bound are ignored, as they apply to the failed model only. By default the number of attempts
+	is not limited: the deadline of the question is the only limit.
+	"""
+
+	def __init__(
+		self,
+		baseDelay: float = 0.5,
+		maxDelay: float = 20.0,
+		maxAttempts: Optional[int] = None,
+		randomGenerator: Optional[random.Random] = None,
+	) -> None:
+		"""
+		Initialize the policy.
+
+		Args:
+			baseDelay (float, optional): Bound of the first delay, in seconds.
+			maxDelay (float, optional): Maximum bound of the computed delays, in seconds.
+			maxAttempts (Optional[int], optional): Maximum number of attempts of a question,
+				None for no limit other than the deadline.
+			randomGenerator (Optional[random.Random], optional): Source of the jitter.
+		"""
+		self.baseDelay: float = baseDelay
+		self.maxDelay: float = maxDelay
+		self.maxAttempts: Optional[int] = maxAttempts
+		self._random: random.Random = randomGenerator or random.Random()
+
+	def getDelay(self, error: BaseException, attempt: int, switchingModel: bool) -> Optional[float]:
+		if self.maxAttempts is not None and attempt >= self.maxAttempts:
+			return None
+
+		if not switchingModel and not isTransientError(error):
+			return None
+
+		if not switchingModel:
+			serverDelay: Optional[float] = getServerDelay(getattr(error, "headers", None))
+			if serverDelay is not None:
+				return serverDelay
+
+		if switchingModel:
+			return self._random.uniform(0, self.baseDelay)
+
+		bound: float = min(self.maxDelay, self.baseDelay * 2 ** (attempt - 1))
+		return self._random.uniform(0, bound)
+
+
+class Deadline:
+	"""
+	Time limit of a question, shared by all its attempts.
+
+	When started with cancelOnExpiry, the deadline cancels the requests of
+	the question once it is reached, until it is stopped.
+	"""
+
+	def __init__(self, duration: float) -> None:
+		"""
+		Start the deadline.
+
+		Args:
+			duration (float): Time given to the question, in seconds.
+		"""
+		self.expiresAt: float = time.monotonic() + duration
+		self._expired: bool = False
+		self._stopped: bool = False
+		self._timer: Optional[threading.Timer] = None
+		self._lock: threading.Lock = threading.Lock()
+
+	@property
+	def remaining(self) -> float:
+		"""
+		Seconds left before the deadline, never negative.
+		"""
+		return max(self.expiresAt - time.monotonic(), 0.0)
+
+	@property
+	def expired(self) -> bool:
+		"""
+		Whether the deadline was reached before being stopped.
+		"""
+		with self._lock:
+			return self._expired or (not self._stopped and self.remaining <= 0)
+
+	def cancelOnExpiry(self, cancelToken: CancelToken) -> None:
+		"""
+		Cancel a token when the deadline is reached, unless it is stopped before.
+
+		Args:
+			cancelToken (CancelToken): Token of the requests of the question.
+
+		Returns:
+			None
+		"""
+		self._timer = threading.Timer(self.remaining, self._expire, args=(cancelToken,))
+		self._timer.daemon = True
+		self._timer.start()
+
+	def _expire(self, cancelToken: CancelToken) -> None:
+		with self._lock:
+			if self._stopped:
+				return
+			self._expired = True
+		cancelToken.cancel()
+
+	def stop(self) -> None:
+		"""
+		Stop the deadline, for example once the answer is complete.
+
+		Returns:
+			None
+		"""
+		with self._lock:
+			self._stopped = True
+		if self._timer is not None:
+			self._timer.cancel()
@@ -0,0 +1,281 @@
+# globalPlugins/askOpenRouter/scoreboard.py
+
+# Copyright(C) 2026-2028 Abdel <abdelkrim.bensaid@gmail.com>
+# Released under GPL 2
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import json
+import os
+import random
+import threading
+import time
+from logHandler import log
+from typing import Any, Dict, List, Optional
+
+# Time (seconds) after which the weight of an observation is halved
+DEFAULT_HALF_LIFE: float = 86400.0
+
+# Probability of choosing a candidate uniformly, to keep exploring models
+DEFAULT_EXPLORATION: float = 0.1
+
+# Smoothing factor of the latency moving averages
+_EWMA_ALPHA: float = 0.3
+
+# Latency (seconds) assumed for a model which was never observed
+_DEFAULT_LATENCY: float = 8.0
+
+# Decayed weight below which an observation is forgotten
+_MIN_WEIGHT: float = 0.01
+
+# Minimum interval (seconds) between two writes of the scoreboard file
+_SAVE_INTERVAL: float = 30.0
+
+
+class ModelStats:
+	"""
+	Decayed observations of the requests sent to one model.
+	"""
+
+	__slots__ = ("ttfb", "latency", "successes", "failures", "statusCodes", "updatedAt")
+
+	def __init__(self) -> None:
+		self.ttfb: Optional[float] = None
+		self.latency: Optional[float] = None
+		self.successes: float = 0.0
+		self.failures: float = 0.0
+		self.statusCodes: Dict[str, float] = {}
+		self.updatedAt: float = time.time()
+
+	def decay(self, now: float, halfLife: float) -> None:
+		"""
+		Reduce the weight of the observations according to their age.
+
+		The counters shrink, and the latency average moves back towards the
+		latency assumed for an unknown model, so that a model which was slow
+		once is tried again after a while. Once the counters are negligible,
+		the averages are forgotten.
+
+		Args:
+			now (float): Current time.
+			halfLife (float): Time after which the weight is halved.
+
+		Returns:
+			None
+		"""
+		elapsed: float = now - self.updatedAt
+		if elapsed <= 0:
+			return
+		factor: float = 0.5 ** (elapsed / halfLife)
+		self.successes *= factor
+		self.failures *= factor
+		self.statusCodes = {
+			code: count * factor for code, count in self.statusCodes.items() if count * factor >= _MIN_WEIGHT
+		}
+		if self.latency is not None:
+			self.latency = _DEFAULT_LATENCY + (self.latency - _DEFAULT_LATENCY) * factor
+		if self.successes + self.failures < _MIN_WEIGHT:
+			self.ttfb = None
+			self.latency = None
+		self.updatedAt = now
+
+	def toDict(self) -> Dict[str, Any]:
+		return {name: getattr(self, name) for name in self.__slots__}
+
+	@classmethod
+	def fromDict(cls, data: Dict[str, Any]) -> "ModelStats":
+		stats = cls()
+		for name in cls.__slots__:
+			if name in data:
+				setattr(stats, name, data[name])
+		return stats
+
+
+class ModelScoreboard:
+	"""
+	Per-model latency and reliability statistics driving model selection.
+
+	Each request outcome updates the time to first byte and total latency
+	moving averages, and the success, failure and status code counters of
+	the model. Counters and averages decay over time, and the scoreboard is
+	persisted between sessions. Models are then chosen at random, weighted
+	by their estimated success rate divided by their expected latency, with
+	a small share of uniform choices to keep exploring.
+	"""
+
+	def __init__(
+		self,
+		path: Optional[str] = None,
+		halfLife: float = DEFAULT_HALF_LIFE,
+		exploration: float = DEFAULT_EXPLORATION,
+	) -> None:
+		"""
+		Initialize the scoreboard. The file is loaded lazily.
+
+		Args:
+			path (Optional[str], optional): JSON file used to persist the scoreboard.
+			halfLife (float, optional): Time after which the weight of an observation is halved.
+			exploration (float, optional): Probability of a uniform choice.
+		"""
+		self.path: Optional[str] = path
+		self.halfLife: float = halfLife
+		self.exploration: float = exploration
+		self._stats: Dict[str, ModelStats] = {}
+		self._loaded: bool = False
+		self._lastSave: float = 0.0
+		self._dirty: bool = False
+		self._lock: threading.RLock = threading.RLock()
+
+	def _load(self) -> None:
+		if self._loaded:
+			return
+		self._loaded = True
+		if not self.path or not os.path.exists(self.path):
+			return
+		try:
+			with open(self.path, "r", encoding="utf-8") as f:
+				data: Dict[str, Dict[str, Any]] = json.load(f)
+			self._stats = {model: ModelStats.fromDict(entry) for model, entry in data.items()}
+		except (OSError, ValueError, TypeError, AttributeError):
+			log.debugWarning("askOpenRouter: ignoring unreadable scoreboard", exc_info=True)
+
+	def record(
+		self,
+		model: str,
+		status: int,
+		ttfb: Optional[float] = None,
+		latency: Optional[float] = None,
+	) -> None:
+		"""
+		Record the outcome of a request.
+
+		Args:
+			model (str): Model identifier.
+			status (int): HTTP status code, or 0 for a network error.
+			ttfb (Optional[float], optional): Time to first byte, in seconds.
+			latency (Optional[float], optional): Total request duration, in seconds.
+
+		Returns:
+			None
+		"""
+		now: float = time.time()
+		with self._lock:
+			self._load()
+			stats: ModelStats = self._stats.setdefault(model, ModelStats())
+			stats.decay(now, self.halfLife)
+
+			if 200 <= status < 300:
+				stats.successes += 1
+			else:
+				stats.failures += 1
+
+			code: str = str(status)
+			stats.statusCodes[code] = stats.statusCodes.get(code, 0.0) + 1
+
+			if ttfb is not None:
+				stats.ttfb = ttfb if stats.ttfb is None else stats.ttfb + _EWMA_ALPHA * (ttfb - stats.ttfb)
+			if latency is not None:
+				stats.latency = (
+					latency
+					if stats.latency is None
+					else stats.latency + _EWMA_ALPHA * (latency - stats.latency)
+				)
+
+			self._dirty = True
+			if now - self._lastSave >= _SAVE_INTERVAL:
+				self.save()
+
+	def weight(self, model: str) -> float:
+		"""
+		Return the selection weight of a model.
+
+		The weight is the smoothed success rate divided by the expected
+		latency; unknown models get neutral prior values.
+
+		Args:
+			model (str): Model identifier.
+
+		Returns:
+			float: Selection weight, higher is better.
+		"""
+		with self._lock:
+			self._load()
+			stats: Optional[ModelStats] = self._stats.get(model)
+			if stats is None:
+				return 0.5 / _DEFAULT_LATENCY
+			stats.decay(time.time(), self.halfLife)
+			successRate: float = (stats.successes + 1) / (stats.successes + stats.failures + 2)
+			latency: float = stats.latency if stats.latency is not None else _DEFAULT_LATENCY
+			return successRate / max(latency, 0.1)
+
+	def choose(self, candidates: List[str]) -> str:
+		"""
+		Choose a model among the candidates.
+
+		Args:
+			candidates (List[str]): Model identifiers; must not be empty.
+
+		Returns:
+			str: The chosen model.
+		"""
+		return self.chooseMany(candidates, 1)[0]
+
+	def chooseMany(self, candidates: List[str], count: int) -> List[str]:
+		"""
+		Choose several distinct models, the best ranked being the most likely.
+
+		Args:
+			candidates (List[str]): Model identifiers.
+			count (int): Number of models to choose.
+
+		Returns:
+			List[str]: Up to count distinct models, in order of choice.
+		"""
+		remaining: List[str] = list(candidates)
+		chosen: List[str] = []
+
+		while remaining and len(chosen) < count:
+			if random.random() < self.exploration:
+				index: int = random.randrange(len(remaining))
+			else:
+				weights: List[float] = [self.weight(model) for model in remaining]
+				index = random.choices(range(len(remaining)), weights=weights)[0]
+			chosen.append(remaining.pop(index))
+
+		return chosen
+
+	def getStats(self, model: str) -> Optional[ModelStats]:
+		"""
+		Return the statistics of a model, if any.
+
+		Args:
+			model (str): Model identifier.
+
+		Returns:
+			Optional[ModelStats]: The statistics, or None if the model was never observed.
+		"""
+		with self._lock:
+			self._load()
+			return self._stats.get(model)
+
+	def save(self) -> None:
+		"""
+		Write the scoreboard to disk if it changed.
+
+		Returns:
+			None
+		"""
+		with self._lock:
+			if not self.path or not self._dirty:
+				return
+			data: Dict[str, Dict[str, Any]] = {model: stats.toDict() for model, stats in self._stats.items()}
+			self._dirty = False
+			self._lastSave = time.time()
+
+			tmpPath: str = self.path + ".tmp"
+			try:
+				with open(tmpPath, "w", encoding="utf-8") as f:
+					json.dump(data, f)
+				os.replace(tmpPath, self.path)
+			except OSError:
+				log.debugWarning("askOpenRouter: could not save the scoreboard", exc_info=True)
@@ -0,0 +1,507 @@
+# globalPlugins/askOpenRouter/sessions.py
+
+# Copyright(C) 2026-2028 Abdel <abdelkrim.bensaid@gmail.com>
+# Released under GPL 2
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import re
+import threading
+import time
+from logHandler import log
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+# SQLite is only imported when the store is first used
+if TYPE_CHECKING:
+	import sqlite3
+
+# Maximum length of the names generated from the first question
+_MAX_NAME_LENGTH: int = 60
+
+_SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS sessions (
+	id INTEGER PRIMARY KEY,
+	name TEXT NOT NULL,
+	model TEXT NOT NULL DEFAULT '',
+	createdAt REAL NOT NULL,
+	updatedAt REAL NOT NULL,
+	messageCount INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS sessionsByUpdate ON sessions (updatedAt DESC);
+CREATE TABLE IF NOT EXISTS messages (
+	id INTEGER PRIMARY KEY,
+	sessionId INTEGER NOT NULL REFERENCES sessions (id) ON DELETE CASCADE,
+	position INTEGER NOT NULL,
+	role TEXT NOT NULL,
+	content TEXT NOT NULL,
+	createdAt REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS messagesBySession ON messages (sessionId, position);
+CREATE TABLE IF NOT EXISTS summaries (
+	sessionId INTEGER PRIMARY KEY REFERENCES sessions (id) ON DELETE CASCADE,
+	content TEXT NOT NULL,
+	coveredCount INTEGER NOT NULL,
+	model TEXT NOT NULL,
+	createdAt REAL NOT NULL
+);
+"""
+
+# Full-text index of the message contents, kept up to date by triggers
+_FULL_TEXT_SCHEMA: str = """
+CREATE VIRTUAL TABLE messagesIndex USING fts5 (
+	content,
+	content='messages',
+	content_rowid='id',
+	tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER messagesIndexInsert AFTER INSERT ON messages BEGIN
+	INSERT INTO messagesIndex (rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER messagesIndexDelete AFTER DELETE ON messages BEGIN
+	INSERT INTO messagesIndex (messagesIndex, rowid, content) VALUES ('delete', old.id, old.content);
+END;
+INSERT INTO messagesIndex (messagesIndex) VALUES ('rebuild');
+"""
+
+# Characters surrounding the matched terms in the search snippets
+SNIPPET_START: str = "["
+SNIPPET_END: str = "]"
+
+# Number of words of the search snippets
+_SNIPPET_WORDS: int = 16
+
+
+class SessionInfo:
+	"""
+	Summary of a stored conversation, without its messages.
+	"""
+
+	__slots__ = ("id", "name", "model", "createdAt", "updatedAt", "messageCount")
+
+	def __init__(
+		self,
+		id: int,
+		name: str,
+		model: str,
+		createdAt: float,
+		updatedAt: float,
+		messageCount: int,
+	) -> None:
+		self.id: int = id
+		self.name: str = name
+		self.model: str = model
+		self.createdAt: float = createdAt
+		self.updatedAt: float = updatedAt
+		self.messageCount: int = messageCount
+
+
+class ConversationSummary:
+	"""
+	Summary of the first messages of a conversation.
+	"""
+
+	__slots__ = ("content", "coveredCount", "model", "createdAt")
+
+	def __init__(self, content: str, coveredCount: int, model: str, createdAt: float) -> None:
+		self.content: str = content
+		self.coveredCount: int = coveredCount
+		self.model: str = model
+		self.createdAt: float = createdAt
+
+
+class SearchHit:
+	"""
+	Message matching a search, with the conversation it belongs to.
+	"""
+
+	__slots__ = ("sessionId", "sessionName", "role", "snippet", "createdAt")
+
+	def __init__(self, sessionId: int, sessionName: str, role: str, snippet: str, createdAt: float) -> None:
+		self.sessionId: int = sessionId
+		self.sessionName: str = sessionName
+		self.role: str = role
+		self.snippet: str = snippet
+		self.createdAt: float = createdAt
+
+
+def _makeFullTextQuery(text: str) -> str:
+	"""
+	Turn the text typed by the user into a full-text query.
+
+	Every word must match, and the last one may be incomplete. Words are
+	quoted, so the query syntax characters typed by the user are ignored.
+
+	Args:
+		text (str): Search text.
+
+	Returns:
+		str: The FTS5 query, or an empty string if the text has no word.
+	"""
+	words: List[str] = re.findall(r"\w+", text)
+	if not words:
+		return ""
+	terms: List[str] = [f'"{word}"' for word in words]
+	terms[-1] += "*"
+	return " ".join(terms)
+
+
+def makeSessionName(prompt: str) -> str:
+	"""
+	Build a conversation name from its first question.
+
+	Args:
+		prompt (str): First question of the conversation.
+
+	Returns:
+		str: The first line of the question, shortened if needed.
+	"""
+	name: str = prompt.strip().split("\n", 1)[0].strip()
+	if len(name) > _MAX_NAME_LENGTH:
+		name = name[: _MAX_NAME_LENGTH - 1].rstrip() + "…"
+	return name
+
+
+class SessionStore:
+	"""
+	SQLite store holding any number of named conversations.
+
+	Conversations are indexed by last use and messages by conversation
+	and position, so listing, opening and appending only touch the rows
+	concerned, however many conversations are stored. The database is
+	opened on first use and shared by all threads behind a lock.
+	"""
+
+	def __init__(self, path: str) -> None:
+		"""
+		Initialize the store. The database is opened lazily.
+
+		Args:
+			path (str): Path of the SQLite database.
+		"""
+		self.path: str = path
+		self._db: Optional["sqlite3.Connection"] = None
+		self._fullText: bool = False
+		self._lock: threading.RLock = threading.RLock()
+
+	def _connect(self) -> "sqlite3.Connection":
+		if self._db is None:
+			import sqlite3
+
+			db = sqlite3.connect(self.path, check_same_thread=False)
+			db.execute("PRAGMA journal_mode=WAL")
+			db.execute("PRAGMA synchronous=NORMAL")
+			db.execute("PRAGMA foreign_keys=ON")
+			db.executescript(_SCHEMA)
+			self._fullText = self._createFullTextIndex(db)
+			self._db = db
+		return self._db
+
+	@staticmethod
+	def _createFullTextIndex(db: "sqlite3.Connection") -> bool:
+		"""
+		Create the full-text index if needed, indexing the existing messages.
+
+		Returns:
+			bool: False if this SQLite build does not support FTS5.
+		"""
+		import sqlite3
+
+		exists = db.execute(
+			"SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'messagesIndex'",
+		).fetchone()
+		if exists:
+			return True
+		try:
+			with db:
+				db.executescript(_FULL_TEXT_SCHEMA)
+		except sqlite3.OperationalError:
+			log.debugWarning("askOpenRouter: FTS5 is not available, using a slower search", exc_info=True)
+			return False
+		return True
+
+	def createSession(self, name: str, model: str = "") -> int:
+		"""
+		Create an empty conversation.
+
+		Args:
+			name (str): Name of the conversation.
+			model (str, optional): Model used by the conversation.
+
+		Returns:
+			int: Identifier of the new conversation.
+		"""
+		now: float = time.time()
+		with self._lock:
+			db = self._connect()
+			with db:
+				cursor = db.execute(
+					"INSERT INTO sessions (name, model, createdAt, updatedAt) VALUES (?, ?, ?, ?)",
+					(name, model, now, now),
+				)
+			return int(cursor.lastrowid)
+
+	def getSession(self, sessionId: int) -> Optional[SessionInfo]:
+		"""
+		Return the summary of a conversation.
+
+		Args:
+			sessionId (int): Conversation identifier.
+
+		Returns:
+			Optional[SessionInfo]: The summary, or None if the conversation does not exist.
+		"""
+		with self._lock:
+			row = (
+				self._connect()
+				.execute(
+					"SELECT id, name, model, createdAt, updatedAt, messageCount FROM sessions WHERE id = ?",
+					(sessionId,),
+				)
+				.fetchone()
+			)
+		return SessionInfo(*row) if row else None
+
+	def getLatestSession(self) -> Optional[SessionInfo]:
+		"""
+		Return the most recently used conversation.
+
+		Returns:
+			Optional[SessionInfo]: The conversation, or None if the store is empty.
+		"""
+		sessions: List[SessionInfo] = self.listSessions(limit=1)
+		return sessions[0] if sessions else None
+
+	def countSessions(self) -> int:
+		"""
+		Return the number of stored conversations.
+
+		Returns:
+			int: Number of conversations.
+		"""
+		with self._lock:
+			return int(self._connect().execute("SELECT COUNT(*) FROM sessions").fetchone()[0])
+
+	def listSessions(self, offset: int = 0, limit: int = 100) -> List[SessionInfo]:
+		"""
+		List conversations, the most recently used first.
+
+		Args:
+			offset (int, optional): Number of conversations to skip.
+			limit (int, optional): Maximum number of conversations returned.
+
+		Returns:
+			List[SessionInfo]: Conversation summaries.
+		"""
+		with self._lock:
+			rows = (
+				self._connect()
+				.execute(
+					"SELECT id, name, model, createdAt, updatedAt, messageCount FROM sessions "
+					"ORDER BY updatedAt DESC LIMIT ? OFFSET ?",
+					(limit, offset),
+				)
+				.fetchall()
+			)
+		return [SessionInfo(*row) for row in rows]
+
+	def renameSession(self, sessionId: int, name: str) -> None:
+		"""
+		Rename a conversation.
+
+		Args:
+			sessionId (int): Conversation identifier.
+			name (str): New name.
+
+		Returns:
+			None
+		"""
+		with self._lock:
+			db = self._connect()
+			with db:
+				db.execute("UPDATE sessions SET name = ? WHERE id = ?", (name, sessionId))
+
+	def setModel(self, sessionId: int, model: str) -> None:
+		"""
+		Change the model used by a conversation.
+
+		Args:
+			sessionId (int): Conversation identifier.
+			model (str): Model identifier.
+
+		Returns:
+			None
+		"""
+		with self._lock:
+			db = self._connect()
+			with db:
+				db.execute("UPDATE sessions SET model = ? WHERE id = ?", (model, sessionId))
+
+	def deleteSession(self, sessionId: int) -> None:
+		"""
+		Delete a conversation and its messages.
+
+		Args:
+			sessionId (int): Conversation identifier.
+
+		Returns:
+			None
+		"""
+		with self._lock:
+			db = self._connect()
+			with db:
+				db.execute("DELETE FROM sessions WHERE id = ?", (sessionId,))
+
+	def loadMessages(self, sessionId: int) -> List[Dict[str, str]]:
+		"""
+		Load the messages of a conversation.
+
+		Args:
+			sessionId (int): Conversation identifier.
+
+		Returns:
+			List[Dict[str, str]]: Messages with role and content, in order.
+		"""
+		with self._lock:
+			rows = (
+				self._connect()
+				.execute(
+					"SELECT role, content FROM messages WHERE sessionId = ? ORDER BY position",
+					(sessionId,),
+				)
+				.fetchall()
+			)
+		return [{"role": role, "content": content} for role, content in rows]
+
+	def appendMessages(self, sessionId: int, messages: List[Dict[str, Any]]) -> None:
+		"""
+		Append messages to a conversation in a single transaction.
+
+		Args:
+			sessionId (int): Conversation identifier.
+			messages (List[Dict[str, Any]]): Messages with role and content.
+
+		Returns:
+			None
+		"""
+		if not messages:
+			return
+		now: float = time.time()
+		with self._lock:
+			db = self._connect()
+			with db:
+				row = db.execute("SELECT messageCount FROM sessions WHERE id = ?", (sessionId,)).fetchone()
+				if row is None:
+					raise KeyError(sessionId)
+				start: int = row[0]
+				db.executemany(
+					"INSERT INTO messages (sessionId, position, role, content, createdAt) VALUES (?, ?, ?, ?, ?)",
+					[
+						(sessionId, start + i, m.get("role", ""), m.get("content", "") or "", now)
+						for i, m in enumerate(messages)
+					],
+				)
+				db.execute(
+					"UPDATE sessions SET messageCount = ?, updatedAt = ? WHERE id = ?",
+					(start + len(messages), now, sessionId),
+				)
+
+	def getSummary(self, sessionId: int) -> Optional[ConversationSummary]:
+		"""
+		Return the summary of the first messages of a conversation.
+
+		Args:
+			sessionId (int): Conversation identifier.
+
+		Returns:
+			Optional[ConversationSummary]: The summary, or None if the conversation was not summarised.
+		"""
+		with self._lock:
+			row = (
+				self._connect()
+				.execute(
+					"SELECT content, coveredCount, model, createdAt FROM summaries WHERE sessionId = ?",
+					(sessionId,),
+				)
+				.fetchone()
+			)
+		return ConversationSummary(*row) if row else None
+
+	def setSummary(self, sessionId: int, content: str, coveredCount: int, model: str) -> None:
+		"""
+		Store the summary of the first messages of a conversation, replacing the previous one.
+
+		The messages themselves are kept.
+
+		Args:
+			sessionId (int): Conversation identifier.
+			content (str): Text of the summary.
+			coveredCount (int): Number of messages, from the first one, the summary replaces.
+			model (str): Model which wrote the summary.
+
+		Returns:
+			None
+		"""
+		with self._lock:
+			db = self._connect()
+			with db:
+				db.execute(
+					"INSERT OR REPLACE INTO summaries (sessionId, content, coveredCount, model, createdAt) "
+					"VALUES (?, ?, ?, ?, ?)",
+					(sessionId, content, coveredCount, model, time.time()),
+				)
+
+	def search(self, text: str, limit: int = 100) -> List[SearchHit]:
+		"""
+		Search the messages of every conversation.
+
+		With the full-text index, hits are ranked by relevance and their
+		snippets highlight the matched words between SNIPPET_START and
+		SNIPPET_END. Otherwise, the newest messages containing the text
+		are returned.
+
+		Args:
+			text (str): Words to search for.
+			limit (int, optional): Maximum number of hits.
+
+		Returns:
+			List[SearchHit]: Matching messages, the best first.
+		"""
+		with self._lock:
+			db = self._connect()
+			if self._fullText:
+				query: str = _makeFullTextQuery(text)
+				if not query:
+					return []
+				rows = db.execute(
+					"SELECT m.sessionId, s.name, m.role, "
+					"snippet(messagesIndex, 0, ?, ?, '…', ?), m.createdAt "
+					"FROM messagesIndex JOIN messages m ON m.id = messagesIndex.rowid "
+					"JOIN sessions s ON s.id = m.sessionId "
+					"WHERE messagesIndex MATCH ? ORDER BY rank LIMIT ?",
+					(SNIPPET_START, SNIPPET_END, _SNIPPET_WORDS, query, limit),
+				).fetchall()
+			else:
+				if not text.strip():
+					return []
+				pattern: str = (
+					"%" + text.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+				)
+				rows = db.execute(
+					"SELECT m.sessionId, s.name, m.role, substr(m.content, 1, 200), m.createdAt "
+					"FROM messages m JOIN sessions s ON s.id = m.sessionId "
+					"WHERE m.content LIKE ? ESCAPE '\\' ORDER BY m.id DESC LIMIT ?",
+					(pattern, limit),
+				).fetchall()
+		return [SearchHit(*row) for row in rows]
+
+	def close(self) -> None:
+		"""
+		Close the database.
+
+		Returns:
+			None
+		"""
+		with self._lock:
+			if self._db is not None:
+				self._db.close()
+				self._db = None
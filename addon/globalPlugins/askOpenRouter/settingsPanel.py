@@ -0,0 +1,478 @@
+# globalPlugins/askOpenRouter/settingsPanel.py
+
+# Copyright(C) 2026-2028 Abdel <abdelkrim.bensaid@gmail.com>
+# Released under GPL 2
+
+import threading
+import wx
+import addonHandler
+import config
+import gui
+from logHandler import log
+from typing import Callable, List, Dict, Optional, Sequence
+
+from gui.settingsDialogs import SettingsPanel
+from .catalogue import SORT_BY_PROMPT_PRICE, ModelInfo
+from .functions import getAvailableModels
+
+addonHandler.initTranslation()
+
+_: Callable[[str], str]
+
+
+# Models List
+class ModelsListCtrl(wx.ListCtrl):
+	"""
+	Virtual list of models with type-to-filter support.
+
+	Rows are not stored in the control: only the visible ones are
+	materialised through OnGetItemText, so the list stays fast with
+	thousands of models. Filtering works on lowercase model ids computed
+	once when the models are set.
+	"""
+
+	def __init__(self, parent: wx.Window) -> None:
+		"""
+		Initialize the list.
+
+		Args:
+			parent (wx.Window): Parent window.
+		"""
+		super().__init__(
+			parent,
+			style=wx.LC_REPORT | wx.LC_VIRTUAL | wx.LC_SINGLE_SEL,
+		)
+		# Translators: Header of the column containing the model identifiers.
+		self.InsertColumn(0, _("Model"), width=320)
+		# Translators: Header of the column containing the price of a prompt token.
+		self.InsertColumn(1, _("Prompt price"), width=120)
+		self.models: Sequence[ModelInfo] = ()
+		self._searchKeys: List[str] = []
+		self._visible: List[int] = []
+		self._labels: Dict[int, str] = {}
+
+	def setModels(self, models: Sequence[ModelInfo]) -> None:
+		"""
+		Replace the displayed models.
+
+		Args:
+			models (Sequence[ModelInfo]): Models, in display order.
+
+		Returns:
+			None
+		"""
+		self.models = models
+		self._searchKeys = [m.id.lower() for m in models]
+		self._labels = {}
+		self.applyFilter("")
+
+	def applyFilter(self, text: str) -> None:
+		"""
+		Only show the models whose id contains the given text.
+
+		The current selection is kept when it still matches.
+
+		Args:
+			text (str): Filter text, case insensitive.
+
+		Returns:
+			None
+		"""
+		selected: Optional[str] = self.getSelectedModelId()
+		needle: str = text.strip().lower()
+
+		if needle:
+			self._visible = [i for i, key in enumerate(self._searchKeys) if needle in key]
+		else:
+			self._visible = list(range(len(self.models)))
+
+		self.SetItemCount(len(self._visible))
+		self.Refresh()
+
+		if selected:
+			self.selectModel(selected)
+
+	def OnGetItemText(self, item: int, column: int) -> str:
+		if item >= len(self._visible):
+			return ""
+		index: int = self._visible[item]
+		model: ModelInfo = self.models[index]
+		if column == 0:
+			return model.id
+		label: Optional[str] = self._labels.get(index)
+		if label is None:
+			price: float = model.promptPricing
+			# Translators: Displayed instead of the price of a free model.
+			label = self._labels[index] = _("FREE") if price == 0 else f"{price}$"
+		return label
+
+	def getSelectedModelId(self) -> Optional[str]:
+		"""
+		Return the id of the selected model.
+
+		Returns:
+			Optional[str]: The selected model id, or None.
+		"""
+		item: int = self.GetFirstSelected()
+		if item == -1 or item >= len(self._visible):
+			return None
+		return self.models[self._visible[item]].id
+
+	def selectModel(self, modelId: str) -> bool:
+		"""
+		Select and focus the row of a model, if it is visible.
+
+		Args:
+			modelId (str): Model identifier.
+
+		Returns:
+			bool: True if the model was found.
+		"""
+		for item, index in enumerate(self._visible):
+			if self.models[index].id == modelId:
+				self.Select(item)
+				self.Focus(item)
+				self.EnsureVisible(item)
+				return True
+		return False
+
+
+# Settings Panel
+class OpenRouterSettingsPanel(SettingsPanel):
+	"""
+	NVDA settings panel for configuring OpenRouter integration.
+
+	This panel allows the user to:
+		- Enter and store their OpenRouter API key
+		- Toggle visibility of the API key
+		- Enable full chat history display
+		- Enable streamed answers read aloud as they arrive
+		- Enable the summary of the older part of long chats
+		- Choose how many free models are asked at once
+		- Enable selection of all available models (free and paid)
+		- Choose a specific model sorted by price
+	"""
+
+	# Set to the add-on summary when the global plugin is initialized
+	title: str = ""
+
+	def makeSettings(self, settingsSizer: wx.Sizer) -> None:
+		"""
+		Build the settings UI components.
+
+		Args:
+			settingsSizer (wx.Sizer): Parent sizer provided by NVDA.
+		"""
+		self.sHelper: gui.guiHelper.BoxSizerHelper = gui.guiHelper.BoxSizerHelper(self, sizer=settingsSizer)
+
+		# =========================
+		# API KEY
+		# =========================
+
+		self.apiKeyLabel: wx.StaticText = wx.StaticText(
+			self,
+			# Translators: Label of the field that must contain the OpenRouter API key.
+			label=_("OpenRouter API Key:"),
+		)
+		self.sHelper.addItem(self.apiKeyLabel)
+
+		self.apiKeyHidden: wx.TextCtrl = wx.TextCtrl(
+			self,
+			style=wx.TE_PASSWORD,
+		)
+		self.sHelper.addItem(self.apiKeyHidden, flag=wx.EXPAND)
+
+		self.apiKeyHidden.SetValue(
+			config.conf["askOpenRouter"]["apiKey"],
+		)
+
+		self.apiKeyVisible: wx.TextCtrl = wx.TextCtrl(self)
+		self.sHelper.addItem(self.apiKeyVisible, flag=wx.EXPAND)
+		self.apiKeyVisible.Hide()
+
+		self.showApiKeyCheckBox: wx.CheckBox = wx.CheckBox(
+			self,
+			# Translators: Label of the checkbox to display the OpenRouter API key.
+			label=_("Show API key"),
+		)
+		self.sHelper.addItem(self.showApiKeyCheckBox)
+
+		self.showApiKeyCheckBox.Bind(
+			wx.EVT_CHECKBOX,
+			self.onToggleApiVisibility,
+		)
+
+		# =========================
+		# FULL HISTORY
+		# =========================
+
+		self.fullHistoryCheckBox: wx.CheckBox = wx.CheckBox(
+			self,
+			# Translators: Label of the checkbox to display chat history.
+			label=_("Display the full chat history for continuous discussions"),
+		)
+		self.sHelper.addItem(self.fullHistoryCheckBox)
+
+		self.fullHistoryCheckBox.SetValue(
+			config.conf["askOpenRouter"]["fullHistory"],
+		)
+
+		# =========================
+		# STREAMING
+		# =========================
+
+		self.streamResponsesCheckBox: wx.CheckBox = wx.CheckBox(
+			self,
+			# Translators: Label of the checkbox to read answers aloud while they are being generated.
+			label=_("Read answers aloud while they are being generated (streaming)"),
+		)
+		self.sHelper.addItem(self.streamResponsesCheckBox)
+
+		self.streamResponsesCheckBox.SetValue(
+			config.conf["askOpenRouter"].get("streamResponses", False),
+		)
+
+		# =========================
+		# RESPONSE CACHE
+		# =========================
+
+		self.useResponseCacheCheckBox: wx.CheckBox = wx.CheckBox(
+			self,
+			# Translators: Label of the checkbox to reuse the stored answers to identical questions.
+			label=_("Reuse the stored answer when the same question is asked again to the same model"),
+		)
+		self.sHelper.addItem(self.useResponseCacheCheckBox)
+
+		self.useResponseCacheCheckBox.SetValue(
+			config.conf["askOpenRouter"].get("useResponseCache", False),
+		)
+
+		# =========================
+		# COMPACTION OF LONG CHATS
+		# =========================
+
+		self.compactHistoryCheckBox: wx.CheckBox = wx.CheckBox(
+			self,
+			# Translators: Label of the checkbox to summarise the older part of long chats.
+			label=_("Summarise the older part of long chats with a free model, to send shorter questions"),
+		)
+		self.sHelper.addItem(self.compactHistoryCheckBox)
+
+		self.compactHistoryCheckBox.SetValue(
+			config.conf["askOpenRouter"].get("compactHistory", False),
+		)
+
+		# =========================
+		# HEDGED REQUESTS
+		# =========================
+
+		self.hedgedRequestsSpin: gui.nvdaControls.SelectOnFocusSpinCtrl = self.sHelper.addLabeledControl(
+			# Translators: Label of the field setting how many free models are asked the same question at once.
+			_("Number of free models asked at once (the fastest answer is kept):"),
+			gui.nvdaControls.SelectOnFocusSpinCtrl,
+			min=1,
+			max=4,
+			initial=config.conf["askOpenRouter"].get("hedgedRequests", 1),
+		)
+
+		# =========================
+		# USE ALL MODELS
+		# =========================
+
+		self.useAllModelsCheckBox: wx.CheckBox = wx.CheckBox(
+			self,
+			# Translators:
+			# Translators: Label of the checkbox to show the list of models, including paid ones.
+			label=_("Use all models, including paid ones."),
+		)
+		self.sHelper.addItem(self.useAllModelsCheckBox)
+
+		self.useAllModelsCheckBox.SetValue(
+			config.conf["askOpenRouter"].get("useAllModels", False),
+		)
+
+		self.useAllModelsCheckBox.Bind(
+			wx.EVT_CHECKBOX,
+			self.onToggleModelsList,
+		)
+
+		# =========================
+		# MODELS LIST
+		# =========================
+
+		self.modelsStatus: wx.StaticText = wx.StaticText(self)
+		self.sHelper.addItem(self.modelsStatus)
+
+		# Translators: Label of the field used to filter the list of models.
+		self.modelsFilterLabel: wx.StaticText = wx.StaticText(self, label=_("&Filter models:"))
+		self.sHelper.addItem(self.modelsFilterLabel)
+		self.modelsFilter: wx.TextCtrl = wx.TextCtrl(self)
+		self.modelsFilter.Bind(wx.EVT_TEXT, self.onFilterModels)
+		self.sHelper.addItem(self.modelsFilter, flag=wx.EXPAND)
+
+		self.modelsList: ModelsListCtrl = ModelsListCtrl(self)
+		self.sHelper.addItem(self.modelsList, flag=wx.EXPAND)
+
+		self.modelsControls: List[wx.Window] = [
+			self.modelsStatus,
+			self.modelsFilterLabel,
+			self.modelsFilter,
+			self.modelsList,
+		]
+		self.modelsData: Sequence[ModelInfo] = ()
+		self._modelsRequest: int = 0
+		self._modelsLoading: bool = False
+
+		for control in self.modelsControls:
+			control.Hide()
+
+		wx.CallAfter(self.onToggleModelsList, None)
+
+	def onToggleApiVisibility(self, evt: wx.CommandEvent) -> None:
+		"""
+		Toggle visibility of the API key field.
+		"""
+		if self.showApiKeyCheckBox.IsChecked():
+			self.apiKeyVisible.SetValue(self.apiKeyHidden.GetValue())
+			self.apiKeyHidden.Hide()
+			self.apiKeyVisible.Show()
+			self.apiKeyVisible.SetFocus()
+		else:
+			self.apiKeyHidden.SetValue(self.apiKeyVisible.GetValue())
+			self.apiKeyVisible.Hide()
+			self.apiKeyHidden.Show()
+			self.apiKeyHidden.SetFocus()
+
+		self.Layout()
+
+	def onToggleModelsList(self, evt: Optional[wx.CommandEvent]) -> None:
+		"""
+		Show or hide the models list depending on checkbox state.
+		"""
+		show: bool = self.useAllModelsCheckBox.IsChecked()
+
+		for control in self.modelsControls:
+			control.Show(show)
+
+		if show:
+			self._loadModelsIfNeeded()
+
+		self.Layout()
+
+	def onFilterModels(self, evt: wx.CommandEvent) -> None:
+		"""
+		Filter the models list with the text typed in the filter field.
+		"""
+		self.modelsList.applyFilter(self.modelsFilter.GetValue())
+
+	def _setModelsStatus(self, message: str) -> None:
+		self.modelsStatus.SetLabel(message)
+		self.Layout()
+
+	def _loadModelsIfNeeded(self) -> None:
+		"""
+		Start loading available models from OpenRouter if required.
+
+		Models are downloaded in the background, so the settings dialog
+		stays responsive, and are sorted by ascending prompt price.
+		"""
+		if not self.useAllModelsCheckBox.IsChecked():
+			return
+
+		if self.modelsData or self._modelsLoading:
+			return
+
+		apiKey: str = self.getApiKeyValue().strip()
+
+		if not apiKey:
+			# Translators: Message displayed instead of the models list when no API key is entered.
+			self._setModelsStatus(_("Enter your API key to load the list of models."))
+			return
+
+		self._modelsLoading = True
+		self._modelsRequest += 1
+		self.modelsList.Disable()
+		# Translators: Message displayed while the list of models is being downloaded.
+		self._setModelsStatus(_("Loading models…"))
+
+		threading.Thread(
+			target=self._fetchModels,
+			args=(apiKey, self._modelsRequest),
+			name="askOpenRouter.settingsModels",
+			daemon=True,
+		).start()
+
+	def _fetchModels(self, apiKey: str, request: int) -> None:
+		"""
+		Download the models, sorted by prompt price, then hand them to the GUI thread.
+		"""
+		models: Optional[Sequence[ModelInfo]] = None
+		try:
+			models = getAvailableModels(apiKey, sortBy=SORT_BY_PROMPT_PRICE)
+		except Exception:
+			log.debugWarning("askOpenRouter: could not load the models list", exc_info=True)
+
+		wx.CallAfter(self._onModelsLoaded, models, request)
+
+	def _onModelsLoaded(self, models: Optional[Sequence[ModelInfo]], request: int) -> None:
+		"""
+		Display the downloaded models, unless the panel was closed meanwhile.
+		"""
+		if not self or request != self._modelsRequest:
+			return
+
+		self._modelsLoading = False
+		self.modelsList.Enable()
+
+		if models is None:
+			# Translators: Message displayed when the list of models could not be downloaded.
+			self._setModelsStatus(_("The list of models could not be loaded."))
+			return
+
+		self.modelsData = models
+		self.modelsList.setModels(models)
+		self.modelsList.applyFilter(self.modelsFilter.GetValue())
+		# Translators: Message displayed above the list of models, with the number of models.
+		self._setModelsStatus(_("{count} models available.").format(count=len(models)))
+
+		savedModel: str = config.conf["askOpenRouter"].get(
+			"selectedModel",
+			"",
+		)
+
+		if savedModel:
+			self.modelsList.selectModel(savedModel)
+
+	def getApiKeyValue(self) -> str:
+		"""
+		Return the currently entered API key.
+
+		Returns:
+			str: API key value.
+		"""
+		if self.showApiKeyCheckBox.IsChecked():
+			return self.apiKeyVisible.GetValue()
+		return self.apiKeyHidden.GetValue()
+
+	def onSave(self) -> None:
+		"""
+		Save settings into NVDA configuration.
+		"""
+		config.conf["askOpenRouter"]["apiKey"] = self.getApiKeyValue().strip()
+
+		config.conf["askOpenRouter"]["fullHistory"] = self.fullHistoryCheckBox.GetValue()
+
+		config.conf["askOpenRouter"]["streamResponses"] = self.streamResponsesCheckBox.GetValue()
+
+		config.conf["askOpenRouter"]["useResponseCache"] = self.useResponseCacheCheckBox.GetValue()
+
+		config.conf["askOpenRouter"]["compactHistory"] = self.compactHistoryCheckBox.GetValue()
+
+		config.conf["askOpenRouter"]["hedgedRequests"] = self.hedgedRequestsSpin.GetValue()
+
+		config.conf["askOpenRouter"]["useAllModels"] = self.useAllModelsCheckBox.GetValue()
+
+		selectedModel: Optional[str] = self.modelsList.getSelectedModelId()
+
+		if selectedModel:
+			config.conf["askOpenRouter"]["selectedModel"] = selectedModel
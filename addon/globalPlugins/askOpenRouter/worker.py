@@ -0,0 +1,540 @@
+# globalPlugins/askOpenRouter/worker.py
+
+# Copyright(C) 2026-2028 Abdel <abdelkrim.bensaid@gmail.com>
+# Released under GPL 2
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+import heapq
+import itertools
+import threading
+import time
+import wx
+import ui
+from collections import deque
+from logHandler import log
+from typing import Any, Callable, Deque, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from .diagnostics import getRecorder
+
+# Interval (seconds) between spoken reminders while a job is still running
+_PROGRESS_INTERVAL: float = 10.0
+
+# Default number of jobs run at the same time
+DEFAULT_MAX_CONCURRENT: int = 2
+
+# Default number of jobs of the same conversation run at the same time
+DEFAULT_MAX_PER_CONVERSATION: int = 1
+
+# Conversation key of the jobs continuing the most recently used conversation,
+# when there is no stored conversation yet
+LATEST_CONVERSATION: str = "latest"
+
+# Number of recent queue waits kept for the statistics
+_WAIT_SAMPLES: int = 100
+
+# Thread-local storage holding the job currently executed by a worker thread
+_local = threading.local()
+
+
+class RequestJob:
+	"""
+	A unit of work executed by the request worker.
+
+	The job wraps a callable and its arguments, keeps track of its state
+	and of the last progress message reported while it runs. Jobs with a
+	lower priority value run first; jobs of the same conversation are
+	limited by the worker so that they do not interleave.
+
+	A job can be cancelled: a job still waiting never runs, and a running
+	job is told through the callbacks it registered with addCancelCallback,
+	which abort its requests in flight.
+	"""
+
+	PENDING: str = "pending"
+	RUNNING: str = "running"
+	DONE: str = "done"
+	FAILED: str = "failed"
+	CANCELLED: str = "cancelled"
+
+	# Priorities: questions asked by the user go before background work
+	INTERACTIVE: int = 0
+	BACKGROUND: int = 10
+
+	def __init__(
+		self,
+		func: Callable[..., Any],
+		*args: Any,
+		description: str = "",
+		priority: int = INTERACTIVE,
+		conversation: Optional[Hashable] = None,
+		**kwargs: Any,
+	) -> None:
+		"""
+		Initialize the job.
+
+		Args:
+			func (Callable[..., Any]): Function to execute off the main thread.
+			*args (Any): Positional arguments passed to the function.
+			description (str, optional): Human readable description, used in logs.
+			priority (int, optional): INTERACTIVE, BACKGROUND or any integer, lower first.
+			conversation (Optional[Hashable], optional): Conversation the job works on, if any.
+			**kwargs (Any): Keyword arguments passed to the function.
+		"""
+		self.func: Callable[..., Any] = func
+		self.args: Tuple[Any, ...] = args
+		self.kwargs: Dict[str, Any] = kwargs
+		self.description: str = description or getattr(func, "__name__", "job")
+		self.priority: int = priority
+		self.conversation: Optional[Hashable] = conversation
+		self.state: str = RequestJob.PENDING
+		self.progress: str = ""
+		self.submittedAt: float = time.monotonic()
+		self.startedAt: Optional[float] = None
+		self.finishedAt: Optional[float] = None
+		self.error: Optional[BaseException] = None
+		self.result: Any = None
+		self._cancelled: bool = False
+		self._cancelCallbacks: List[Callable[[], None]] = []
+		self._cancelLock: threading.Lock = threading.Lock()
+
+	@property
+	def cancelled(self) -> bool:
+		"""
+		Whether the job has been cancelled.
+		"""
+		return self._cancelled
+
+	def addCancelCallback(self, callback: Callable[[], None]) -> None:
+		"""
+		Register a function called when the job is cancelled.
+
+		The function is called at once if the job is already cancelled.
+
+		Args:
+			callback (Callable[[], None]): Function aborting the work of the job.
+
+		Returns:
+			None
+		"""
+		with self._cancelLock:
+			if not self._cancelled:
+				self._cancelCallbacks.append(callback)
+				return
+		callback()
+
+	def cancel(self) -> None:
+		"""
+		Cancel the job, calling the registered callbacks.
+
+		Returns:
+			None
+		"""
+		with self._cancelLock:
+			if self._cancelled:
+				return
+			self._cancelled = True
+			callbacks: List[Callable[[], None]] = self._cancelCallbacks
+			self._cancelCallbacks = []
+		for callback in callbacks:
+			try:
+				callback()
+			except Exception:
+				log.error(f"askOpenRouter: cancelling job {self.description!r} failed", exc_info=True)
+
+	@property
+	def waitTime(self) -> float:
+		"""
+		Seconds spent in the queue, until now if the job has not started.
+		"""
+		return (self.startedAt or time.monotonic()) - self.submittedAt
+
+	def reportProgress(self, message: str, speak: bool = True) -> None:
+		"""
+		Record a progress message and optionally announce it.
+
+		Args:
+			message (str): Progress message.
+			speak (bool, optional): Whether to speak the message now. Defaults to True.
+
+		Returns:
+			None
+		"""
+		self.progress = message
+		if speak and message:
+			wx.CallAfter(ui.message, message)
+
+	def run(self) -> None:
+		"""
+		Execute the wrapped callable, recording its result or error.
+
+		Returns:
+			None
+		"""
+		self.startedAt = time.monotonic()
+		if self._cancelled:
+			self.state = RequestJob.CANCELLED
+			self.finishedAt = self.startedAt
+			return
+		self.state = RequestJob.RUNNING
+		_local.job = self
+		try:
+			self.result = self.func(*self.args, **self.kwargs)
+			self.state = RequestJob.DONE
+		except Exception as e:
+			self.error = e
+			self.state = RequestJob.FAILED
+			log.error(f"askOpenRouter: job {self.description!r} failed", exc_info=True)
+		finally:
+			_local.job = None
+			self.finishedAt = time.monotonic()
+
+
+def getCurrentJob() -> Optional[RequestJob]:
+	"""
+	Return the job being executed by the calling thread, if any.
+
+	Returns:
+		Optional[RequestJob]: The running job, or None outside a worker.
+	"""
+	return getattr(_local, "job", None)
+
+
+def reportProgress(message: str, speak: bool = True) -> None:
+	"""
+	Report progress for the job running on the calling thread.
+
+	Does nothing when called outside a worker thread.
+
+	Args:
+		message (str): Progress message.
+		speak (bool, optional): Whether to speak the message now. Defaults to True.
+
+	Returns:
+		None
+	"""
+	job: Optional[RequestJob] = getCurrentJob()
+	if job is not None:
+		job.reportProgress(message, speak=speak)
+
+
+class QueueStats:
+	"""
+	Snapshot of the state of the request worker.
+	"""
+
+	__slots__ = ("pending", "running", "oldestWait", "averageWait", "maximumWait")
+
+	def __init__(self, pending: int, running: int, oldestWait: float, waits: List[float]) -> None:
+		self.pending: int = pending
+		self.running: int = running
+		self.oldestWait: float = oldestWait
+		self.averageWait: float = sum(waits) / len(waits) if waits else 0.0
+		self.maximumWait: float = max(waits) if waits else 0.0
+
+
+class RequestWorker:
+	"""
+	Background scheduler executing request jobs by priority.
+
+	Jobs are queued and run on daemon threads, so the NVDA main thread
+	stays responsive while requests are in flight. At most maxConcurrent
+	jobs run at once, and at most maxPerConversation of them belong to
+	the same conversation, so the questions of a conversation are
+	answered and stored in order. Among the jobs allowed to start, the
+	one with the lowest priority value, then the oldest, goes first.
+	While a job is running, its last progress message is repeated
+	periodically.
+
+	Background jobs (priority RequestJob.BACKGROUND or higher) never take
+	the last slot, so a question never waits behind them: they use at
+	most maxConcurrent - 1 slots, or one slot next to a reserved one when
+	maxConcurrent is 1.
+	"""
+
+	def __init__(
+		self,
+		maxConcurrent: int = DEFAULT_MAX_CONCURRENT,
+		maxPerConversation: int = DEFAULT_MAX_PER_CONVERSATION,
+		progressInterval: float = _PROGRESS_INTERVAL,
+	) -> None:
+		"""
+		Initialize the worker. Threads are started lazily when jobs are submitted.
+
+		Args:
+			maxConcurrent (int, optional): Maximum number of jobs running at once.
+			maxPerConversation (int, optional): Maximum number of running jobs per conversation.
+			progressInterval (float, optional): Seconds between progress reminders.
+		"""
+		self.maxConcurrent: int = max(1, maxConcurrent)
+		self.maxPerConversation: int = max(1, maxPerConversation)
+		self.progressInterval: float = progressInterval
+		self._queue: List[Tuple[int, int, RequestJob]] = []
+		self._sequence: Iterator[int] = itertools.count()
+		self._condition: threading.Condition = threading.Condition()
+		self._threadCount: int = 0
+		self._idleThreads: int = 0
+		self._runningJobs: List[RequestJob] = []
+		self._conversations: Dict[Hashable, int] = {}
+		self._waits: Deque[float] = deque(maxlen=_WAIT_SAMPLES)
+		self._stopEvent: threading.Event = threading.Event()
+
+	@property
+	def backgroundLimit(self) -> int:
+		"""
+		Maximum number of background jobs running at once.
+		"""
+		return max(1, self.maxConcurrent - 1)
+
+	@property
+	def _capacity(self) -> int:
+		# Maximum number of running jobs, including the slot reserved for questions
+		return max(self.maxConcurrent, self.backgroundLimit + 1)
+
+	def configure(self, maxConcurrent: int) -> None:
+		"""
+		Change the maximum number of jobs running at once.
+
+		Extra threads exit once their job is done.
+
+		Args:
+			maxConcurrent (int): Maximum number of jobs running at once.
+
+		Returns:
+			None
+		"""
+		with self._condition:
+			self.maxConcurrent = max(1, maxConcurrent)
+			self._startThreads()
+			self._condition.notify_all()
+
+	def submit(self, job: RequestJob) -> RequestJob:
+		"""
+		Queue a job for execution.
+
+		Args:
+			job (RequestJob): Job to run.
+
+		Returns:
+			RequestJob: The submitted job.
+		"""
+		with self._condition:
+			self._stopEvent.clear()
+			job.submittedAt = time.monotonic()
+			heapq.heappush(self._queue, (job.priority, next(self._sequence), job))
+			self._startThreads()
+			self._condition.notify_all()
+		return job
+
+	@property
+	def pending(self) -> int:
+		"""
+		Number of jobs waiting to be executed.
+		"""
+		with self._condition:
+			return len(self._queue)
+
+	@property
+	def runningJobs(self) -> List[RequestJob]:
+		"""
+		Jobs being executed.
+		"""
+		with self._condition:
+			return list(self._runningJobs)
+
+	def cancel(self, job: RequestJob) -> bool:
+		"""
+		Cancel a job, removing it from the queue if it has not started yet.
+
+		Args:
+			job (RequestJob): Job to cancel.
+
+		Returns:
+			bool: True if the job was waiting or running.
+		"""
+		with self._condition:
+			entries: List[Tuple[int, int, RequestJob]] = [entry for entry in self._queue if entry[2] is job]
+			if entries:
+				self._queue.remove(entries[0])
+				heapq.heapify(self._queue)
+				job.state = RequestJob.CANCELLED
+			elif job not in self._runningJobs:
+				return False
+		job.cancel()
+		return True
+
+	def cancelLatest(self, priority: int) -> Optional[RequestJob]:
+		"""
+		Cancel the most recently started running job of a priority, or else
+		the most recently submitted waiting one.
+
+		Args:
+			priority (int): Priority of the jobs considered, such as RequestJob.INTERACTIVE.
+
+		Returns:
+			Optional[RequestJob]: The cancelled job, or None if there was none.
+		"""
+		with self._condition:
+			running: List[RequestJob] = [
+				job for job in self._runningJobs if job.priority == priority and not job.cancelled
+			]
+			waiting: List[RequestJob] = [
+				job for _priority, _sequence, job in self._queue if job.priority == priority
+			]
+		if running:
+			job: RequestJob = max(running, key=lambda j: j.startedAt or 0.0)
+		elif waiting:
+			job = max(waiting, key=lambda j: j.submittedAt)
+		else:
+			return None
+		return job if self.cancel(job) else None
+
+	def getStats(self) -> QueueStats:
+		"""
+		Return the queue depth and the recent waiting times.
+
+		Returns:
+			QueueStats: The statistics.
+		"""
+		with self._condition:
+			oldestWait: float = max((job.waitTime for _priority, _sequence, job in self._queue), default=0.0)
+			return QueueStats(len(self._queue), len(self._runningJobs), oldestWait, list(self._waits))
+
+	def _startThreads(self) -> None:
+		"""
+		Start threads for the queued jobs, up to the capacity. Called with the condition held.
+		"""
+		while self._threadCount < min(self._capacity, len(self._queue) + len(self._runningJobs)) and (
+			self._idleThreads < len(self._queue)
+		):
+			self._threadCount += 1
+			threading.Thread(
+				target=self._run,
+				name=f"askOpenRouter.worker{self._threadCount}",
+				daemon=True,
+			).start()
+
+	def _takeJob(self) -> Optional[RequestJob]:
+		"""
+		Remove and return the first job allowed to start. Called with the condition held.
+		"""
+		if len(self._runningJobs) >= self._capacity:
+			return None
+		background: int = sum(1 for job in self._runningJobs if job.priority >= RequestJob.BACKGROUND)
+		for entry in sorted(self._queue):
+			job: RequestJob = entry[2]
+			if job.priority >= RequestJob.BACKGROUND:
+				if background >= self.backgroundLimit:
+					continue
+			elif len(self._runningJobs) - background >= self.maxConcurrent:
+				continue
+			if job.conversation is not None and (
+				self._conversations.get(job.conversation, 0) >= self.maxPerConversation
+			):
+				continue
+			self._queue.remove(entry)
+			heapq.heapify(self._queue)
+			self._runningJobs.append(job)
+			if job.conversation is not None:
+				self._conversations[job.conversation] = self._conversations.get(job.conversation, 0) + 1
+			return job
+		return None
+
+	def _finishJob(self, job: RequestJob) -> None:
+		"""
+		Release the slots of a finished job. Called with the condition held.
+		"""
+		self._runningJobs.remove(job)
+		if job.conversation is not None:
+			count: int = self._conversations.pop(job.conversation) - 1
+			if count:
+				self._conversations[job.conversation] = count
+		self._condition.notify_all()
+
+	def _run(self) -> None:
+		while True:
+			with self._condition:
+				job: Optional[RequestJob] = None
+				while not self._stopEvent.is_set() and self._threadCount <= self._capacity:
+					job = self._takeJob()
+					if job is not None:
+						break
+					self._idleThreads += 1
+					self._condition.wait()
+					self._idleThreads -= 1
+				if job is None:
+					self._threadCount -= 1
+					return
+				wait: float = job.waitTime
+				self._waits.append(wait)
+
+			getRecorder().record("queueWait", wait, job.description)
+			heartbeat = threading.Thread(
+				target=self._heartbeat,
+				args=(job,),
+				name="askOpenRouter.progress",
+				daemon=True,
+			)
+			try:
+				heartbeat.start()
+				job.run()
+			finally:
+				with self._condition:
+					self._finishJob(job)
+
+	def _heartbeat(self, job: RequestJob) -> None:
+		"""
+		Periodically repeat the last progress message while the job runs.
+		"""
+		while not self._stopEvent.wait(self.progressInterval):
+			if job.state != RequestJob.RUNNING:
+				return
+			if job.progress:
+				wx.CallAfter(ui.message, job.progress)
+
+	def stop(self) -> None:
+		"""
+		Stop the worker threads. Jobs still queued are discarded.
+
+		Returns:
+			None
+		"""
+		with self._condition:
+			self._stopEvent.set()
+			self._queue.clear()
+			self._condition.notify_all()
+
+
+_worker: Optional[RequestWorker] = None
+
+
+def getWorker(maxConcurrent: Optional[int] = None) -> RequestWorker:
+	"""
+	Return the shared request worker, creating it if needed.
+
+	Args:
+		maxConcurrent (Optional[int], optional): Maximum number of jobs running at once,
+			applied to the worker when given.
+
+	Returns:
+		RequestWorker: The shared worker.
+	"""
+	global _worker
+	if _worker is None:
+		_worker = RequestWorker(maxConcurrent or DEFAULT_MAX_CONCURRENT)
+	elif maxConcurrent and maxConcurrent != _worker.maxConcurrent:
+		_worker.configure(maxConcurrent)
+	return _worker
+
+
+def terminate() -> None:
+	"""
+	Stop the shared worker, if it was started.
+
+	Returns:
+		None
+	"""
+	global _worker
+	if _worker is not None:
+		_worker.stop()
+		_worker = None
@@ -0,0 +1,404 @@
+# benchmarks/fakeServer.py
+
+# Copyright(C) 2026-2028 Abdel <abdelkrim.bensaid@gmail.com>
+# Released under GPL 2
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""
+Local stand-in for the OpenRouter API.
+
+It serves a generated /models catalogue and answers chat completions,
+either at once or token by token as server-sent events, after a
+per-model latency. Errors can be injected per model or at random, and
+the traffic is counted so benchmarks can report what was transferred.
+"""
+
+import gzip
+import hashlib
+import http.server
+import json
+import random
+import sys
+import threading
+import time
+from typing import Any, BinaryIO, Dict, List, Optional
+
+# Words the fake answers are made of
+_WORDS: List[str] = (
+	"the model answers your question with a short and reasonably useful sentence about it".split()
+)
+
+
+class TrafficStats:
+	"""
+	Counters of the traffic handled by the fake server.
+	"""
+
+	def __init__(self) -> None:
+		self.bytesReceived: int = 0
+		self.bytesSent: int = 0
+		self.connections: int = 0
+		self.requests: Dict[str, int] = {}
+		self.statusCodes: Dict[int, int] = {}
+		self.models: Dict[str, int] = {}
+		self._lock: threading.Lock = threading.Lock()
+
+	def add(self, name: str, value: int) -> None:
+		with self._lock:
+			setattr(self, name, getattr(self, name) + value)
+
+	def count(self, counters: Dict[Any, int], key: Any) -> None:
+		with self._lock:
+			counters[key] = counters.get(key, 0) + 1
+
+	def snapshot(self) -> Dict[str, Any]:
+		"""
+		Return a copy of the counters.
+
+		Returns:
+			Dict[str, Any]: The counters.
+		"""
+		with self._lock:
+			return {
+				"bytesReceived": self.bytesReceived,
+				"bytesSent": self.bytesSent,
+				"connections": self.connections,
+				"requests": dict(self.requests),
+				"statusCodes": dict(self.statusCodes),
+				"models": dict(self.models),
+			}
+
+
+class _CountingReader:
+	def __init__(self, stream: BinaryIO, stats: TrafficStats) -> None:
+		self._stream: BinaryIO = stream
+		self._stats: TrafficStats = stats
+
+	def read(self, size: int = -1) -> bytes:
+		data: bytes = self._stream.read(size)
+		self._stats.add("bytesReceived", len(data))
+		return data
+
+	def readline(self, size: int = -1) -> bytes:
+		data: bytes = self._stream.readline(size)
+		self._stats.add("bytesReceived", len(data))
+		return data
+
+	def __getattr__(self, name: str) -> Any:
+		return getattr(self._stream, name)
+
+
+class _CountingWriter:
+	def __init__(self, stream: BinaryIO, stats: TrafficStats) -> None:
+		self._stream: BinaryIO = stream
+		self._stats: TrafficStats = stats
+
+	def write(self, data: bytes) -> int:
+		self._stats.add("bytesSent", len(data))
+		return self._stream.write(data)
+
+	def __getattr__(self, name: str) -> Any:
+		return getattr(self._stream, name)
+
+
+def makeCatalogue(size: int, freeRatio: float = 0.3, seed: int = 0) -> List[Dict[str, Any]]:
+	"""
+	Generate a /models catalogue shaped like the OpenRouter one.
+
+	A few models are deprecated or have no provider, so the filters of
+	the add-on have something to discard.
+
+	Args:
+		size (int): Number of models.
+		freeRatio (float, optional): Share of free models.
+		seed (int, optional): Seed of the generator.
+
+	Returns:
+		List[Dict[str, Any]]: The model entries.
+	"""
+	rng = random.Random(seed)
+	models: List[Dict[str, Any]] = []
+
+	for index in range(size):
+		free: bool = rng.random() < freeRatio
+		price: str = "0" if free else f"{rng.uniform(0.0000001, 0.00006):.10f}"
+		contextLength: int = rng.choice((4096, 8192, 32768, 131072))
+		models.append(
+			{
+				"id": f"vendor{index % 17}/model-{index}" + (":free" if free else ""),
+				"name": f"Vendor {index % 17}: Model {index}",
+				"created": 1700000000 + index,
+				"description": " ".join(rng.choice(_WORDS) for _ in range(40)),
+				"context_length": contextLength,
+				"architecture": {
+					"modality": "text->text",
+					"input_modalities": ["text"],
+					"output_modalities": ["text"],
+					"tokenizer": "Other",
+				},
+				"pricing": {
+					"prompt": price,
+					"completion": price,
+					"request": "0",
+					"image": "0",
+				},
+				"top_provider": {}
+				if index % 29 == 28
+				else {
+					"context_length": contextLength,
+					"max_completion_tokens": 4096,
+					"is_moderated": False,
+				},
+				"per_request_limits": None,
+				"supported_parameters": ["max_tokens", "temperature", "top_p", "stop"],
+				"deprecated": index % 31 == 30,
+			},
+		)
+
+	return models
+
+
+class _Server(http.server.ThreadingHTTPServer):
+	daemon_threads = True
+
+	def handle_error(self, request: Any, client_address: Any) -> None:
+		# Cancelled requests close their connection while the answer is being written
+		if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+			super().handle_error(request, client_address)
+
+
+class FakeOpenRouter:
+	"""
+	Threaded HTTP server imitating the OpenRouter API on localhost.
+
+	Settings are plain attributes and may be changed between scenarios.
+	"""
+
+	def __init__(
+		self,
+		catalogueSize: int = 300,
+		freeRatio: float = 0.3,
+		latency: float = 0.05,
+		modelLatencies: Optional[Dict[str, float]] = None,
+		tokenDelay: float = 0.005,
+		answerTokens: int = 60,
+		errorRates: Optional[Dict[int, float]] = None,
+		modelErrors: Optional[Dict[str, int]] = None,
+		seed: int = 0,
+	) -> None:
+		"""
+		Initialize the server. Call start() to serve requests.
+
+		Args:
+			catalogueSize (int, optional): Number of models in the catalogue.
+			freeRatio (float, optional): Share of free models in the catalogue.
+			latency (float, optional): Delay before answering, in seconds, for unlisted models.
+			modelLatencies (Optional[Dict[str, float]], optional): Delay of specific models.
+			tokenDelay (float, optional): Delay between two streamed tokens, in seconds.
+			answerTokens (int, optional): Number of tokens of each answer.
+			errorRates (Optional[Dict[int, float]], optional): Probability of answering
+				each HTTP status code instead of an answer, such as {429: 0.2}.
+			modelErrors (Optional[Dict[str, int]], optional): Status code always answered by specific models.
+			seed (int, optional): Seed of the random generators.
+		"""
+		self.latency: float = latency
+		self.modelLatencies: Dict[str, float] = modelLatencies or {}
+		self.tokenDelay: float = tokenDelay
+		self.answerTokens: int = answerTokens
+		self.errorRates: Dict[int, float] = errorRates or {}
+		self.modelErrors: Dict[str, int] = modelErrors or {}
+		self.stats: TrafficStats = TrafficStats()
+		self._random: random.Random = random.Random(seed)
+		self._randomLock: threading.Lock = threading.Lock()
+		self._server: Optional[_Server] = None
+		self.setCatalogue(makeCatalogue(catalogueSize, freeRatio, seed))
+
+	def setCatalogue(self, models: List[Dict[str, Any]]) -> None:
+		"""
+		Replace the served catalogue.
+
+		Args:
+			models (List[Dict[str, Any]]): The model entries.
+
+		Returns:
+			None
+		"""
+		self.catalogue: List[Dict[str, Any]] = models
+		self._catalogueBody: bytes = json.dumps({"data": models}).encode("utf-8")
+		self._catalogueGzipBody: bytes = gzip.compress(self._catalogueBody)
+		self._catalogueETag: str = '"' + hashlib.sha1(self._catalogueBody).hexdigest() + '"'
+
+	@property
+	def freeModels(self) -> List[str]:
+		"""
+		Identifiers of the usable free models of the catalogue.
+		"""
+		return [
+			m["id"]
+			for m in self.catalogue
+			if m["pricing"]["prompt"] == "0" and m["top_provider"] and not m["deprecated"]
+		]
+
+	@property
+	def url(self) -> str:
+		"""
+		Base URL of the API, to use instead of https://openrouter.ai/api/v1.
+		"""
+		if self._server is None:
+			raise RuntimeError("The server is not started")
+		host, port = self._server.server_address[:2]
+		return f"http://{host}:{port}/api/v1"
+
+	def resetStats(self) -> None:
+		"""
+		Reset the traffic counters.
+
+		Returns:
+			None
+		"""
+		self.stats = TrafficStats()
+
+	def start(self) -> "FakeOpenRouter":
+		"""
+		Start serving on a free port of 127.0.0.1.
+
+		Returns:
+			FakeOpenRouter: The server itself.
+		"""
+		server = _Server(("127.0.0.1", 0), self._makeHandler())
+		self._server = server
+		threading.Thread(target=server.serve_forever, name="fakeOpenRouter", daemon=True).start()
+		return self
+
+	def stop(self) -> None:
+		"""
+		Stop the server.
+
+		Returns:
+			None
+		"""
+		if self._server is not None:
+			self._server.shutdown()
+			self._server.server_close()
+			self._server = None
+
+	def _chooseError(self, model: str) -> Optional[int]:
+		if model in self.modelErrors:
+			return self.modelErrors[model]
+		with self._randomLock:
+			draw: float = self._random.random()
+		for status, rate in self.errorRates.items():
+			if draw < rate:
+				return status
+			draw -= rate
+		return None
+
+	def _makeAnswer(self, model: str) -> List[str]:
+		with self._randomLock:
+			words: List[str] = [self._random.choice(_WORDS) for _ in range(self.answerTokens)]
+		tokens: List[str] = [(" " if i else "") + word for i, word in enumerate(words)]
+		tokens[-1] += "."
+		return tokens
+
+	def _makeHandler(self) -> type:
+		fake: "FakeOpenRouter" = self
+
+		class Handler(http.server.BaseHTTPRequestHandler):
+			protocol_version = "HTTP/1.1"
+
+			def setup(self) -> None:
+				super().setup()
+				fake.stats.add("connections", 1)
+				self.rfile = _CountingReader(self.rfile, fake.stats)
+				self.wfile = _CountingWriter(self.wfile, fake.stats)
+
+			def log_message(self, format: str, *args: Any) -> None:
+				pass
+
+			def _sendBody(self, status: int, body: bytes, contentType: str = "application/json") -> None:
+				fake.stats.count(fake.stats.statusCodes, status)
+				self.send_response(status)
+				self.send_header("Content-Type", contentType)
+				self.send_header("Content-Length", str(len(body)))
+				if status == 429:
+					self.send_header("Retry-After", "1")
+				self.end_headers()
+				self.wfile.write(body)
+
+			def do_GET(self) -> None:
+				path: str = self.path.split("?", 1)[0]
+				fake.stats.count(fake.stats.requests, path)
+				if not path.endswith("/models"):
+					self._sendBody(404, b'{"error":{"code":404,"message":"Not found"}}')
+					return
+				if self.headers.get("If-None-Match") == fake._catalogueETag:
+					fake.stats.count(fake.stats.statusCodes, 304)
+					self.send_response(304)
+					self.send_header("ETag", fake._catalogueETag)
+					self.send_header("Content-Length", "0")
+					self.end_headers()
+					return
+				compressed: bool = "gzip" in self.headers.get("Accept-Encoding", "")
+				body: bytes = fake._catalogueGzipBody if compressed else fake._catalogueBody
+				fake.stats.count(fake.stats.statusCodes, 200)
+				self.send_response(200)
+				self.send_header("Content-Type", "application/json")
+				if compressed:
+					self.send_header("Content-Encoding", "gzip")
+				self.send_header("Content-Length", str(len(body)))
+				self.send_header("ETag", fake._catalogueETag)
+				self.end_headers()
+				self.wfile.write(body)
+
+			def do_POST(self) -> None:
+				path: str = self.path.split("?", 1)[0]
+				fake.stats.count(fake.stats.requests, path)
+				length: int = int(self.headers.get("Content-Length", 0))
+				request: Dict[str, Any] = json.loads(self.rfile.read(length) or b"{}")
+				model: str = request.get("model", "")
+				fake.stats.count(fake.stats.models, model)
+
+				time.sleep(fake.modelLatencies.get(model, fake.latency))
+
+				error: Optional[int] = fake._chooseError(model)
+				if error is not None:
+					body: bytes = json.dumps(
+						{"error": {"code": error, "message": f"Injected error {error}"}},
+					).encode()
+					self._sendBody(error, body)
+					return
+
+				tokens: List[str] = fake._makeAnswer(model)
+
+				if not request.get("stream"):
+					body = json.dumps(
+						{
+							"id": "gen-benchmark",
+							"model": model,
+							"choices": [{"message": {"role": "assistant", "content": "".join(tokens)}}],
+						},
+					).encode()
+					self._sendBody(200, body)
+					return
+
+				fake.stats.count(fake.stats.statusCodes, 200)
+				self.send_response(200)
+				self.send_header("Content-Type", "text/event-stream")
+				self.send_header("Transfer-Encoding", "chunked")
+				self.end_headers()
+				self._sendChunk(": OPENROUTER PROCESSING\n\n")
+				for token in tokens:
+					event: Dict[str, Any] = {"choices": [{"delta": {"content": token}}]}
+					self._sendChunk(f"data: {json.dumps(event)}\n\n")
+					if fake.tokenDelay:
+						time.sleep(fake.tokenDelay)
+				self._sendChunk("data: [DONE]\n\n")
+				self._sendChunk("")
+
+			def _sendChunk(self, text: str) -> None:
+				data: bytes = text.encode("utf-8")
+				self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+				self.wfile.flush()
+
+		return Handler
@@ -0,0 +1,205 @@
+# benchmarks/nvdaStubs.py
+
+# Copyright(C) 2026-2028 Abdel <abdelkrim.bensaid@gmail.com>
+# Released under GPL 2
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""
+Minimal stand-ins for the NVDA modules used by the add-on.
+
+They only provide what the request path needs (configuration, message
+display, logging, translation and wx.CallAfter), so the add-on functions
+can be benchmarked with a regular Python interpreter. The add-on package
+is registered without running its __init__ module, which would need the
+whole NVDA GUI.
+"""
+
+import ast
+import builtins
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+import types
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+_ADDON_DIR: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "addon")
+
+# Settings of the benchmarks which differ from the defaults of the add-on
+_BENCHMARK_SETTINGS: Dict[str, Any] = {
+	"apiKey": "benchmark",
+	# Only the answer is displayed, unless a scenario asks for the full history
+	"fullHistory": False,
+}
+
+# Add-on settings used when a scenario does not override them, read by install
+# from the configuration specification of the add-on
+DEFAULT_SETTINGS: Dict[str, Any] = {}
+
+# Types of the configobj specifications used by the add-on
+_SPEC_TYPES: Dict[str, Callable[[Any], Any]] = {
+	"boolean": bool,
+	"float": float,
+	"integer": int,
+	"string": str,
+}
+
+
+class _Section(dict):
+	pass
+
+
+class _Config(dict):
+	spec: Dict[str, Any] = {}
+
+
+class DisplayedMessages:
+	"""
+	Messages the add-on displayed or spoke, in order.
+	"""
+
+	def __init__(self) -> None:
+		self.browseable: List[Tuple[str, str]] = []
+		self.spoken: List[str] = []
+		self._lock: threading.Lock = threading.Lock()
+
+	def addBrowseable(self, message: str = "", title: str = "", **kwargs: Any) -> None:
+		with self._lock:
+			self.browseable.append((title or "", message))
+
+	def addSpoken(self, message: str) -> None:
+		with self._lock:
+			self.spoken.append(message)
+
+	def clear(self) -> None:
+		with self._lock:
+			self.browseable = []
+			self.spoken = []
+
+
+displayed: DisplayedMessages = DisplayedMessages()
+
+conf: _Config = _Config()
+
+_addonPath: str = ""
+_configPath: str = ""
+_tempDir: Optional[tempfile.TemporaryDirectory] = None
+
+
+class _Addon:
+	manifest: Dict[str, str] = {"summary": "Ask OpenRouter"}
+
+	@property
+	def path(self) -> str:
+		return _addonPath
+
+
+def _module(name: str, **attributes: Any) -> types.ModuleType:
+	module = types.ModuleType(name)
+	module.__dict__.update(attributes)
+	sys.modules[name] = module
+	return module
+
+
+def _callAfter(func: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+	func(*args, **kwargs)
+
+
+def _parseDefault(spec: str) -> Any:
+	"""
+	Return the default value of a configobj specification, such as "integer(default=4, min=1)".
+	"""
+	kind, _separator, arguments = spec.partition("(")
+	match = re.search(r"default=('[^']*'|[^,)]*)", arguments)
+	if match is None:
+		return None
+	return _SPEC_TYPES[kind.strip()](ast.literal_eval(match.group(1).strip()))
+
+
+def resetEnvironment(**settings: Any) -> str:
+	"""
+	Use new, empty add-on and configuration folders, and reset the settings.
+
+	The folders of the previous call are deleted.
+
+	Args:
+		**settings: Add-on settings overriding DEFAULT_SETTINGS.
+
+	Returns:
+		str: Path of the new NVDA configuration folder.
+
+	Raises:
+		KeyError: If a setting is not in the configuration specification of the add-on.
+	"""
+	global _addonPath, _configPath, _tempDir
+	unknown: List[str] = sorted(set(settings) - set(DEFAULT_SETTINGS))
+	if unknown:
+		raise KeyError(f"settings missing from the configuration specification: {', '.join(unknown)}")
+	cleanup()
+	_tempDir = tempfile.TemporaryDirectory(prefix="askOpenRouterBench", ignore_cleanup_errors=True)
+	root: str = _tempDir.name
+	_addonPath = os.path.join(root, "addon")
+	_configPath = os.path.join(root, "config")
+	os.makedirs(_addonPath)
+	os.makedirs(_configPath)
+	sys.modules["globalVars"].appArgs = types.SimpleNamespace(secure=False, configPath=_configPath)
+	section = _Section(DEFAULT_SETTINGS)
+	section.update(settings)
+	conf["askOpenRouter"] = section
+	displayed.clear()
+	return _configPath
+
+
+def cleanup() -> None:
+	"""
+	Delete the add-on and configuration folders of the last resetEnvironment call.
+
+	Returns:
+		None
+	"""
+	global _tempDir
+	if _tempDir is not None:
+		_tempDir.cleanup()
+		_tempDir = None
+
+
+def install() -> None:
+	"""
+	Register the NVDA stand-ins and the add-on package in sys.modules.
+
+	Returns:
+		None
+	"""
+	if "askOpenRouter" in sys.modules:
+		return
+
+	logger = logging.getLogger("askOpenRouter")
+	setattr(logger, "debugWarning", logger.debug)
+	_module("logHandler", log=logger)
+
+	setattr(builtins, "_", lambda text: text)
+
+	_module("config", conf=conf)
+	_module("globalVars", appArgs=types.SimpleNamespace(secure=False, configPath=""))
+	_module("globalPluginHandler", GlobalPlugin=type("GlobalPlugin", (), {}))
+	_module("addonHandler", getCodeAddon=lambda: _Addon(), initTranslation=lambda: None)
+	_module("ui", message=displayed.addSpoken, browseableMessage=displayed.addBrowseable)
+	_module("wx", CallAfter=_callAfter)
+	_module(
+		"gui",
+		mainFrame=None,
+		message=types.SimpleNamespace(isModalMessageBoxActive=lambda: False),
+	)
+
+	package = _module("askOpenRouter")
+	package.__path__ = [os.path.join(_ADDON_DIR, "globalPlugins", "askOpenRouter")]
+
+	from askOpenRouter.confSpec import CONF_SPEC
+
+	conf.spec["askOpenRouter"] = CONF_SPEC
+	DEFAULT_SETTINGS.update((key, _parseDefault(spec)) for key, spec in CONF_SPEC.items())
+	DEFAULT_SETTINGS.update(_BENCHMARK_SETTINGS)
+	resetEnvironment()
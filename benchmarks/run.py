@@ -0,0 +1,375 @@
+# benchmarks/run.py
+
+# Copyright(C) 2026-2028 Abdel <abdelkrim.bensaid@gmail.com>
+# Released under GPL 2
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+
+"""
+End-to-end benchmarks of the add-on against a local OpenRouter stand-in.
+
+The add-on functions run outside NVDA, with the NVDA modules replaced by
+the stand-ins of nvdaStubs, and send their requests to the fake server
+of fakeServer. For each scenario, the latency percentiles, the number of
+chat requests and retries, and the bytes transferred are reported.
+
+Usage, from the repository root (Markdown must be installed):
+
+	python benchmarks/run.py
+	python benchmarks/run.py --scenario ask --scenario askWithErrors --iterations 50
+	python benchmarks/run.py --json --output bench_output.txt
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import nvdaStubs  # noqa: E402
+
+nvdaStubs.install()
+
+from askOpenRouter import functions  # noqa: E402
+from fakeServer import FakeOpenRouter  # noqa: E402
+
+# Title of the window displaying a successful answer
+_ANSWER_TITLES = ("Model Response", "Model Response (cached)")
+
+
+class ScenarioResult:
+	"""
+	Measures of one scenario.
+	"""
+
+	def __init__(self, name: str) -> None:
+		self.name: str = name
+		self.latencies: List[float] = []
+		self.failures: int = 0
+		self.traffic: Dict[str, Any] = {}
+
+	@property
+	def chatRequests(self) -> int:
+		return sum(
+			count for path, count in self.traffic.get("requests", {}).items() if path.endswith("/completions")
+		)
+
+	@property
+	def retries(self) -> int:
+		# Chat requests beyond one per answered question: retries after
+		# errors, and the extra attempts of hedged requests
+		return max(self.chatRequests - len(self.latencies), 0)
+
+	def toDict(self) -> Dict[str, Any]:
+		return {
+			"scenario": self.name,
+			"iterations": len(self.latencies),
+			"failures": self.failures,
+			"mean": sum(self.latencies) / len(self.latencies) if self.latencies else None,
+			"p50": percentile(self.latencies, 50),
+			"p90": percentile(self.latencies, 90),
+			"p99": percentile(self.latencies, 99),
+			"max": max(self.latencies) if self.latencies else None,
+			"chatRequests": self.chatRequests,
+			"retries": self.retries,
+			"connections": self.traffic.get("connections", 0),
+			"bytesSent": self.traffic.get("bytesReceived", 0),
+			"bytesReceived": self.traffic.get("bytesSent", 0),
+			"statusCodes": self.traffic.get("statusCodes", {}),
+		}
+
+
+def percentile(values: List[float], rank: float) -> Optional[float]:
+	"""
+	Return a percentile of the values, with the nearest-rank method.
+
+	Args:
+		values (List[float]): Measured values.
+		rank (float): Percentile, between 0 and 100.
+
+	Returns:
+		Optional[float]: The percentile, or None if there is no value.
+	"""
+	if not values:
+		return None
+	ordered: List[float] = sorted(values)
+	index: int = max(0, min(len(ordered) - 1, int(round(rank / 100 * len(ordered) + 0.5)) - 1))
+	return ordered[index]
+
+
+def resetAddon(server: FakeOpenRouter, **settings: Any) -> None:
+	"""
+	Give the add-on fresh settings, data folders and caches.
+
+	Args:
+		server (FakeOpenRouter): Server receiving the requests.
+		**settings: Add-on settings overriding the defaults.
+
+	Returns:
+		None
+	"""
+	functions.terminate()
+	functions._catalogue = None
+	functions._scoreboard = None
+	functions._unavailableModels = None
+	functions._preselectedModel = None
+	functions._warmUpJob = None
+	functions._API_URL = server.url
+	nvdaStubs.resetEnvironment(**settings)
+
+
+def _askQuestion(result: ScenarioResult, new: bool = True) -> None:
+	nvdaStubs.displayed.clear()
+	start: float = time.perf_counter()
+	functions.askOpenRouter("Summarise the benefits of benchmarks.", "benchmark", new=new)
+	# The answer is displayed once the render pool has converted it
+	functions.getRenderPool().waitIdle(10)
+	elapsed: float = time.perf_counter() - start
+	titles: List[str] = [title for title, message in nvdaStubs.displayed.browseable]
+	# With the full history, the answer is followed by the chat page
+	if any(title in _ANSWER_TITLES for title in titles):
+		result.latencies.append(elapsed)
+	else:
+		result.failures += 1
+
+
+def _measure(result: ScenarioResult, func: Callable[[], Any]) -> None:
+	start: float = time.perf_counter()
+	try:
+		func()
+	except Exception:
+		result.failures += 1
+		return
+	result.latencies.append(time.perf_counter() - start)
+
+
+def catalogueCold(server: FakeOpenRouter, iterations: int) -> ScenarioResult:
+	"""Download and filter the catalogue with empty caches."""
+	result = ScenarioResult("catalogueCold")
+	for _i in range(iterations):
+		resetAddon(server)
+		_measure(result, lambda: functions.getAvailableModels("benchmark"))
+	return result
+
+
+def catalogueWarm(server: FakeOpenRouter, iterations: int) -> ScenarioResult:
+	"""Filter the catalogue from the memory cache."""
+	result = ScenarioResult("catalogueWarm")
+	resetAddon(server)
+	functions.getAvailableModels("benchmark")
+	server.resetStats()
+	for _i in range(iterations):
+		_measure(result, lambda: functions.getAvailableModels("benchmark"))
+	return result
+
+
+def randomFreeModel(server: FakeOpenRouter, iterations: int) -> ScenarioResult:
+	"""Choose a free model, the catalogue being cached."""
+	result = ScenarioResult("randomFreeModel")
+	resetAddon(server)
+	functions.getRandomFreeModel("benchmark")
+	server.resetStats()
+	for _i in range(iterations):
+		_measure(result, lambda: functions.getRandomFreeModel("benchmark"))
+	return result
+
+
+def ask(server: FakeOpenRouter, iterations: int) -> ScenarioResult:
+	"""Ask questions in new chats, without streaming."""
+	result = ScenarioResult("ask")
+	resetAddon(server)
+	for _i in range(iterations):
+		_askQuestion(result)
+	return result
+
+
+def askCold(server: FakeOpenRouter, iterations: int) -> ScenarioResult:
+	"""Ask a question right after NVDA started: no connection, catalogue or model yet."""
+	result = ScenarioResult("askCold")
+	for _i in range(iterations):
+		resetAddon(server)
+		_askQuestion(result)
+	return result
+
+
+def askAfterWarmUp(server: FakeOpenRouter, iterations: int) -> ScenarioResult:
+	"""Same as askCold, after the warm-up done while the question is typed."""
+	result = ScenarioResult("askAfterWarmUp")
+	for _i in range(iterations):
+		resetAddon(server)
+		functions.warmUp("benchmark")
+		_askQuestion(result)
+	return result
+
+
+def askContinue(server: FakeOpenRouter, iterations: int) -> ScenarioResult:
+	"""Ask every question in the same chat, whose history grows."""
+	result = ScenarioResult("askContinue")
+	resetAddon(server, fullHistory=True)
+	for index in range(iterations):
+		_askQuestion(result, new=index == 0)
+	return result
+
+
+def askContinueCompacted(server: FakeOpenRouter, iterations: int) -> ScenarioResult:
+	"""Same as askContinue, the older messages being summarised in the background."""
+	result = ScenarioResult("askContinueCompacted")
+	resetAddon(server, fullHistory=True, compactHistory=True, compactionThreshold=1000)
+	for index in range(iterations):
+		_askQuestion(result, new=index == 0)
+	return result
+
+
+def askStreaming(server: FakeOpenRouter, iterations: int) -> ScenarioResult:
+	"""Ask questions in new chats, with streamed answers."""
+	result = ScenarioResult("askStreaming")
+	resetAddon(server, streamResponses=True)
+	for _i in range(iterations):
+		_askQuestion(result)
+	return result
+
+
+def askWithErrors(server: FakeOpenRouter, iterations: int) -> ScenarioResult:
+	"""Ask questions while the server answers 402, 404, 429 and 500 errors."""
+	result = ScenarioResult("askWithErrors")
+	resetAddon(server)
+	server.errorRates = {429: 0.15, 404: 0.05, 402: 0.05, 500: 0.05}
+	try:
+		for _i in range(iterations):
+			_askQuestion(result)
+	finally:
+		server.errorRates = {}
+	return result
+
+
+def askHedged(server: FakeOpenRouter, iterations: int) -> ScenarioResult:
+	"""Ask three free models at once, some of them being slow."""
+	result = ScenarioResult("askHedged")
+	resetAddon(server, hedgedRequests=3)
+	slowModels: List[str] = server.freeModels[::2]
+	server.modelLatencies = {model: server.latency * 10 for model in slowModels}
+	try:
+		for _i in range(iterations):
+			_askQuestion(result)
+	finally:
+		server.modelLatencies = {}
+	return result
+
+
+SCENARIOS: Dict[str, Callable[[FakeOpenRouter, int], ScenarioResult]] = {
+	"catalogueCold": catalogueCold,
+	"catalogueWarm": catalogueWarm,
+	"randomFreeModel": randomFreeModel,
+	"ask": ask,
+	"askCold": askCold,
+	"askAfterWarmUp": askAfterWarmUp,
+	"askContinue": askContinue,
+	"askContinueCompacted": askContinueCompacted,
+	"askStreaming": askStreaming,
+	"askWithErrors": askWithErrors,
+	"askHedged": askHedged,
+}
+
+
+def _formatSeconds(value: Optional[float]) -> str:
+	return "-" if value is None else f"{value * 1000:.1f}"
+
+
+def formatTable(results: List[Dict[str, Any]]) -> str:
+	"""
+	Format the results as a text table, latencies being in milliseconds.
+
+	Args:
+		results (List[Dict[str, Any]]): Results of the scenarios.
+
+	Returns:
+		str: The table.
+	"""
+	header: List[str] = [
+		"scenario",
+		"n",
+		"fail",
+		"p50 ms",
+		"p90 ms",
+		"p99 ms",
+		"max ms",
+		"requests",
+		"retries",
+		"conns",
+		"sent B",
+		"recv B",
+	]
+	rows: List[List[str]] = [header]
+	for r in results:
+		rows.append(
+			[
+				r["scenario"],
+				str(r["iterations"]),
+				str(r["failures"]),
+				_formatSeconds(r["p50"]),
+				_formatSeconds(r["p90"]),
+				_formatSeconds(r["p99"]),
+				_formatSeconds(r["max"]),
+				str(r["chatRequests"]),
+				str(r["retries"]),
+				str(r["connections"]),
+				str(r["bytesSent"]),
+				str(r["bytesReceived"]),
+			],
+		)
+	widths: List[int] = [max(len(row[i]) for row in rows) for i in range(len(header))]
+	return "\n".join(
+		"  ".join(cell.ljust(widths[i]) if i == 0 else cell.rjust(widths[i]) for i, cell in enumerate(row))
+		for row in rows
+	)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+	parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+	parser.add_argument(
+		"--scenario",
+		action="append",
+		choices=sorted(SCENARIOS),
+		help="scenario to run; may be repeated (default: all)",
+	)
+	parser.add_argument("--iterations", type=int, default=20, help="iterations of each scenario")
+	parser.add_argument("--catalogue-size", type=int, default=300, help="number of models of the catalogue")
+	parser.add_argument("--latency", type=float, default=0.05, help="latency of the models, in seconds")
+	parser.add_argument("--token-delay", type=float, default=0.002, help="delay between streamed tokens")
+	parser.add_argument("--seed", type=int, default=0, help="seed of the random generators")
+	parser.add_argument("--json", action="store_true", help="print the results as JSON")
+	parser.add_argument("--output", help="also write the results to this file")
+	args = parser.parse_args(argv)
+
+	server = FakeOpenRouter(
+		catalogueSize=args.catalogue_size,
+		latency=args.latency,
+		tokenDelay=args.token_delay,
+		seed=args.seed,
+	).start()
+
+	results: List[Dict[str, Any]] = []
+	try:
+		for name in args.scenario or list(SCENARIOS):
+			server.resetStats()
+			result: ScenarioResult = SCENARIOS[name](server, args.iterations)
+			result.traffic = server.stats.snapshot()
+			results.append(result.toDict())
+	finally:
+		functions.terminate()
+		server.stop()
+		nvdaStubs.cleanup()
+
+	report: str = json.dumps(results, indent=2) if args.json else formatTable(results)
+	print(report)
+	if args.output:
+		with open(args.output, "w", encoding="utf-8") as f:
+			f.write(report + "\n")
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())